@@ -8,14 +8,16 @@ import argparse
 import os
 import sys
 from process_examples import ExampleProcessor, ResultsVisualizer
+from tac_optimizer import OPTIMIZATION_LEVELS, DEFAULT_LEVEL
 
 
 class CompilerDemo:
     """Clase principal para la demostración del compilador"""
     
-    def __init__(self, verbose=False, output_dir='output'):
+    def __init__(self, verbose=False, output_dir='output', opt_level=DEFAULT_LEVEL):
         self.verbose = verbose
         self.output_dir = output_dir
+        self.opt_level = opt_level
         self.examples = {
             '1': ('ejemplos/ejemplo1_estudiantes.py', 'Sistema de Gestión de Estudiantes'),
             '2': ('ejemplos/ejemplo2_inventario.py', 'Sistema de Inventario'),
@@ -40,7 +42,7 @@ class CompilerDemo:
         print(f"Ejemplo {example_num}: {description}")
         print(f"{'=' * 100}\n")
         
-        processor = ExampleProcessor(example_path)
+        processor = ExampleProcessor(example_path, opt_level=self.opt_level)
         
         # Leer código fuente
         if not processor.read_source():
@@ -256,7 +258,7 @@ class CompilerDemo:
             print(f"Archivo: {example_path}")
             print(f"{'=' * 100}\n")
             
-            processor = ExampleProcessor(example_path)
+            processor = ExampleProcessor(example_path, opt_level=self.opt_level)
             
             # Procesar el ejemplo
             if save_output:
@@ -378,6 +380,7 @@ Ejemplos de uso:
   %(prog)s -e 3 -s                  # Procesar Ejemplo 3 y guardar salidas
   %(prog)s -v                       # Modo verbose con todos los ejemplos
   %(prog)s -e 4 -p codegen -s -v    # Ejemplo 4, hasta codegen, guardar, verbose
+  %(prog)s -e 2 -O1                 # Ejemplo 2 con las optimizaciones básicas
 
 Fases disponibles:
   lexer      - Análisis Léxico
@@ -430,10 +433,18 @@ Ejemplos disponibles:
         help='Modo verbose - mostrar información detallada'
     )
     
+    parser.add_argument(
+        '-O', '--opt-level',
+        type=int,
+        choices=sorted(OPTIMIZATION_LEVELS),
+        default=DEFAULT_LEVEL,
+        help=f'Nivel de optimización del TAC (por defecto: {DEFAULT_LEVEL})'
+    )
+    
     args = parser.parse_args()
     
     # Crear instancia del demo
-    demo = CompilerDemo(verbose=args.verbose, output_dir=args.output)
+    demo = CompilerDemo(verbose=args.verbose, output_dir=args.output, opt_level=args.opt_level)
     
     # Procesar según los argumentos
     if args.example:
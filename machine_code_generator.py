@@ -1,4 +1,58 @@
-from tac_generator import TACInstruction
+from tac_generator import (
+    TACInstruction, OpCode, Const, Temp, ARITHMETIC_OPS, COMPARISON_OPS, COMPARE_JUMPS, INPLACE_OPS, BUILTIN_FUNCTIONS,
+    frame_locals, lower_loops
+)
+from peephole import Peephole, PeepholeRule
+import re
+
+
+# Condición ARM de cada salto fundido
+JUMP_CONDITIONS = {
+    OpCode.IF_EQ: 'EQ', OpCode.IF_NE: 'NE', OpCode.IF_LT: 'LT',
+    OpCode.IF_GT: 'GT', OpCode.IF_LE: 'LE', OpCode.IF_GE: 'GE'
+}
+
+
+# Instrucciones TAC cuyo resultado se guarda en memoria si es una variable del programa
+STORED_OPS = ARITHMETIC_OPS | {OpCode.ASSIGN, OpCode.NEG, OpCode.NOT}
+
+# Clave de mirilla de las etiquetas del ensamblador
+LABEL_KEY = ':'
+
+
+def instruction_key(line):
+    """Clave de mirilla de una línea de ensamblador: su mnemónico, o LABEL_KEY"""
+    text = line.strip()
+    if text.endswith(':'):
+        return LABEL_KEY
+    return text.split(' ', 1)[0]
+
+
+def instruction_operands(line):
+    """Operandos de una línea de ensamblador ('[SP, #4]' es un solo operando)"""
+    parts = line.split(None, 1)
+    if len(parts) < 2:
+        return []
+    return re.split(r',\s*(?![^\[]*\])', parts[1])
+
+
+def reads_register(operands, reg):
+    """Indica si alguno de los operandos nombra el registro"""
+    return any(reg in re.findall(r'\w+', operand) for operand in operands)
+
+
+# Reglas de mirilla sobre el ensamblador generado: mnemónicos de la ventana,
+# método del generador que la reescribe y descripción
+ASM_PEEPHOLE = Peephole((
+    PeepholeRule(('MOV',), '_redundant_move', "Movimiento redundante eliminado", "{before}"),
+    PeepholeRule(('STR', 'LDR'), '_load_after_store', "Carga tras almacenamiento"),
+    PeepholeRule(('LDR', 'STR'), '_store_after_load', "Almacenamiento redundante eliminado", "{before[1]}"),
+    PeepholeRule(('STR', 'STR'), '_overwritten_store', "Almacenamiento muerto eliminado", "{before[0]}"),
+    PeepholeRule((('MOV', 'LDR'), ('MOV', 'LDR')), '_overwritten_load', "Carga muerta eliminada", "{before[0]}"),
+    PeepholeRule(('MOV', 'MUL'), '_multiply_by_shift', "Multiplicación por desplazamiento"),
+    PeepholeRule(('MOV', ('MOV', 'LDR'), 'MUL'), '_multiply_by_shift', "Multiplicación por desplazamiento"),
+    PeepholeRule(('B', LABEL_KEY), '_branch_to_next', "Salto innecesario eliminado", "{before[0]}"),
+), instruction_key)
 
 
 class MachineCodeGenerator:
@@ -10,13 +64,21 @@ class MachineCodeGenerator:
         self.next_register = 0
         self.memory_offset = 0
         self.memory_map = {}
+        self.frame = {}  # {variable de la función actual: desplazamiento respecto a FP}
+        self.peephole_rewrites = []  # Reescrituras de mirilla sobre el código generado
     
     def generate(self, tac_instructions):
         self.code = []
+        self.frame = {}
         self.code.append(".data")
         
-        for instr in tac_instructions:
-            if instr.op == 'ASSIGN' and not instr.result.startswith('t'):
+        # Los bucles se traducen con contadores, comparaciones y saltos
+        tac_instructions = lower_loops(tac_instructions)
+        
+        # Las variables de una función viven en su marco, no en .data
+        main_code, functions = self.split_functions(tac_instructions)
+        for instr in main_code:
+            if instr.op in STORED_OPS and not isinstance(instr.result, Temp):
                 if instr.result not in self.memory_map:
                     self.memory_map[instr.result] = self.memory_offset
                     self.code.append(f"    {instr.result}: .word 0")
@@ -28,15 +90,52 @@ class MachineCodeGenerator:
         self.code.append("main:")
         self.code.append("")
         
-        for instr in tac_instructions:
+        for instr in main_code:
             self.generate_instruction(instr)
         
         self.code.append("")
         self.code.append("    MOV R0, #0")
         self.code.append("    B _exit")
         
+        # Las funciones van después del programa principal, que nunca cae en ellas
+        for function in functions:
+            self.code.append("")
+            self.frame = self.frame_offsets(function[1], function[2:])
+            for instr in function:
+                self.generate_instruction(instr)
+            self.frame = {}
+        
+        self.code, self.peephole_rewrites = ASM_PEEPHOLE.run(self.code, self)
         return self.code
     
+    def split_functions(self, tac_instructions):
+        """Separa el programa principal de las funciones (de su etiqueta y ENTER a su LEAVE)"""
+        main_code = []
+        functions = []
+        current = None
+        for instr in tac_instructions:
+            if instr.op is OpCode.ENTER and main_code and main_code[-1].op is OpCode.LABEL:
+                current = [main_code.pop()]
+                functions.append(current)
+            (main_code if current is None else current).append(instr)
+            if instr.op is OpCode.LEAVE:
+                current = None
+        return main_code, functions
+    
+    def frame_offsets(self, enter, body):
+        """Desplazamientos respecto a FP de los parámetros y locales de una función.
+        
+        El llamador apila los argumentos en orden antes de BL y ENTER guarda FP y LR,
+        así el último argumento queda en [FP, #8]; los locales van debajo de FP.
+        """
+        params = enter.arg1
+        offsets = {}
+        for i, param in enumerate(params):
+            offsets[param] = 8 + 4 * (len(params) - 1 - i)
+        for i, name in enumerate(frame_locals(params, body)):
+            offsets[name] = -4 * (i + 1)
+        return offsets
+    
     def get_register(self, var):
         if var in self.register_map:
             return self.register_map[var]
@@ -50,16 +149,20 @@ class MachineCodeGenerator:
         if operand is None:
             return None
         
-        try:
-            num = int(operand) if '.' not in str(operand) else float(operand)
+        if isinstance(operand, Const) and operand.is_number:
             reg = self.available_registers[self.next_register % len(self.available_registers)]
             self.next_register += 1
-            self.code.append(f"    MOV {reg}, #{operand}")
+            self.code.append(f"    MOV {reg}, #{operand.value}")
             return reg
-        except:
-            pass
         
-        if operand.startswith('t') or operand.startswith('_'):
+        if operand in self.frame:
+            reg = self.available_registers[self.next_register % len(self.available_registers)]
+            self.next_register += 1
+            self.code.append(f"    LDR {reg}, [FP, #{self.frame[operand]}]")
+            return reg
+        
+        # Los temporales y contadores internos (_it0...) viven en registros
+        if isinstance(operand, Temp):
             return self.get_register(operand)
         
         reg = self.available_registers[self.next_register % len(self.available_registers)]
@@ -69,7 +172,9 @@ class MachineCodeGenerator:
         return reg
     
     def store_value(self, reg, var):
-        if var.startswith('t') or var.startswith('_'):
+        if var in self.frame:
+            self.code.append(f"    STR {reg}, [FP, #{self.frame[var]}]")
+        elif isinstance(var, Temp):
             self.register_map[var] = reg
         else:
             offset = self.memory_map.get(var, 0)
@@ -77,62 +182,78 @@ class MachineCodeGenerator:
     
     def generate_instruction(self, instr):
         
-        if instr.op == 'ASSIGN':
+        if instr.op is OpCode.ASSIGN:
             reg_src = self.load_value(instr.arg1)
             if reg_src:
                 self.store_value(reg_src, instr.result)
         
-        elif instr.op == 'ADD':
+        elif instr.op is OpCode.ADD:
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    ADD {reg_dest}, {reg1}, {reg2}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op == 'SUB':
+        elif instr.op is OpCode.SUB:
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    SUB {reg_dest}, {reg1}, {reg2}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op == 'MUL':
+        elif instr.op is OpCode.MUL:
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    MUL {reg_dest}, {reg1}, {reg2}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op == 'DIV':
+        elif instr.op is OpCode.DIV:
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    DIV {reg_dest}, {reg1}, {reg2}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op == 'MOD':
+        elif instr.op is OpCode.MOD:
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    MOD {reg_dest}, {reg1}, {reg2}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op == 'NEG':
+        elif instr.op in INPLACE_OPS:
+            # x op= v opera sobre el registro de x: sin registro intermedio
+            reg_dest = self.load_value(instr.result)
+            reg_src = self.load_value(instr.arg1)
+            self.code.append(f"    {INPLACE_OPS[instr.op]} {reg_dest}, {reg_dest}, {reg_src}")
+            self.store_value(reg_dest, instr.result)
+        
+        elif instr.op is OpCode.NEG:
             reg_src = self.load_value(instr.arg1)
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    NEG {reg_dest}, {reg_src}")
-            if not instr.result.startswith('t'):
+            if not isinstance(instr.result, Temp):
+                self.store_value(reg_dest, instr.result)
+        
+        elif instr.op is OpCode.NOT:
+            reg_src = self.load_value(instr.arg1)
+            reg_dest = self.get_register(instr.result)
+            self.code.append(f"    CMP {reg_src}, #0")
+            self.code.append(f"    MOVEQ {reg_dest}, #1")
+            self.code.append(f"    MOVNE {reg_dest}, #0")
+            if not isinstance(instr.result, Temp):
                 self.store_value(reg_dest, instr.result)
         
-        elif instr.op in ['EQ', 'NEQ', 'LT', 'GT', 'LTE', 'GTE']:
+        elif instr.op in COMPARISON_OPS:
             op_map = {
-                'EQ': 'EQ', 'NEQ': 'NE', 'LT': 'LT', 
-                'GT': 'GT', 'LTE': 'LE', 'GTE': 'GE'
+                OpCode.EQ: 'EQ', OpCode.NEQ: 'NE', OpCode.LT: 'LT',
+                OpCode.GT: 'GT', OpCode.LTE: 'LE', OpCode.GTE: 'GE'
             }
             reg1 = self.load_value(instr.arg1)
             reg2 = self.load_value(instr.arg2)
@@ -141,50 +262,166 @@ class MachineCodeGenerator:
             self.code.append(f"    MOV{op_map[instr.op]} {reg_dest}, #1")
             self.code.append(f"    MOVN{op_map[instr.op]} {reg_dest}, #0")
         
-        elif instr.op == 'PRINT':
+        elif instr.op is OpCode.PRINT:
             reg = self.load_value(instr.arg1)
             self.code.append(f"    MOV R0, {reg}")
             self.code.append(f"    BL _print_int")
         
-        elif instr.op == 'LABEL':
+        elif instr.op is OpCode.LABEL:
             self.code.append(f"{instr.arg1}:")
         
-        elif instr.op == 'GOTO':
+        elif instr.op is OpCode.GOTO:
             self.code.append(f"    B {instr.arg1}")
         
-        elif instr.op == 'IF_FALSE':
+        elif instr.op is OpCode.IF_FALSE:
             reg = self.load_value(instr.arg1)
             self.code.append(f"    CMP {reg}, #0")
             self.code.append(f"    BEQ {instr.arg2}")
         
-        elif instr.op == 'LIST_CREATE':
+        elif instr.op is OpCode.IF_TRUE:
+            reg = self.load_value(instr.arg1)
+            self.code.append(f"    CMP {reg}, #0")
+            self.code.append(f"    BNE {instr.arg2}")
+        
+        elif instr.op in COMPARE_JUMPS:
+            reg1 = self.load_value(instr.arg1)
+            reg2 = self.load_value(instr.arg2)
+            self.code.append(f"    CMP {reg1}, {reg2}")
+            self.code.append(f"    B{JUMP_CONDITIONS[instr.op]} {instr.result}")
+        
+        elif instr.op is OpCode.LIST_CREATE:
             self.code.append(f"    BL _list_create")
             reg_dest = self.get_register(instr.result)
             self.code.append(f"    MOV {reg_dest}, R0")
         
-        elif instr.op == 'LIST_APPEND':
+        elif instr.op is OpCode.LIST_APPEND:
             reg_list = self.load_value(instr.arg1)
             reg_item = self.load_value(instr.arg2)
             self.code.append(f"    MOV R0, {reg_list}")
             self.code.append(f"    MOV R1, {reg_item}")
             self.code.append(f"    BL _list_append")
         
-        elif instr.op == 'LIST_GET':
+        elif instr.op is OpCode.LIST_GET:
             reg_list = self.load_value(instr.arg1)
             reg_index = self.load_value(instr.arg2)
             reg_dest = self.get_register(instr.result)
+            if instr.in_bounds:
+                # Índice probado en rango: carga directa sin llamar a _list_get
+                # (la palabra 0 de la lista guarda la longitud)
+                self.code.append(f"    ADD R0, {reg_list}, {reg_index}, LSL #2")
+                self.code.append(f"    LDR {reg_dest}, [R0, #4]")
+                return
             self.code.append(f"    MOV R0, {reg_list}")
             self.code.append(f"    MOV R1, {reg_index}")
             self.code.append(f"    BL _list_get")
             self.code.append(f"    MOV {reg_dest}, R0")
         
-        elif instr.op == 'CALL':
+        elif instr.op is OpCode.CALL:
             if instr.arg1 == 'len':
                 reg_list = self.load_value(instr.arg2)
                 reg_dest = self.get_register(instr.result)
                 self.code.append(f"    MOV R0, {reg_list}")
                 self.code.append(f"    BL _list_len")
                 self.code.append(f"    MOV {reg_dest}, R0")
+            elif instr.arg1 not in BUILTIN_FUNCTIONS:
+                # Los argumentos ya están apilados con PARAM; el llamador los desapila
+                self.code.append(f"    BL func_{instr.arg1}")
+                if instr.arg2.value:
+                    self.code.append(f"    ADD SP, SP, #{4 * instr.arg2.value}")
+                reg_dest = self.get_register(instr.result)
+                if reg_dest != 'R0':
+                    self.code.append(f"    MOV {reg_dest}, R0")
+        
+        elif instr.op is OpCode.PARAM:
+            reg = self.load_value(instr.arg1)
+            self.code.append(f"    PUSH {{{reg}}}")
+        
+        elif instr.op is OpCode.ENTER:
+            self.code.append("    PUSH {FP, LR}")
+            self.code.append("    MOV FP, SP")
+            frame_size = 4 * sum(1 for offset in self.frame.values() if offset < 0)
+            if frame_size:
+                self.code.append(f"    SUB SP, SP, #{frame_size}")
+        
+        elif instr.op is OpCode.RETURN and self.frame:
+            if instr.arg1 is not None:
+                reg = self.load_value(instr.arg1)
+                self.code.append(f"    MOV R0, {reg}")
+            self.emit_epilogue()
+        
+        elif instr.op is OpCode.LEAVE:
+            self.emit_epilogue()
+    
+    def emit_epilogue(self):
+        """Libera el marco de la función y vuelve al llamador"""
+        self.code.append("    MOV SP, FP")
+        self.code.append("    POP {FP, PC}")
+    
+    def _redundant_move(self, window, context):
+        """MOV Rx, Rx no hace nada"""
+        move, = window
+        dest, source = instruction_operands(move)
+        if dest != source:
+            return None
+        return []
+    
+    def _load_after_store(self, window, context):
+        """STR Rx, [a] seguido de LDR Ry, [a]: el valor ya está en Rx"""
+        store, load = window
+        source, address = instruction_operands(store)
+        dest, loaded = instruction_operands(load)
+        if address != loaded or not address.startswith(('[SP', '[FP')):
+            return None
+        return [store] if dest == source else [store, f"    MOV {dest}, {source}"]
+    
+    def _store_after_load(self, window, context):
+        """LDR Rx, [a] seguido de STR Rx, [a] guarda el mismo valor"""
+        load, store = window
+        if instruction_operands(load) != instruction_operands(store):
+            return None
+        return [load]
+    
+    def _overwritten_store(self, window, context):
+        """STR seguido de otro STR en la misma dirección: el primero está muerto"""
+        first, second = window
+        if instruction_operands(first)[1] != instruction_operands(second)[1]:
+            return None
+        return [second]
+    
+    def _overwritten_load(self, window, context):
+        """MOV o LDR en Rx seguido de otro que escribe Rx sin leerlo: el primero está muerto"""
+        first, second = window
+        dest, *_ = instruction_operands(first)
+        second_dest, *sources = instruction_operands(second)
+        if dest != second_dest or not re.fullmatch(r'R\d+', dest) or reads_register(sources, dest):
+            return None
+        return [second]
+    
+    def _multiply_by_shift(self, window, context):
+        """MOV Rk, #2^n seguido de MUL Rd, Ra, Rk pasa a LSL Rd, Ra, #n
+        
+        Rk solo guardaba la constante para el producto; entre las dos puede
+        haber otra carga que no lo toque.
+        """
+        move, *middle, multiply = window
+        reg, constant = instruction_operands(move)
+        if middle and reads_register(instruction_operands(middle[0]), reg):
+            return None
+        value = re.fullmatch(r'#(\d+)', constant)
+        value = int(value.group(1)) if value else 0
+        if value < 2 or value & (value - 1):
+            return None
+        dest, left, right = instruction_operands(multiply)
+        if (left == reg) == (right == reg):
+            return None
+        return middle + [f"    LSL {dest}, {right if left == reg else left}, #{value.bit_length() - 1}"]
+    
+    def _branch_to_next(self, window, context):
+        """B L seguido de la etiqueta L sobra"""
+        branch, label = window
+        if instruction_operands(branch)[0] + ':' != label.strip():
+            return None
+        return [label]
     
     def get_code_as_string(self):
         return '\n'.join(self.code)
@@ -2,45 +2,89 @@
 ; ==================================================================================================
 
 .data
-    result: .word 0
-    resultado1: .word 0
+    n_2: .word 0
+    temp_2: .word 0
     resultado2: .word 0
+    n_3: .word 0
+    temp_3: .word 0
     resultado3: .word 0
+    n_4: .word 0
+    temp_4: .word 0
     resultado4: .word 0
 
 .text
     .globl main
 main:
 
-func_factorial:
-    LDR R0, [SP, #0]
-    MOV R1, #0
-    CMP R0, R1
-    MOVEQ R2, #1
-    MOVNEQ R2, #0
-    CMP R2, #0
-    BEQ L0
-    B L1
-L0:
+    MOV R0, #1
+    BL _print_int
+    MOV R1, #1
+    STR R1, [SP, #0]
+    MOV R2, #1
+L7:
     LDR R3, [SP, #0]
-    MOV R4, #1
-    SUB R5, R3, R4
-    STR R6, [SP, #0]
-L1:
+    MOV R4, #0
+    CMP R3, R4
+    BNE L8
+    B L10
+L8:
+    LDR R5, [SP, #0]
+    MOV R6, #1
+    SUB R7, R5, R6
     STR R7, [SP, #4]
-    LDR R0, [SP, #4]
-    MOV R0, R0
-    BL _print_int
-    STR R1, [SP, #8]
-    LDR R2, [SP, #8]
+    LDR R0, [SP, #0]
+    MUL R2, R2, R0
+    LDR R1, [SP, #4]
+    STR R1, [SP, #0]
+    B L7
+L10:
+    STR R2, [SP, #8]
     MOV R0, R2
     BL _print_int
+    MOV R3, #3
+    STR R3, [SP, #12]
+    MOV R4, #1
+L11:
+    LDR R5, [SP, #12]
+    MOV R6, #0
+    CMP R5, R6
+    BNE L12
+    B L14
+L12:
+    LDR R7, [SP, #12]
+    MOV R0, #1
+    SUB R1, R7, R0
+    STR R1, [SP, #16]
+    LDR R2, [SP, #12]
+    MUL R4, R4, R2
+    LDR R3, [SP, #16]
     STR R3, [SP, #12]
-    LDR R4, [SP, #12]
+    B L11
+L14:
+    STR R4, [SP, #20]
     MOV R0, R4
     BL _print_int
-    STR R5, [SP, #16]
-    LDR R6, [SP, #16]
+    MOV R5, #5
+    STR R5, [SP, #24]
+    MOV R6, #1
+L15:
+    LDR R7, [SP, #24]
+    MOV R0, #0
+    CMP R7, R0
+    BNE L16
+    B L18
+L16:
+    LDR R1, [SP, #24]
+    MOV R2, #1
+    SUB R3, R1, R2
+    STR R3, [SP, #28]
+    LDR R4, [SP, #24]
+    MUL R6, R6, R4
+    LDR R5, [SP, #28]
+    STR R5, [SP, #24]
+    B L15
+L18:
+    STR R6, [SP, #32]
     MOV R0, R6
     BL _print_int
 
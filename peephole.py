@@ -0,0 +1,115 @@
+"""
+Optimización de Mirilla (peephole)
+Reescribe ventanas de 1 a 3 instrucciones consecutivas según una tabla
+declarativa de reglas; el mismo motor recorre el código TAC y el ensamblador
+"""
+
+
+# Tamaño máximo de la ventana de una regla
+MAX_WINDOW = 3
+
+
+class PeepholeRule:
+    """Regla de mirilla
+
+    pattern da la clave de cada instrucción de la ventana (el código de
+    operación en el TAC, el mnemónico en el ensamblador): una clave, un
+    conjunto de claves o None, que acepta cualquiera salvo en la última
+    posición. rewrite es el nombre del método del dueño de la pasada que
+    recibe la ventana y el contexto y devuelve las instrucciones que la
+    sustituyen, o None si la regla no se aplica. kind y detail describen la
+    reescritura en los reportes; detail se formatea solo al mostrarla, con
+    la ventana en {before} y el reemplazo en {after}.
+    """
+
+    def __init__(self, pattern, rewrite, kind, detail="{before} -> {after}"):
+        if not 1 <= len(pattern) <= MAX_WINDOW or pattern[-1] is None:
+            raise ValueError(f"Patrón de mirilla no válido: {pattern}")
+        self.pattern = tuple(frozenset(keys) if isinstance(keys, (set, frozenset, tuple)) else keys
+                             for keys in pattern)
+        self.rewrite = rewrite
+        self.kind = kind
+        self.detail = detail
+
+    def matches(self, keys):
+        """Indica si las claves de una ventana encajan en el patrón"""
+        for expected, key in zip(self.pattern, keys):
+            if expected is None:
+                continue
+            if isinstance(expected, frozenset):
+                if key not in expected:
+                    return False
+            elif key != expected:
+                return False
+        return True
+
+
+class Window(tuple):
+    """Instrucciones consecutivas; su texto las separa con '; '"""
+    __slots__ = ()
+
+    def __str__(self):
+        return '; '.join(str(item).strip() for item in self)
+
+
+class Rewrite:
+    """Reescritura aplicada: regla, posición del reemplazo en el código
+    resultante, ventana original y reemplazo"""
+    __slots__ = ('rule', 'index', 'before', 'after')
+
+    def __init__(self, rule, index, before, after):
+        self.rule = rule
+        self.index = index
+        self.before = before
+        self.after = after
+
+    def __str__(self):
+        return f"{self.rule.kind}: {self.rule.detail.format(before=self.before, after=self.after)}"
+
+
+class Peephole:
+    """Aplica una tabla de reglas de mirilla en un solo recorrido
+
+    Las reglas se indexan por la clave de la última instrucción de su ventana:
+    al llegar una instrucción solo se prueban las reglas que pueden terminar en
+    ella, en el orden de la tabla. El reemplazo vuelve a la entrada, así una
+    reescritura puede habilitar otra sobre las instrucciones anteriores (dos
+    goto seguidos a la misma etiqueta) sin recorrer otra vez el código.
+    """
+
+    def __init__(self, rules, key):
+        self.key = key
+        self.index = {}  # {clave de la última instrucción: reglas}
+        for rule in rules:
+            last = rule.pattern[-1]
+            for name in (last if isinstance(last, frozenset) else (last,)):
+                self.index.setdefault(name, []).append(rule)
+
+    def run(self, items, owner, context=None):
+        """Reescribe items con los métodos de owner que nombran las reglas
+
+        Returns:
+            tuple: (instrucciones resultantes, reescrituras aplicadas)
+        """
+        output = []
+        keys = []
+        pending = list(reversed(items))
+        rewrites = []
+        while pending:
+            item = pending.pop()
+            output.append(item)
+            keys.append(self.key(item))
+            for rule in self.index.get(keys[-1], ()):
+                size = len(rule.pattern)
+                if size > len(output) or not rule.matches(keys[-size:]):
+                    continue
+                window = Window(output[-size:])
+                replacement = getattr(owner, rule.rewrite)(window, context)
+                if replacement is None:
+                    continue
+                del output[-size:]
+                del keys[-size:]
+                pending.extend(reversed(replacement))
+                rewrites.append(Rewrite(rule, len(output), window, Window(replacement)))
+                break
+        return output, rewrites
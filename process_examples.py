@@ -7,22 +7,28 @@ import os
 from python_compiler import Lexer, Parser, LexerError, ParserError
 from semantic_analyzer import SemanticAnalyzer, SemanticError
 from tac_generator import TACGenerator
-from tac_optimizer import TACOptimizer
+from semantic_tac_generator import SemanticTACGenerator
+from tac_optimizer import TACOptimizer, DEFAULT_LEVEL
 from machine_code_generator import MachineCodeGenerator
 
 
 class ExampleProcessor:
     """Procesa un ejemplo completo a través de todas las fases del compilador"""
     
-    def __init__(self, example_path):
+    def __init__(self, example_path, fused=False, opt_level=DEFAULT_LEVEL):
         self.example_path = example_path
+        # Si fused es True, el análisis semántico también genera el TAC (una sola pasada)
+        self.fused = fused
+        self.opt_level = opt_level  # Nivel de optimización del TAC (-O0, -O1, -O2)
         self.example_name = os.path.basename(example_path).replace('.py', '')
         self.source_code = None
         self.tokens = None
         self.ast = None
         self.symbol_table = None
         self.tac_instructions = None
+        self.tac_generator = None
         self.tac_optimized = None
+        self.tac_optimizer = None
         self.assembly_code = None
         self.errors = []
     
@@ -69,8 +75,15 @@ class ExampleProcessor:
     def run_semantic_analyzer(self):
         """Ejecuta el análisis semántico"""
         try:
-            analyzer = SemanticAnalyzer()
-            success = analyzer.analyze(self.ast)
+            if self.fused:
+                generator = SemanticTACGenerator()
+                self.tac_instructions = generator.generate(self.ast)
+                self.tac_generator = generator
+                analyzer = generator.analyzer
+                success = generator.success
+            else:
+                analyzer = SemanticAnalyzer()
+                success = analyzer.analyze(self.ast)
             self.symbol_table = analyzer.symbol_table
             
             if not success:
@@ -91,9 +104,13 @@ class ExampleProcessor:
     
     def run_tac_generator(self):
         """Ejecuta el generador de código intermedio"""
+        if self.fused and self.tac_instructions is not None:
+            # Ya generado durante el análisis semántico
+            return True
         try:
             generator = TACGenerator()
             self.tac_instructions = generator.generate(self.ast)
+            self.tac_generator = generator
             return True
         except Exception as e:
             self.errors.append(f"Error en generación TAC: {e}")
@@ -102,8 +119,9 @@ class ExampleProcessor:
     def run_tac_optimizer(self):
         """Ejecuta el optimizador de código TAC"""
         try:
-            optimizer = TACOptimizer()
+            optimizer = TACOptimizer(self.opt_level)
             self.tac_optimized = optimizer.optimize(self.tac_instructions)
+            self.tac_optimizer = optimizer
             return True
         except Exception as e:
             self.errors.append(f"Error en optimización TAC: {e}")
@@ -261,6 +279,8 @@ class ExampleProcessor:
             print(self.format_error_report())
             return False
         print(f"✓ {len(self.tac_instructions)} instrucciones TAC generadas")
+        for line in self.tac_generator.get_temp_report().splitlines():
+            print(f"  {line}")
         tac_path = self.save_tac(output_dir)
         print(f"  Guardado en: {tac_path}")
         
@@ -270,6 +290,8 @@ class ExampleProcessor:
             print(self.format_error_report())
             return False
         print(f"✓ {len(self.tac_optimized)} instrucciones TAC optimizadas")
+        for line in self.tac_optimizer.get_pass_report().splitlines():
+            print(f"  {line}")
         tac_opt_path = self.save_tac_optimized(output_dir)
         print(f"  Guardado en: {tac_opt_path}")
         
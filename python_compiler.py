@@ -37,6 +37,9 @@ class TokenType(Enum):
     DEL = auto()
     BREAK = auto()
     CONTINUE = auto()
+    AND = auto()
+    OR = auto()
+    NOT = auto()
     
     # Literales
     NUMBER = auto()
@@ -66,6 +69,11 @@ class TokenType(Enum):
     
     # Asignación
     ASSIGN = auto()
+    PLUS_ASSIGN = auto()
+    MINUS_ASSIGN = auto()
+    MULTIPLY_ASSIGN = auto()
+    DIVIDE_ASSIGN = auto()
+    MODULO_ASSIGN = auto()
     
     # Delimitadores
     LPAREN = auto()
@@ -123,6 +131,18 @@ KEYWORDS = {
     'del': TokenType.DEL,
     'break': TokenType.BREAK,
     'continue': TokenType.CONTINUE,
+    'and': TokenType.AND,
+    'or': TokenType.OR,
+    'not': TokenType.NOT,
+}
+
+# Asignaciones aumentadas: x += e equivale a x = x + e
+AUGMENTED_ASSIGNMENTS = {
+    '+=': TokenType.PLUS_ASSIGN,
+    '-=': TokenType.MINUS_ASSIGN,
+    '*=': TokenType.MULTIPLY_ASSIGN,
+    '/=': TokenType.DIVIDE_ASSIGN,
+    '%=': TokenType.MODULO_ASSIGN,
 }
 
 
@@ -280,6 +300,9 @@ class Lexer:
                 self.advance()
                 self.advance()
                 self.tokens.append(Token(TokenType.GREATER_EQUAL, '>=', start_line, start_column))
+            elif char in '+-*/%' and self.peek(1) == '=':
+                operator = self.advance() + self.advance()
+                self.tokens.append(Token(AUGMENTED_ASSIGNMENTS[operator], operator, start_line, start_column))
             elif char == '+':
                 self.advance()
                 self.tokens.append(Token(TokenType.PLUS, '+', start_line, start_column))
@@ -357,6 +380,14 @@ class AssignmentNode(ASTNode):
         self.expression = expression
         self.line = line
 
+class AugAssignNode(ASTNode):
+    def __init__(self, identifier, operator, expression, line=0):
+        # operator es el operador binario: en x += e es '+'
+        self.identifier = identifier
+        self.operator = operator
+        self.expression = expression
+        self.line = line
+
 class IndexAssignmentNode(ASTNode):
     def __init__(self, target, index_expr, value_expr, line=0):
         # target puede ser un string (nombre simple) o un IndexNode (acceso anidado)
@@ -403,6 +434,14 @@ class BinaryOpNode(ASTNode):
         self.right = right
         self.line = line
 
+class BoolOpNode(ASTNode):
+    def __init__(self, left, operator, right, line=0):
+        # operator es 'and' u 'or': el operando derecho solo se evalúa si hace falta
+        self.left = left
+        self.operator = operator
+        self.right = right
+        self.line = line
+
 class UnaryOpNode(ASTNode):
     def __init__(self, operator, operand, line=0):
         self.operator = operator
@@ -545,6 +584,8 @@ class Parser:
             next_token = self.tokens[self.position + 1] if self.position + 1 < len(self.tokens) else None
             if next_token and next_token.type == TokenType.ASSIGN:
                 return self.parse_assignment()
+            elif next_token and next_token.type in AUGMENTED_ASSIGNMENTS.values():
+                return self.parse_aug_assignment()
             elif next_token and next_token.type == TokenType.LBRACKET:
                 return self.parse_list_assignment()
             else:
@@ -583,6 +624,14 @@ class Parser:
         expression = self.parse_expression()
         return AssignmentNode(identifier, expression, line)
     
+    def parse_aug_assignment(self):
+        line = self.current_token.line
+        identifier = self.expect(TokenType.IDENTIFIER).value
+        operator = self.current_token.value[:-1]
+        self.advance()
+        expression = self.parse_expression()
+        return AugAssignNode(identifier, operator, expression, line)
+    
     def parse_list_assignment(self):
         line = self.current_token.line
         identifier = self.current_token.value
@@ -757,6 +806,31 @@ class Parser:
         return BlockNode(statements)
     
     def parse_expression(self):
+        return self.parse_or()
+    
+    def parse_or(self):
+        left = self.parse_and()
+        while self.current_token.type == TokenType.OR:
+            line = self.current_token.line
+            self.advance()
+            right = self.parse_and()
+            left = BoolOpNode(left, 'or', right, line)
+        return left
+    
+    def parse_and(self):
+        left = self.parse_not()
+        while self.current_token.type == TokenType.AND:
+            line = self.current_token.line
+            self.advance()
+            right = self.parse_not()
+            left = BoolOpNode(left, 'and', right, line)
+        return left
+    
+    def parse_not(self):
+        if self.current_token.type == TokenType.NOT:
+            line = self.current_token.line
+            self.advance()
+            return UnaryOpNode('not', self.parse_not(), line)
         return self.parse_comparison()
     
     def parse_comparison(self):
@@ -9,8 +9,7 @@ import sys
 import importlib
 
 from python_compiler import *
-from semantic_analyzer import SemanticAnalyzer
-from tac_generator import TACGenerator
+from semantic_tac_generator import SemanticTACGenerator
 from tac_optimizer import TACOptimizer
 from machine_code_generator import MachineCodeGenerator
 from reglas_semanticas import REGLAS_SEMANTICAS, obtener_reglas_por_fase, obtener_nombre_fase
@@ -567,9 +566,10 @@ class PythonCompilerIDE:
             self.ast = parser.parse()
             self.display_syntax_analysis()
             
-            # Fase 3: Análisis Semántico
-            self.semantic_analyzer = SemanticAnalyzer()
-            self.semantic_analyzer.analyze(self.ast)
+            # Fases 3 y 4: Análisis Semántico y Código Intermedio en una sola pasada
+            tac_gen = SemanticTACGenerator()
+            tac_instructions = tac_gen.generate(self.ast)
+            self.semantic_analyzer = tac_gen.analyzer
             self.display_semantic_analysis()
             
             # Verificar si hay errores semánticos
@@ -581,12 +581,11 @@ class PythonCompilerIDE:
                 return
             
             # Fase 4: Generación de Código Intermedio
-            tac_gen = TACGenerator()
-            self.tac_instructions = tac_gen.generate(self.ast)
+            self.tac_instructions = tac_instructions
             self.display_intermediate_code()
             
             # Fase 5: Optimización
-            optimizer = TACOptimizer()
+            optimizer = TACOptimizer(record_events=True)
             self.optimized_tac = optimizer.optimize(self.tac_instructions)
             self.display_optimization(optimizer)
             
@@ -666,6 +665,11 @@ class PythonCompilerIDE:
             result += f"{indent_str}│  ├─ Variable: {node.identifier}\n"
             result += f"{indent_str}│  └─ Expresión:\n"
             result += self.format_ast(node.expression, indent + 2)
+        elif isinstance(node, AugAssignNode):
+            result += f"{indent_str}│  ├─ Variable: {node.identifier}\n"
+            result += f"{indent_str}│  ├─ Operador: {node.operator}=\n"
+            result += f"{indent_str}│  └─ Expresión:\n"
+            result += self.format_ast(node.expression, indent + 2)
         elif isinstance(node, PrintNode):
             result += f"{indent_str}│  └─ Expresión:\n"
             result += self.format_ast(node.expression, indent + 2)
@@ -688,7 +692,7 @@ class PythonCompilerIDE:
             result += self.format_ast(node.iterable, indent + 2)
             result += f"{indent_str}│  └─ Bloque:\n"
             result += self.format_ast(node.block, indent + 2)
-        elif isinstance(node, BinaryOpNode):
+        elif isinstance(node, (BinaryOpNode, BoolOpNode)):
             result += f"{indent_str}│  ├─ Operador: {node.operator}\n"
             result += f"{indent_str}│  ├─ Izquierda:\n"
             result += self.format_ast(node.left, indent + 2)
@@ -745,6 +749,7 @@ class PythonCompilerIDE:
         output += f"Reducción: {len(self.tac_instructions) - len(self.optimized_tac)} instrucciones\n\n"
         
         output += optimizer.get_optimizations_report()
+        output += "\n" + optimizer.get_pass_report()
         
         self.optimization_text.insert('1.0', output)
     
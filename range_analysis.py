@@ -0,0 +1,180 @@
+"""
+Análisis de Rangos de Valores
+Calcula hechos de rango para variables de inducción y longitudes de listas,
+y marca los accesos a índice que nunca pueden salir de los límites
+"""
+
+from python_compiler import *
+
+
+# Funciones que no pueden modificar listas del programa
+BUILTIN_FUNCTIONS = ('len', 'range', 'print', 'input', 'int', 'float', 'str')
+
+
+def iter_children(node):
+    """Recorre los nodos hijos directos de un nodo del AST"""
+    for value in vars(node).values():
+        yield from _iter_nodes(value)
+
+
+def _iter_nodes(value):
+    if isinstance(value, ASTNode):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_nodes(item)
+
+
+def walk(node):
+    """Recorre un subárbol en preorden"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(iter_children(current))
+
+
+class BodyEffects:
+    """Efectos de un bloque que pueden invalidar un hecho de rango"""
+
+    def __init__(self, block):
+        self.assigned = set()      # Nombres reasignados en el bloque
+        self.shrinks = False       # Contiene del lista[i]
+        self.calls_user = False    # Llama a funciones definidas por el usuario
+        for node in walk(block):
+            if isinstance(node, (AssignmentNode, AugAssignNode)):
+                self.assigned.add(node.identifier)
+            elif isinstance(node, ForNode):
+                self.assigned.add(node.identifier)
+            elif isinstance(node, FunctionNode):
+                self.assigned.update(node.params)
+            elif isinstance(node, DelNode):
+                if isinstance(node.target, IdentifierNode):
+                    self.assigned.add(node.target.name)
+                else:
+                    self.shrinks = True
+            elif isinstance(node, CallNode):
+                if node.function not in BUILTIN_FUNCTIONS and '.' not in node.function:
+                    self.calls_user = True
+
+
+class RangeAnalyzer:
+    """Hechos de rango sobre el AST para eliminar comprobaciones de límites.
+
+    Un acceso lista[i] se marca con in_bounds = True cuando se puede probar
+    0 <= i < len(lista). Los hechos usados son:
+
+    - Longitud mínima de una lista asignada una sola vez desde un literal,
+      si el programa no contiene ningún del lista[i].
+    - Rango de la variable de un for sobre range(len(lista)) o range(n): su
+      valor está en [0, límite) mientras el cuerpo no la reasigne ni acorte
+      la lista.
+    """
+
+    def __init__(self):
+        self.list_lengths = {}  # {lista: longitud mínima garantizada}
+        self.induction = {}     # {variable: lista o longitud que acota su rango}
+        self.program_shrinks = False
+        self.safe_accesses = 0
+
+    def analyze(self, ast):
+        """Calcula los hechos y marca los accesos seguros; devuelve cuántos hay"""
+        self.collect_list_lengths(ast)
+        self.visit(ast)
+        return self.safe_accesses
+
+    def collect_list_lengths(self, ast):
+        effects = BodyEffects(ast)
+        self.program_shrinks = effects.shrinks
+        if self.program_shrinks:
+            return
+
+        definitions = {}
+        for node in walk(ast):
+            if isinstance(node, AssignmentNode):
+                definitions.setdefault(node.identifier, []).append(node.expression)
+            elif isinstance(node, (AugAssignNode, ForNode)):
+                definitions.setdefault(node.identifier, []).append(None)
+            elif isinstance(node, FunctionNode):
+                for param in node.params:
+                    definitions.setdefault(param, []).append(None)
+            elif isinstance(node, DelNode) and isinstance(node.target, IdentifierNode):
+                definitions.setdefault(node.target.name, []).append(None)
+
+        for name, values in definitions.items():
+            if len(values) == 1 and isinstance(values[0], ListNode):
+                self.list_lengths[name] = len(values[0].elements)
+
+    def visit(self, node):
+        method_name = f'visit_{type(node).__name__}'
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node):
+        for child in iter_children(node):
+            self.visit(child)
+
+    def visit_FunctionNode(self, node):
+        # Dentro de la función las variables de inducción del llamador no aplican
+        saved = self.induction
+        self.induction = {}
+        self.visit(node.body)
+        self.induction = saved
+
+    def visit_ForNode(self, node):
+        self.visit(node.iterable)
+        effects = BodyEffects(node.block)
+        stable = not effects.shrinks and not (effects.calls_user and self.program_shrinks)
+        iterable = node.iterable
+        bound = None
+
+        # Recorrer una lista no indexa en el TAC: su iterador no sale de los límites
+        if isinstance(iterable, CallNode) and iterable.function == 'range':
+            # range(n) recorre [0, n) con paso 1
+            if len(iterable.args) == 1 and stable and node.identifier not in effects.assigned:
+                bound = self.range_bound(iterable.args[0], effects)
+
+        # Los hechos externos siguen valiendo: este cuerpo forma parte del cuerpo externo
+        saved = self.induction
+        if bound is not None:
+            self.induction = dict(saved)
+            self.induction[node.identifier] = bound
+        self.visit(node.block)
+        self.induction = saved
+
+    def range_bound(self, limit, effects):
+        """Lista o longitud constante que acota el rango del contador"""
+        if isinstance(limit, CallNode) and limit.function == 'len' and len(limit.args) == 1:
+            target = limit.args[0]
+            if isinstance(target, IdentifierNode) and target.name not in effects.assigned:
+                return target.name
+        elif isinstance(limit, NumberNode) and isinstance(limit.value, int):
+            return limit.value
+        return None
+
+    def visit_IndexNode(self, node):
+        self.generic_visit(node)
+        if isinstance(node.list_expr, IdentifierNode) and \
+                self.in_bounds(node.list_expr.name, node.index_expr):
+            self.mark(node)
+
+    def visit_IndexAssignmentNode(self, node):
+        self.generic_visit(node)
+        if isinstance(node.target, str) and self.in_bounds(node.target, node.index_expr):
+            self.mark(node)
+
+    def in_bounds(self, list_name, index):
+        """Indica si 0 <= index < len(list_name) está garantizado"""
+        length = self.list_lengths.get(list_name, 0)
+        if isinstance(index, NumberNode):
+            return isinstance(index.value, int) and 0 <= index.value < length
+        if isinstance(index, IdentifierNode) and index.name in self.induction:
+            limit = self.induction[index.name]
+            if isinstance(limit, str):
+                return limit == list_name
+            return limit <= length
+        return False
+
+    def mark(self, node):
+        node.in_bounds = True
+        self.safe_accesses += 1
@@ -3,16 +3,29 @@ Base de Datos de Reglas Semánticas
 Contiene todas las reglas semánticas con su gramática, producciones, acciones y ejemplos
 """
 
+from types import MappingProxyType
+
+
+FASES = ("lexico", "sintactico", "semantico", "codigo")
+
 
 class ReglaSemantica:
-    """Representa una regla semántica individual"""
+    """Representa una regla semántica individual (inmutable)"""
+    __slots__ = ('id_regla', 'regla_gramatical', 'produccion', 'accion_semantica', 'ejemplo', 'fase')
+    
     def __init__(self, id_regla, regla_gramatical, produccion, accion_semantica, ejemplo, fase):
-        self.id_regla = id_regla
-        self.regla_gramatical = regla_gramatical
-        self.produccion = produccion
-        self.accion_semantica = accion_semantica
-        self.ejemplo = ejemplo
-        self.fase = fase  # 'lexico', 'sintactico', 'semantico', 'codigo'
+        valores = (id_regla, regla_gramatical, produccion, accion_semantica, ejemplo, fase)
+        for campo, valor in zip(self.__slots__, valores):
+            object.__setattr__(self, campo, valor)
+    
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"ReglaSemantica es inmutable: no se puede asignar '{nombre}'")
+    
+    def __delattr__(self, nombre):
+        raise AttributeError(f"ReglaSemantica es inmutable: no se puede borrar '{nombre}'")
+    
+    def __repr__(self):
+        return f"ReglaSemantica({self.id_regla!r}, fase={self.fase!r})"
     
     def a_diccionario(self):
         return {
@@ -26,7 +39,7 @@ class ReglaSemantica:
 
 
 # Base de datos completa de reglas semánticas
-REGLAS_SEMANTICAS = [
+REGLAS_SEMANTICAS = (
     # FASE LÉXICA
     ReglaSemantica(
         id_regla="L01",
@@ -314,25 +327,41 @@ REGLAS_SEMANTICAS = [
         ejemplo="x == 5 → LOAD x\nLOAD 5\nCMP_EQ\nSTORE temp",
         fase="codigo"
     ),
-]
+)
+
+
+def _construir_indices(reglas):
+    """Construye una sola vez los índices por ID y por fase"""
+    por_id = {}
+    por_fase = {fase: [] for fase in FASES}
+    for regla in reglas:
+        if regla.id_regla in por_id:
+            raise ValueError(f"ID de regla duplicado: {regla.id_regla}")
+        por_id[regla.id_regla] = regla
+        por_fase.setdefault(regla.fase, []).append(regla)
+    return (
+        MappingProxyType(por_id),
+        MappingProxyType({fase: tuple(lista) for fase, lista in por_fase.items()}),
+    )
+
+
+# Índices de solo lectura: {id: regla} y {fase: (reglas,)}
+REGLAS_POR_ID, REGLAS_POR_FASE = _construir_indices(REGLAS_SEMANTICAS)
 
 
 def obtener_reglas_por_fase(fase):
     """Obtener todas las reglas para una fase específica de compilación"""
-    return [regla for regla in REGLAS_SEMANTICAS if regla.fase == fase]
+    return REGLAS_POR_FASE.get(fase, ())
 
 
 def obtener_regla_por_id(id_regla):
     """Obtener una regla específica por su ID"""
-    for regla in REGLAS_SEMANTICAS:
-        if regla.id_regla == id_regla:
-            return regla
-    return None
+    return REGLAS_POR_ID.get(id_regla)
 
 
 def obtener_todas_fases():
     """Obtener lista de todas las fases de compilación"""
-    return ["lexico", "sintactico", "semantico", "codigo"]
+    return list(FASES)
 
 
 def obtener_nombre_fase(fase):
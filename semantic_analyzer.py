@@ -3,7 +3,10 @@ Analizador Semántico
 Verifica que las variables estén declaradas antes de usarse y que los tipos sean compatibles
 """
 
+from collections.abc import Sequence
 from python_compiler import *
+from range_analysis import RangeAnalyzer
+from reglas_semanticas import obtener_regla_por_id
 
 
 class SemanticError(Exception):
@@ -11,24 +14,162 @@ class SemanticError(Exception):
     pass
 
 
+# Plantillas de los diagnósticos semánticos: código -> mensaje
+# Los argumentos se interpolan solo cuando el mensaje se muestra
+MENSAJES_DIAGNOSTICO = {
+    'variable_no_declarada': "Variable '{0}' no está declarada antes de usarse",
+    'variable_no_inicializada': "Variable '{0}' podría no estar inicializada",
+    'cambio_de_tipo': "Variable '{0}' cambia de tipo de '{1}' a '{2}'",
+    'concatenacion_invalida': "No se puede concatenar {0} con {1}. Ambos deben ser strings.",
+    'operando_izquierdo_no_numerico': "Operando izquierdo de '{0}' debe ser numérico, se encontró '{1}'",
+    'operando_derecho_no_numerico': "Operando derecho de '{0}' debe ser numérico, se encontró '{1}'",
+    'division_por_cero': "Posible división por cero",
+    'comparacion_invalida': "No se puede comparar '{0}' con '{1}' usando '{2}'",
+    'condicion_no_booleana': "La condición del {0} es de tipo '{1}', se esperaba un valor booleano",
+    'for_no_iterable': "El for requiere un iterable (range o lista), se encontró '{0}'",
+    'negacion_no_numerica': "El operador '-' requiere un operando numérico, se encontró '{0}'",
+    'indice_sin_lista': "El acceso por índice requiere una lista, se encontró '{0}'",
+    'indice_no_entero': "El índice debe ser un entero, se encontró '{0}'",
+    'range_sin_argumentos': "range() requiere al menos un argumento",
+    'range_no_entero': "range() requiere un argumento entero, se encontró '{0}'",
+    'len_num_argumentos': "len() requiere exactamente un argumento",
+    'len_tipo_invalido': "len() requiere una lista o string, se encontró '{0}'",
+}
+
+# Regla semántica (reglas_semanticas.py) que aplica cada diagnóstico
+REGLA_DIAGNOSTICO = {
+    'variable_no_declarada': 'S02',
+    'variable_no_inicializada': 'S02',
+    'cambio_de_tipo': 'S09',
+    'concatenacion_invalida': 'S05',
+    'operando_izquierdo_no_numerico': 'S04',
+    'operando_derecho_no_numerico': 'S04',
+    'division_por_cero': 'S10',
+    'comparacion_invalida': 'S03',
+    'condicion_no_booleana': 'S06',
+    'for_no_iterable': 'S08',
+    'negacion_no_numerica': 'S04',
+    'indice_sin_lista': 'S03',
+    'indice_no_entero': 'S03',
+    'range_sin_argumentos': 'S08',
+    'range_no_entero': 'S08',
+    'len_num_argumentos': 'S03',
+    'len_tipo_invalido': 'S03',
+}
+
+
+class Diagnostic:
+    """Diagnóstico semántico compacto; el mensaje se formatea al mostrarse"""
+    __slots__ = ('code', 'line', 'node', 'args', 'rule_id')
+    
+    def __init__(self, code, line=0, node=None, args=()):
+        self.code = code
+        self.line = line
+        self.node = node
+        self.args = args
+        self.rule_id = REGLA_DIAGNOSTICO.get(code)
+    
+    @property
+    def rule(self):
+        """Regla semántica asociada, o None"""
+        return obtener_regla_por_id(self.rule_id)
+    
+    @property
+    def message(self):
+        """Mensaje sin prefijo de línea"""
+        template = MENSAJES_DIAGNOSTICO.get(self.code)
+        if template is None:
+            # Mensaje libre registrado sin código del catálogo
+            return self.code
+        return template.format(*self.args)
+    
+    def __str__(self):
+        return f"Línea {self.line}: {self.message}" if self.line else self.message
+    
+    def __repr__(self):
+        return f"Diagnostic({self.code!r}, line={self.line}, args={self.args!r})"
+
+
+class DiagnosticList(Sequence):
+    """Vista de solo lectura que formatea los diagnósticos al accederlos"""
+    
+    def __init__(self, records):
+        self.records = records
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [str(record) for record in self.records[index]]
+        return str(self.records[index])
+    
+    def __repr__(self):
+        return repr(list(self))
+
+
 class SemanticAnalyzer:
     """Analizador Semántico que verifica variables y tipos"""
     
-    def __init__(self):
+    def __init__(self, max_per_code=None, dedup=False):
         self.symbol_table = {}  # {nombre_variable: {'type': tipo, 'initialized': bool, 'line': linea}}
-        self.errors = []
-        self.warnings = []
+        self.error_records = []
+        self.warning_records = []
         self.current_scope = 'global'
+        # Límite de diagnósticos almacenados por código (None = sin límite)
+        self.max_per_code = max_per_code
+        # Si dedup está activo, un mismo código con los mismos argumentos se registra una sola vez
+        self.dedup = dedup
+        self.error_total = 0  # Incluye errores omitidos por límite
+        self.code_counts = {}  # {código: diagnósticos registrados}
+        self.suppressed = {}  # {código: diagnósticos omitidos por límite o duplicado}
+        self._seen = set()
+        # Mientras sea mayor que cero no se registran diagnósticos
+        self.muted = 0
+        # Hechos de rango de valores (variables de inducción y longitudes de listas)
+        self.range_facts = None
+    
+    @property
+    def errors(self):
+        """Errores formateados bajo demanda"""
+        return DiagnosticList(self.error_records)
+    
+    @property
+    def warnings(self):
+        """Advertencias formateadas bajo demanda"""
+        return DiagnosticList(self.warning_records)
+    
+    def _record(self, records, code, args, line, node):
+        """Registra un diagnóstico respetando el límite y la deduplicación por código"""
+        if self.dedup:
+            key = (code, args)
+            if key in self._seen:
+                self.suppressed[code] = self.suppressed.get(code, 0) + 1
+                return
+            self._seen.add(key)
+        
+        count = self.code_counts.get(code, 0)
+        if self.max_per_code is not None and count >= self.max_per_code:
+            self.suppressed[code] = self.suppressed.get(code, 0) + 1
+            return
+        self.code_counts[code] = count + 1
+        
+        if not line and node is not None:
+            line = getattr(node, 'line', 0)
+        records.append(Diagnostic(code, line, node, args))
     
-    def error(self, message, line=0):
+    def error(self, code, *args, line=0, node=None):
         """Registra un error semántico"""
-        error_msg = f"Línea {line}: {message}" if line else message
-        self.errors.append(error_msg)
+        if self.muted:
+            return
+        self.error_total += 1
+        self._record(self.error_records, code, args, line, node)
     
-    def warning(self, message, line=0):
+    def warning(self, code, *args, line=0, node=None):
         """Registra una advertencia"""
-        warn_msg = f"Línea {line}: {message}" if line else message
-        self.warnings.append(warn_msg)
+        if self.muted:
+            return
+        self._record(self.warning_records, code, args, line, node)
     
     def infer_type(self, node):
         """Infiere el tipo de una expresión"""
@@ -41,45 +182,60 @@ class SemanticAnalyzer:
                 return self.symbol_table[node.name]['type']
             else:
                 return 'unknown'
-        elif isinstance(node, BinaryOpNode):
+        elif isinstance(node, (BinaryOpNode, BoolOpNode)):
             left_type = self.infer_type(node.left)
             right_type = self.infer_type(node.right)
-            
-            # Operaciones de comparación siempre devuelven bool
-            if node.operator in ['==', '!=', '<', '>', '<=', '>=']:
-                return 'bool'
-            
-            # Operaciones aritméticas
-            if node.operator in ['+', '-', '*', '/', '%']:
-                # Si alguno es float, el resultado es float
-                if left_type == 'float' or right_type == 'float':
-                    return 'float'
-                # Si ambos son int, el resultado es int (excepto división)
-                if left_type == 'int' and right_type == 'int':
-                    return 'float' if node.operator == '/' else 'int'
-                # Si uno es string y el operador es +, es concatenación
-                if (left_type == 'str' or right_type == 'str') and node.operator == '+':
-                    return 'str'
-                return 'unknown'
+            return self.binary_result_type(node.operator, left_type, right_type)
+        elif isinstance(node, UnaryOpNode) and node.operator == 'not':
+            return 'bool'
         elif isinstance(node, ListNode):
             return 'list'
         elif isinstance(node, DictionaryNode):
             return 'dict'
         elif isinstance(node, CallNode):
-            if node.function == 'len':
-                return 'int'
-            elif node.function == 'range':
-                return 'range'
-            elif node.function == 'int':
-                return 'int'
-            elif node.function == 'float':
+            return self.call_result_type(node.function)
+        
+        return 'unknown'
+    
+    @staticmethod
+    def binary_result_type(operator, left_type, right_type):
+        """Tipo resultante de una operación binaria a partir de sus operandos"""
+        # Operaciones de comparación siempre devuelven bool
+        if operator in ['==', '!=', '<', '>', '<=', '>=']:
+            return 'bool'
+        
+        # and/or devuelven uno de sus operandos
+        if operator in ['and', 'or']:
+            return left_type if left_type == right_type else 'unknown'
+        
+        # Operaciones aritméticas
+        if operator in ['+', '-', '*', '/', '%']:
+            # Si alguno es float, el resultado es float
+            if left_type == 'float' or right_type == 'float':
                 return 'float'
-            elif node.function == 'str':
-                return 'str'
-            elif node.function == 'input':
+            # Si ambos son int, el resultado es int (excepto división)
+            if left_type == 'int' and right_type == 'int':
+                return 'float' if operator == '/' else 'int'
+            # Si uno es string y el operador es +, es concatenación
+            if (left_type == 'str' or right_type == 'str') and operator == '+':
                 return 'str'
             return 'unknown'
-        
+    
+    @staticmethod
+    def call_result_type(function):
+        """Tipo devuelto por una llamada a función built-in"""
+        if function == 'len':
+            return 'int'
+        elif function == 'range':
+            return 'range'
+        elif function == 'int':
+            return 'int'
+        elif function == 'float':
+            return 'float'
+        elif function == 'str':
+            return 'str'
+        elif function == 'input':
+            return 'str'
         return 'unknown'
     
     def check_type_compatibility(self, left_type, operator, right_type, line=0):
@@ -89,34 +245,22 @@ class SemanticAnalyzer:
             # Suma de strings está permitida (concatenación)
             if operator == '+' and (left_type == 'str' or right_type == 'str'):
                 if left_type != 'str' or right_type != 'str':
-                    self.error(
-                        f"No se puede concatenar {left_type} con {right_type}. "
-                        f"Ambos deben ser strings.",
-                        line
-                    )
+                    self.error('concatenacion_invalida', left_type, right_type, line=line)
                     return False
                 return True
             
             # Operaciones numéricas
             numeric_types = ['int', 'float']
             if left_type not in numeric_types:
-                self.error(
-                    f"Operando izquierdo de '{operator}' debe ser numérico, "
-                    f"se encontró '{left_type}'",
-                    line
-                )
+                self.error('operando_izquierdo_no_numerico', operator, left_type, line=line)
                 return False
             if right_type not in numeric_types:
-                self.error(
-                    f"Operando derecho de '{operator}' debe ser numérico, "
-                    f"se encontró '{right_type}'",
-                    line
-                )
+                self.error('operando_derecho_no_numerico', operator, right_type, line=line)
                 return False
             
             # Advertencia por división por cero si es literal
             if operator == '/' and right_type == 'int':
-                self.warning("Posible división por cero", line)
+                self.warning('division_por_cero', line=line)
             
             return True
         
@@ -131,18 +275,22 @@ class SemanticAnalyzer:
                (left_type == 'str' and right_type == 'str'):
                 return True
             else:
-                self.error(
-                    f"No se puede comparar '{left_type}' con '{right_type}' usando '{operator}'",
-                    line
-                )
+                self.error('comparacion_invalida', left_type, right_type, operator, line=line)
                 return False
         
         return True
     
     def analyze(self, ast):
         """Analiza el AST completo"""
+        self.analyze_ranges(ast)
         self.visit(ast)
-        return len(self.errors) == 0
+        return self.error_total == 0
+    
+    def analyze_ranges(self, ast):
+        """Calcula los hechos de rango y marca en el AST los accesos a índice seguros"""
+        self.range_facts = RangeAnalyzer()
+        self.range_facts.analyze(ast)
+        return self.range_facts
     
     def visit(self, node):
         """Visita un nodo del AST"""
@@ -165,16 +313,15 @@ class SemanticAnalyzer:
         self.visit(node.expression)
         
         # Inferir el tipo de la expresión
-        expr_type = self.infer_type(node.expression)
-        
+        self.declare_assignment(node, self.infer_type(node.expression))
+    
+    def declare_assignment(self, node, expr_type):
+        """Registra la variable asignada con el tipo de su expresión"""
         # Si la variable ya existe, verificar compatibilidad (advertencia)
         if node.identifier in self.symbol_table:
             old_type = self.symbol_table[node.identifier]['type']
             if old_type != expr_type and expr_type != 'unknown':
-                self.warning(
-                    f"Variable '{node.identifier}' cambia de tipo de '{old_type}' a '{expr_type}'",
-                    node.line
-                )
+                self.warning('cambio_de_tipo', node.identifier, old_type, expr_type, node=node)
         
         # Registrar o actualizar variable en la tabla de símbolos
         self.symbol_table[node.identifier] = {
@@ -183,15 +330,26 @@ class SemanticAnalyzer:
             'line': node.line
         }
     
+    def visit_AugAssignNode(self, node):
+        """Visita una asignación aumentada (x += expresión)"""
+        self.visit(node.expression)
+        self.check_aug_assignment(node, self.infer_type(node.expression))
+    
+    def check_aug_assignment(self, node, value_type):
+        """Verifica x op= valor como x = x op valor y registra el nuevo tipo de x"""
+        symbol = self.symbol_table.get(node.identifier)
+        if symbol is None:
+            self.error('variable_no_declarada', node.identifier, node=node)
+            return
+        self.check_binary(node, symbol['type'], value_type)
+        self.declare_assignment(node, self.binary_result_type(node.operator, symbol['type'], value_type))
+    
     def visit_IndexAssignmentNode(self, node):
         """Visita una asignación a índice"""
         # Visitar el target (puede ser un nombre simple o un IndexNode)
         if isinstance(node.target, str):
             if node.target not in self.symbol_table:
-                self.error(
-                    f"Variable '{node.target}' no está declarada antes de usarse",
-                    node.line
-                )
+                self.error('variable_no_declarada', node.target, node=node)
         else:
             self.visit(node.target)
         
@@ -206,13 +364,7 @@ class SemanticAnalyzer:
         """Visita un condicional"""
         # Verificar condición
         self.visit(node.condition)
-        cond_type = self.infer_type(node.condition)
-        
-        if cond_type not in ['bool', 'int', 'float', 'unknown']:
-            self.warning(
-                f"La condición del if es de tipo '{cond_type}', se esperaba un valor booleano",
-                node.line
-            )
+        self.check_condition(node, 'if', self.infer_type(node.condition))
         
         # Visitar bloques
         self.visit(node.then_block)
@@ -225,27 +377,25 @@ class SemanticAnalyzer:
     def visit_WhileNode(self, node):
         """Visita un bucle while"""
         self.visit(node.condition)
-        cond_type = self.infer_type(node.condition)
-        
-        if cond_type not in ['bool', 'int', 'float', 'unknown']:
-            self.warning(
-                f"La condición del while es de tipo '{cond_type}', se esperaba un valor booleano",
-                node.line
-            )
-        
+        self.check_condition(node, 'while', self.infer_type(node.condition))
         self.visit(node.block)
     
+    def check_condition(self, node, kind, cond_type):
+        """Verifica que la condición de un if/while sea booleana o numérica"""
+        if cond_type not in ['bool', 'int', 'float', 'unknown']:
+            self.warning('condicion_no_booleana', kind, cond_type, node=node)
+    
     def visit_ForNode(self, node):
         """Visita un bucle for"""
         # Verificar el iterable
         self.visit(node.iterable)
-        iter_type = self.infer_type(node.iterable)
-        
+        self.declare_loop_variable(node, self.infer_type(node.iterable))
+        self.visit(node.block)
+    
+    def declare_loop_variable(self, node, iter_type):
+        """Verifica el iterable de un for y registra su variable"""
         if iter_type not in ['range', 'list', 'unknown']:
-            self.error(
-                f"El for requiere un iterable (range o lista), se encontró '{iter_type}'",
-                node.line
-            )
+            self.error('for_no_iterable', iter_type, node=node)
         
         # Registrar variable del iterador
         self.symbol_table[node.identifier] = {
@@ -253,8 +403,6 @@ class SemanticAnalyzer:
             'initialized': True,
             'line': node.line
         }
-        
-        self.visit(node.block)
     
     def visit_BinaryOpNode(self, node):
         """Visita una operación binaria"""
@@ -265,35 +413,40 @@ class SemanticAnalyzer:
         # Obtener tipos
         left_type = self.infer_type(node.left)
         right_type = self.infer_type(node.right)
-        
+        self.check_binary(node, left_type, right_type)
+    
+    def check_binary(self, node, left_type, right_type):
+        """Verifica una operación binaria cuando ambos tipos son conocidos"""
         # Verificar compatibilidad
         if left_type != 'unknown' and right_type != 'unknown':
             self.check_type_compatibility(left_type, node.operator, right_type, node.line)
     
+    def visit_BoolOpNode(self, node):
+        """Visita un and/or: acepta operandos de cualquier tipo"""
+        self.visit(node.left)
+        self.visit(node.right)
+    
     def visit_UnaryOpNode(self, node):
         """Visita una operación unaria"""
         self.visit(node.operand)
-        operand_type = self.infer_type(node.operand)
-        
+        self.check_unary(node, self.infer_type(node.operand))
+    
+    def check_unary(self, node, operand_type):
+        """Verifica el operando de una operación unaria"""
         if node.operator == '-':
             if operand_type not in ['int', 'float', 'unknown']:
-                self.error(
-                    f"El operador '-' requiere un operando numérico, se encontró '{operand_type}'",
-                    node.line
-                )
+                self.error('negacion_no_numerica', operand_type, node=node)
     
     def visit_IdentifierNode(self, node):
         """Visita un identificador (uso de variable)"""
+        self.check_identifier(node)
+    
+    def check_identifier(self, node):
+        """Verifica que una variable esté declarada e inicializada"""
         if node.name not in self.symbol_table:
-            self.error(
-                f"Variable '{node.name}' no está declarada antes de usarse",
-                node.line
-            )
+            self.error('variable_no_declarada', node.name, node=node)
         elif not self.symbol_table[node.name]['initialized']:
-            self.warning(
-                f"Variable '{node.name}' podría no estar inicializada",
-                node.line
-            )
+            self.warning('variable_no_inicializada', node.name, node=node)
     
     def visit_NumberNode(self, node):
         """Visita un número"""
@@ -318,21 +471,15 @@ class SemanticAnalyzer:
         """Visita un acceso por índice"""
         self.visit(node.list_expr)
         self.visit(node.index_expr)
-        
-        list_type = self.infer_type(node.list_expr)
-        index_type = self.infer_type(node.index_expr)
-        
+        self.check_index(node, self.infer_type(node.list_expr), self.infer_type(node.index_expr))
+    
+    def check_index(self, node, list_type, index_type):
+        """Verifica los tipos de un acceso por índice"""
         if list_type not in ['list', 'unknown']:
-            self.error(
-                f"El acceso por índice requiere una lista, se encontró '{list_type}'",
-                node.line
-            )
+            self.error('indice_sin_lista', list_type, node=node)
         
         if index_type not in ['int', 'unknown']:
-            self.error(
-                f"El índice debe ser un entero, se encontró '{index_type}'",
-                node.line
-            )
+            self.error('indice_no_entero', index_type, node=node)
     
     def visit_CallNode(self, node):
         """Visita una llamada a función"""
@@ -340,27 +487,26 @@ class SemanticAnalyzer:
         for arg in node.args:
             self.visit(arg)
         
+        if node.function in ('range', 'len'):
+            self.check_call(node, [self.infer_type(arg) for arg in node.args[:1]])
+    
+    def check_call(self, node, arg_types):
+        """Verifica los argumentos de range()/len(); arg_types tiene el tipo del primero"""
         # Verificar funciones específicas
         if node.function == 'range':
             if len(node.args) == 0:
-                self.error("range() requiere al menos un argumento", 0)
+                self.error('range_sin_argumentos')
             elif len(node.args) > 0:
-                arg_type = self.infer_type(node.args[0])
+                arg_type = arg_types[0]
                 if arg_type not in ['int', 'unknown']:
-                    self.error(
-                        f"range() requiere un argumento entero, se encontró '{arg_type}'",
-                        node.line
-                    )
+                    self.error('range_no_entero', arg_type, node=node)
         elif node.function == 'len':
             if len(node.args) != 1:
-                self.error("len() requiere exactamente un argumento", 0)
+                self.error('len_num_argumentos')
             else:
-                arg_type = self.infer_type(node.args[0])
+                arg_type = arg_types[0]
                 if arg_type not in ['list', 'str', 'unknown']:
-                    self.error(
-                        f"len() requiere una lista o string, se encontró '{arg_type}'",
-                        node.line
-                    )
+                    self.error('len_tipo_invalido', arg_type, node=node)
     
     def visit_BlockNode(self, node):
         """Visita un bloque de código"""
@@ -369,13 +515,17 @@ class SemanticAnalyzer:
     
     def visit_FunctionNode(self, node):
         """Visita una definición de función"""
+        self.declare_params(node)
+        self.visit(node.body)
+    
+    def declare_params(self, node):
+        """Registra los parámetros de una función"""
         for param in node.params:
             self.symbol_table[param] = {
                 'type': 'unknown',
                 'initialized': True,
                 'line': node.line
             }
-        self.visit(node.body)
     
     def visit_ReturnNode(self, node):
         """Visita un return"""
@@ -404,39 +554,63 @@ class SemanticAnalyzer:
         """Visita un continue"""
         pass
     
-    def get_report(self):
-        """Genera un reporte del análisis semántico"""
-        report = "ANÁLISIS SEMÁNTICO\n"
-        report += "=" * 100 + "\n\n"
+    def iter_report(self):
+        """Genera el reporte del análisis semántico por partes"""
+        yield "ANÁLISIS SEMÁNTICO\n"
+        yield "=" * 100 + "\n\n"
         
         # Tabla de símbolos
-        report += "TABLA DE SÍMBOLOS\n"
-        report += "-" * 100 + "\n"
-        report += f"{'Variable':<20} {'Tipo':<15} {'Inicializada':<15} {'Línea':<10}\n"
-        report += "-" * 100 + "\n"
+        yield "TABLA DE SÍMBOLOS\n"
+        yield "-" * 100 + "\n"
+        yield f"{'Variable':<20} {'Tipo':<15} {'Inicializada':<15} {'Línea':<10}\n"
+        yield "-" * 100 + "\n"
         
         for name, info in self.symbol_table.items():
-            report += f"{name:<20} {info['type']:<15} {'Sí' if info['initialized'] else 'No':<15} {info['line']:<10}\n"
+            yield f"{name:<20} {info['type']:<15} {'Sí' if info['initialized'] else 'No':<15} {info['line']:<10}\n"
         
-        report += "\n"
+        yield "\n"
         
         # Errores
-        if self.errors:
-            report += f"ERRORES SEMÁNTICOS ({len(self.errors)})\n"
-            report += "-" * 100 + "\n"
-            for i, error in enumerate(self.errors, 1):
-                report += f"{i}. {error}\n"
-            report += "\n"
+        if self.error_records:
+            yield f"ERRORES SEMÁNTICOS ({len(self.error_records)})\n"
+            yield "-" * 100 + "\n"
+            for i, error in enumerate(self.error_records, 1):
+                yield f"{i}. {error}{self._rule_ref(error)}\n"
+            yield "\n"
         
         # Advertencias
-        if self.warnings:
-            report += f"ADVERTENCIAS ({len(self.warnings)})\n"
-            report += "-" * 100 + "\n"
-            for i, warning in enumerate(self.warnings, 1):
-                report += f"{i}. {warning}\n"
-            report += "\n"
+        if self.warning_records:
+            yield f"ADVERTENCIAS ({len(self.warning_records)})\n"
+            yield "-" * 100 + "\n"
+            for i, warning in enumerate(self.warning_records, 1):
+                yield f"{i}. {warning}{self._rule_ref(warning)}\n"
+            yield "\n"
+        
+        # Reglas semánticas citadas por los diagnósticos
+        rule_ids = sorted({record.rule_id for record in self.error_records + self.warning_records
+                           if record.rule_id})
+        if rule_ids:
+            yield "REGLAS APLICADAS\n"
+            yield "-" * 100 + "\n"
+            for rule_id in rule_ids:
+                yield f"{rule_id}: {obtener_regla_por_id(rule_id).regla_gramatical}\n"
+            yield "\n"
         
-        if not self.errors and not self.warnings:
-            report += "[OK] No se encontraron errores ni advertencias semánticas\n"
+        # Diagnósticos omitidos por límite o duplicado
+        if self.suppressed:
+            yield f"DIAGNÓSTICOS OMITIDOS ({sum(self.suppressed.values())})\n"
+            yield "-" * 100 + "\n"
+            for code, count in self.suppressed.items():
+                yield f"{code}: {count}\n"
+            yield "\n"
         
-        return report
+        if not self.error_records and not self.warning_records:
+            yield "[OK] No se encontraron errores ni advertencias semánticas\n"
+    
+    @staticmethod
+    def _rule_ref(record):
+        return f" [{record.rule_id}]" if record.rule_id else ""
+    
+    def get_report(self):
+        """Genera un reporte del análisis semántico"""
+        return ''.join(self.iter_report())
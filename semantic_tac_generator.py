@@ -0,0 +1,210 @@
+"""
+Generador Semántico de TAC (pasada única)
+Verifica la semántica y genera el código de tres direcciones en un solo recorrido del AST
+"""
+
+from python_compiler import *
+from semantic_analyzer import SemanticAnalyzer
+from tac_generator import TACGenerator, is_range_call
+from tac_types import annotate_types
+
+
+class SemanticTACGenerator(TACGenerator):
+    """Combina SemanticAnalyzer y TACGenerator en una sola pasada.
+
+    Produce los mismos diagnósticos y las mismas instrucciones TAC que ejecutar
+    ambas fases por separado. Cada subexpresión generada apila su tipo y el nodo
+    padre los desapila, así los tipos se obtienen sin volver a recorrer el árbol
+    como hace infer_type.
+    """
+
+    def __init__(self, analyzer=None):
+        super().__init__()
+        self.analyzer = analyzer if analyzer is not None else SemanticAnalyzer()
+        self.type_stack = []  # Tipos de las subexpresiones generadas pendientes
+        self.temp_types = {}  # {temporal: tipo inferido}
+        self.success = True
+
+    @property
+    def symbol_table(self):
+        return self.analyzer.symbol_table
+
+    def generate(self, ast):
+        """Analiza y genera TAC; el resultado del análisis queda en self.analyzer"""
+        self.analyzer.analyze_ranges(ast)
+        self.visit(ast)
+        self.type_stack.clear()
+        self.success = self.analyzer.error_total == 0
+        annotate_types(self.instructions)
+        return self.instructions
+
+    def pop_types(self, depth):
+        """Desapila los tipos generados por encima de depth"""
+        types = self.type_stack[depth:]
+        del self.type_stack[depth:]
+        return types
+
+    # ----- Sentencias -----
+
+    def visit_statement(self, node):
+        super().visit_statement(node)
+        # Entre sentencias no queda ningún tipo pendiente de consumir
+        self.type_stack.clear()
+
+    def visit_AssignmentNode(self, node):
+        super().visit_AssignmentNode(node)
+        self.analyzer.declare_assignment(node, self.type_stack.pop())
+
+    def visit_AugAssignNode(self, node):
+        super().visit_AugAssignNode(node)
+        self.analyzer.check_aug_assignment(node, self.type_stack.pop())
+
+    def visit_IndexAssignmentNode(self, node):
+        if isinstance(node.target, str):
+            if node.target not in self.analyzer.symbol_table:
+                self.analyzer.error('variable_no_declarada', node.target, node=node)
+        else:
+            # El análisis visita el target primero, pero el TAC lo genera al final
+            self.analyzer.visit(node.target)
+        super().visit_IndexAssignmentNode(node)
+
+    def visit_store_target(self, node):
+        # Sus diagnósticos ya se reportaron antes de generar índice y valor
+        self.analyzer.muted += 1
+        try:
+            return super().visit_store_target(node)
+        finally:
+            self.analyzer.muted -= 1
+
+    def visit_condition(self, node, condition, false_label):
+        super().visit_condition(node, condition, false_label)
+        kind = 'while' if isinstance(node, WhileNode) else 'if'
+        self.analyzer.check_condition(node, kind, self.type_stack.pop())
+
+    def visit_branch(self, node, label, jump_if):
+        # Los operandos de and/or/not dejan su tipo; el nodo los sustituye por el suyo
+        depth = len(self.type_stack)
+        super().visit_branch(node, label, jump_if)
+        if isinstance(node, BoolOpNode):
+            left_type, right_type = self.pop_types(depth)
+            self.type_stack.append(self.analyzer.binary_result_type(node.operator, left_type, right_type))
+        elif isinstance(node, UnaryOpNode) and node.operator == 'not':
+            self.type_stack[depth:] = ['bool']
+
+    def visit_iterable(self, node):
+        iterable = node.iterable
+        if is_range_call(iterable):
+            depth = len(self.type_stack)
+            result = super().visit_iterable(node)
+            # Se generan inicio, fin y paso; el resto de argumentos solo se verifica
+            arg_types = self.pop_types(depth)
+            for arg in iterable.args[len(arg_types):]:
+                self.analyzer.visit(arg)
+            self.analyzer.check_call(iterable, arg_types[:1])
+            iter_type = 'range'
+        else:
+            result = super().visit_iterable(node)
+            iter_type = self.type_stack.pop()
+        self.analyzer.declare_loop_variable(node, iter_type)
+        return result
+
+    def visit_FunctionNode(self, node):
+        self.analyzer.declare_params(node)
+        return super().visit_FunctionNode(node)
+
+    def visit_DelNode(self, node):
+        target = node.target
+        if isinstance(target, IndexNode):
+            super().visit_DelNode(node)
+            index_type = self.type_stack.pop()
+            list_type = self.type_stack.pop()
+            self.analyzer.check_index(target, list_type, index_type)
+            return
+        if isinstance(target, IdentifierNode):
+            self.analyzer.check_identifier(target)
+        else:
+            self.analyzer.visit(target)
+        super().visit_DelNode(node)
+
+    # ----- Expresiones -----
+
+    def visit_NumberNode(self, node):
+        self.type_stack.append('float' if isinstance(node.value, float) else 'int')
+        return super().visit_NumberNode(node)
+
+    def visit_StringNode(self, node):
+        self.type_stack.append('str')
+        return super().visit_StringNode(node)
+
+    def visit_IdentifierNode(self, node):
+        self.analyzer.check_identifier(node)
+        symbol = self.analyzer.symbol_table.get(node.name)
+        self.type_stack.append(symbol['type'] if symbol else 'unknown')
+        return super().visit_IdentifierNode(node)
+
+    def visit_BinaryOpNode(self, node):
+        result = super().visit_BinaryOpNode(node)
+        right_type = self.type_stack.pop()
+        left_type = self.type_stack.pop()
+        self.analyzer.check_binary(node, left_type, right_type)
+        node_type = self.analyzer.binary_result_type(node.operator, left_type, right_type)
+        self.temp_types[result] = node_type
+        self.type_stack.append(node_type)
+        return result
+
+    def visit_BoolOpNode(self, node):
+        result = super().visit_BoolOpNode(node)
+        right_type = self.type_stack.pop()
+        left_type = self.type_stack.pop()
+        node_type = self.analyzer.binary_result_type(node.operator, left_type, right_type)
+        self.temp_types[result] = node_type
+        self.type_stack.append(node_type)
+        return result
+
+    def visit_UnaryOpNode(self, node):
+        result = super().visit_UnaryOpNode(node)
+        self.analyzer.check_unary(node, self.type_stack.pop())
+        node_type = 'bool' if node.operator == 'not' else 'unknown'
+        self.temp_types[result] = node_type
+        self.type_stack.append(node_type)
+        return result
+
+    def visit_ListNode(self, node):
+        depth = len(self.type_stack)
+        result = super().visit_ListNode(node)
+        del self.type_stack[depth:]
+        self.temp_types[result] = 'list'
+        self.type_stack.append('list')
+        return result
+
+    def visit_DictionaryNode(self, node):
+        depth = len(self.type_stack)
+        result = super().visit_DictionaryNode(node)
+        del self.type_stack[depth:]
+        self.temp_types[result] = 'dict'
+        self.type_stack.append('dict')
+        return result
+
+    def visit_IndexNode(self, node):
+        result = super().visit_IndexNode(node)
+        index_type = self.type_stack.pop()
+        list_type = self.type_stack.pop()
+        self.analyzer.check_index(node, list_type, index_type)
+        self.temp_types[result] = 'unknown'
+        self.type_stack.append('unknown')
+        return result
+
+    def visit_CallNode(self, node):
+        depth = len(self.type_stack)
+        result = super().visit_CallNode(node)
+        # El TAC genera siempre un prefijo de los argumentos; el resto solo se verifica
+        arg_types = self.pop_types(depth)
+        for arg in node.args[len(arg_types):]:
+            self.analyzer.visit(arg)
+        if node.function in ('range', 'len'):
+            self.analyzer.check_call(node, arg_types[:1])
+        node_type = self.analyzer.call_result_type(node.function)
+        if node.function != 'range' and '.' not in node.function:
+            self.temp_types[result] = node_type
+        self.type_stack.append(node_type)
+        return result
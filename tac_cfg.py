@@ -0,0 +1,621 @@
+"""
+Grafo de Flujo de Control del Código TAC
+Divide el TAC en bloques básicos, enlaza predecesores y sucesores, calcula
+dominadores e identifica los bucles naturales
+"""
+
+from tac_generator import OpCode, Var, LOOP_NEXT_OPS, COMPARE_JUMPS, INPLACE_OPS, BUILTIN_FUNCTIONS, jump_target
+from tac_types import DEFINING_OPS
+
+
+# Saltos condicionales: si no saltan siguen al bloque siguiente
+CONDITIONAL_JUMPS = frozenset({OpCode.IF_FALSE, OpCode.IF_TRUE}) | LOOP_NEXT_OPS | frozenset(COMPARE_JUMPS)
+
+# Instrucciones que terminan un bloque básico
+TERMINATORS = frozenset({OpCode.GOTO, OpCode.RETURN, OpCode.LEAVE}) | CONDITIONAL_JUMPS
+
+# Instrucciones que salen de la función
+EXITS = (OpCode.RETURN, OpCode.LEAVE)
+
+# Raíz virtual del árbol de dominadores
+ROOT = -1
+
+
+def is_function_label(instr):
+    return instr.op is OpCode.LABEL and str(instr.arg1).startswith('func_')
+
+
+def defined_var(instr):
+    """Variable que define la instrucción, o None"""
+    if instr.op in DEFINING_OPS and isinstance(instr.result, Var):
+        return instr.result
+    return None
+
+
+def used_vars(instr):
+    """Variables que lee la instrucción (los argumentos de una phi se leen en
+    los predecesores, no en el bloque de la phi; ENTER define los parámetros)"""
+    if instr.op in (OpCode.LABEL, OpCode.ENTER):
+        return []
+    used = []
+    for field in (instr.arg1, instr.arg2):
+        if isinstance(field, tuple):
+            used.extend(arg for arg in field if isinstance(arg, Var))
+        elif isinstance(field, Var):
+            used.append(field)
+    # LIST_SET y DICT_SET leen el valor almacenado en el campo result; x += v lee x
+    if (instr.op not in DEFINING_OPS or instr.op in INPLACE_OPS) and isinstance(instr.result, Var):
+        used.append(instr.result)
+    return used
+
+
+def leading_phis(block):
+    """Instrucciones phi al comienzo del bloque"""
+    phis = []
+    for instr in block.instructions:
+        if instr.op is OpCode.PHI:
+            phis.append(instr)
+        elif instr.op is not OpCode.LABEL:
+            break
+    return phis
+
+
+class BasicBlock:
+    """Secuencia de instrucciones que se ejecuta siempre completa"""
+
+    def __init__(self, index, instructions):
+        self.index = index
+        self.instructions = instructions
+        self.preds = []  # Bloques predecesores
+        self.succs = []  # Bloques sucesores (el de un salto condicional va primero)
+
+    @property
+    def label(self):
+        """Etiqueta con la que empieza el bloque, o None"""
+        first = self.instructions[0] if self.instructions else None
+        if first is not None and first.op is OpCode.LABEL:
+            return first.arg1
+        return None
+
+    @property
+    def terminator(self):
+        """Última instrucción si es un salto o un return, o None"""
+        last = self.instructions[-1] if self.instructions else None
+        if last is not None and last.op in TERMINATORS:
+            return last
+        return None
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.label or '-'}, {len(self.instructions)} instr)"
+
+
+class Loop:
+    """Bucle natural: la cabecera domina todos los bloques del cuerpo"""
+
+    def __init__(self, header):
+        self.header = header
+        self.blocks = {header}  # Índices de los bloques del bucle, cabecera incluida
+        self.back_edges = []    # Bloques que saltan de vuelta a la cabecera
+        self.parent = None      # Bucle que lo contiene
+
+    @property
+    def depth(self):
+        depth = 1
+        loop = self.parent
+        while loop is not None:
+            depth += 1
+            loop = loop.parent
+        return depth
+
+    def __contains__(self, block_index):
+        return block_index in self.blocks
+
+    def __repr__(self):
+        return f"Loop(cabecera={self.header}, bloques={sorted(self.blocks)})"
+
+
+class ControlFlowGraph:
+    """Grafo de flujo de control de un programa TAC.
+
+    Las funciones son regiones independientes: su etiqueta func_ es una
+    entrada que solo se alcanza con CALL, así que ningún bloque cae en ella
+    ni su RETURN o LEAVE tiene sucesores. El programa principal empieza
+    en el primer bloque que no pertenece a ninguna función.
+
+    Los bloques conservan el orden del TAC, así to_instructions() devuelve la
+    lista lineal original (o la modificada por una optimización) sin recolocar
+    saltos.
+    """
+
+    def __init__(self, instructions):
+        self.blocks = []
+        self.label_blocks = {}  # {etiqueta: índice del bloque}
+        self.entry = None       # Bloque de entrada del programa principal
+        self.function_entries = {}  # {etiqueta func_: índice del bloque}
+        self.regions = []       # Función de cada bloque (None: programa principal)
+        self.idom = {}          # {bloque: dominador inmediato}
+        self.order = []         # Bloques alcanzables en orden postorden inverso
+        self.loops = []
+        self.split_blocks(instructions)
+        self.link_blocks()
+        self.find_entries()
+        self.compute_dominators()
+        self.find_loops()
+
+    # ----- Construcción -----
+
+    def split_blocks(self, instructions):
+        for body in basic_blocks(instructions):
+            self.add_block(body)
+
+    def add_block(self, instructions):
+        block = BasicBlock(len(self.blocks), instructions)
+        self.blocks.append(block)
+        if block.label is not None:
+            self.label_blocks[block.label] = block.index
+
+    def link_blocks(self):
+        for block in self.blocks:
+            last = block.instructions[-1]
+            targets = []
+            if last.op is OpCode.GOTO:
+                targets.append(self.target(last.arg1))
+            elif last.op in CONDITIONAL_JUMPS:
+                targets.append(self.target(jump_target(last)))
+                targets.append(block.index + 1)
+            elif last.op not in EXITS:
+                targets.append(block.index + 1)
+
+            for target in targets:
+                if target == block.index + 1:
+                    # Una función solo se alcanza llamándola: el bloque anterior
+                    # sigue tras el final de su definición
+                    while target < len(self.blocks) and is_function_label(self.blocks[target].instructions[0]):
+                        target = self.function_end(target) + 1
+                if target >= len(self.blocks) or target in block.succs:
+                    continue
+                block.succs.append(target)
+                self.blocks[target].preds.append(block.index)
+
+    def target(self, label):
+        if label not in self.label_blocks:
+            raise ValueError(f"Etiqueta no encontrada: {label}")
+        return self.label_blocks[label]
+
+    def find_entries(self):
+        """Asigna cada bloque a su función y localiza las entradas"""
+        self.regions = [None] * len(self.blocks)
+        index = 0
+        while index < len(self.blocks):
+            block = self.blocks[index]
+            if is_function_label(block.instructions[0]):
+                end = self.function_end(index)
+                self.function_entries[block.label] = index
+                for inner in range(index, end + 1):
+                    self.regions[inner] = block.label
+                index = end + 1
+            else:
+                if self.entry is None:
+                    self.entry = index
+                index += 1
+
+    def function_end(self, start):
+        """Último bloque de la función que empieza en start.
+
+        La función termina en su LEAVE. En TAC sin LEAVE termina en el primer
+        return sin valor tras el cual no queda ningún salto pendiente hacia
+        una etiqueta posterior; así un return en medio del cuerpo no la corta.
+        """
+        defined = set()
+        pending = set()
+        for index in range(start, len(self.blocks)):
+            block = self.blocks[index]
+            if index > start and is_function_label(block.instructions[0]):
+                return index - 1
+            if block.label is not None:
+                defined.add(block.label)
+                pending.discard(block.label)
+            for instr in block.instructions:
+                target = jump_target(instr)
+                if target is not None and target not in defined:
+                    pending.add(target)
+            last = block.instructions[-1]
+            if last.op is OpCode.LEAVE:
+                return index
+            if last.op is OpCode.RETURN and last.arg1 is None and not pending:
+                return index
+        return len(self.blocks) - 1
+
+    def function_blocks(self, label):
+        """Índices de los bloques de una función (label None: programa principal)"""
+        return [index for index, region in enumerate(self.regions) if region == label]
+
+    @property
+    def entries(self):
+        """Bloques de entrada: el programa principal y cada función"""
+        entries = [] if self.entry is None else [self.entry]
+        entries.extend(index for index in self.function_entries.values() if index != self.entry)
+        return entries
+
+    # ----- Dominadores -----
+
+    def reverse_postorder(self):
+        """Bloques alcanzables desde alguna entrada, en postorden inverso"""
+        visited = set()
+        postorder = []
+        for entry in self.entries:
+            if entry in visited:
+                continue
+            visited.add(entry)
+            stack = [(entry, iter(self.blocks[entry].succs))]
+            while stack:
+                index, succs = stack[-1]
+                for succ in succs:
+                    if succ not in visited:
+                        visited.add(succ)
+                        stack.append((succ, iter(self.blocks[succ].succs)))
+                        break
+                else:
+                    stack.pop()
+                    postorder.append(index)
+        postorder.reverse()
+        return postorder
+
+    def compute_dominators(self):
+        """Dominadores inmediatos con el algoritmo iterativo de Cooper, Harvey y Kennedy"""
+        self.order = self.reverse_postorder()
+        position = {index: i for i, index in enumerate(self.order)}
+        # Una raíz virtual precede a todas las entradas
+        position[ROOT] = -1
+        entries = set(self.entries)
+        idom = {ROOT: ROOT}
+        idom.update((entry, ROOT) for entry in entries)
+
+        def intersect(a, b):
+            while a != b:
+                while position[a] > position[b]:
+                    a = idom[a]
+                while position[b] > position[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for index in self.order:
+                if index in entries:
+                    continue
+                new_idom = None
+                for pred in self.blocks[index].preds:
+                    if pred in idom:
+                        new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if new_idom is not None and idom.get(index) != new_idom:
+                    idom[index] = new_idom
+                    changed = True
+
+        # Las entradas (y lo que solo domina la raíz virtual) no tienen dominador inmediato
+        del idom[ROOT]
+        self.idom = {index: (None if dom == ROOT else dom) for index, dom in idom.items()}
+        self.number_dominator_tree()
+
+    def number_dominator_tree(self):
+        """Numera el árbol de dominadores en preorden y postorden: a domina a b
+        si el intervalo de b está dentro del de a"""
+        children = {}
+        for index, dom in self.idom.items():
+            children.setdefault(dom, []).append(index)
+        self.dom_interval = {}
+        counter = 0
+        stack = [(root, False) for root in children.get(None, ())]
+        while stack:
+            index, done = stack.pop()
+            if done:
+                self.dom_interval[index] = (self.dom_interval[index], counter)
+                counter += 1
+                continue
+            self.dom_interval[index] = counter
+            counter += 1
+            stack.append((index, True))
+            stack.extend((child, False) for child in children.get(index, ()))
+
+    def dominates(self, a, b):
+        """Indica si el bloque a domina al bloque b"""
+        if a not in self.idom or b not in self.idom:
+            return False
+        a_pre, a_post = self.dom_interval[a]
+        b_pre, b_post = self.dom_interval[b]
+        return a_pre <= b_pre and b_post <= a_post
+
+    def dominance_frontiers(self):
+        """{bloque: conjunto de bloques en su frontera de dominancia}"""
+        frontiers = {index: set() for index in self.order}
+        for index in self.order:
+            preds = [pred for pred in self.blocks[index].preds if pred in self.idom]
+            if len(preds) < 2:
+                continue
+            for pred in preds:
+                runner = pred
+                while runner is not None and runner != self.idom[index]:
+                    frontiers[runner].add(index)
+                    runner = self.idom[runner]
+        return frontiers
+
+    # ----- Bucles -----
+
+    def find_loops(self):
+        """Bucles naturales, uno por cabecera, de los externos a los internos"""
+        by_header = {}
+        for index in self.order:
+            for succ in self.blocks[index].succs:
+                if self.dominates(succ, index):
+                    loop = by_header.setdefault(succ, Loop(succ))
+                    loop.back_edges.append(index)
+                    self.collect_body(loop, index)
+
+        self.loops = sorted(by_header.values(), key=lambda loop: -len(loop.blocks))
+        # El bucle contenedor más cercano es el más pequeño que incluye la
+        # cabecera: los bucles naturales están anidados o son disjuntos
+        innermost = {}
+        for loop in self.loops:
+            loop.parent = innermost.get(loop.header)
+            for index in loop.blocks:
+                innermost[index] = loop
+
+    def collect_body(self, loop, tail):
+        stack = [tail]
+        while stack:
+            index = stack.pop()
+            if index not in loop.blocks and index in self.idom:
+                loop.blocks.add(index)
+                stack.extend(self.blocks[index].preds)
+
+    def loop_depth(self, block_index):
+        """Número de bucles que contienen el bloque"""
+        return sum(1 for loop in self.loops if block_index in loop)
+
+    # ----- Variables vivas -----
+
+    def liveness(self):
+        """Variables vivas a la entrada y a la salida de cada bloque.
+
+        Una phi define su variable al entrar al bloque y lee cada argumento al
+        final del predecesor correspondiente.
+
+        Returns:
+            tuple: ({bloque: vivas a la entrada}, {bloque: vivas a la salida})
+        """
+        upward = {}   # {bloque: variables leídas antes de definirse en el bloque}
+        defined = {}  # {bloque: variables definidas en el bloque}
+        phi_uses = {}  # {(predecesor, bloque): argumentos de phi leídos en la arista}
+        for block in self.blocks:
+            reads, writes = set(), set()
+            for instr in block.instructions:
+                if instr.op is OpCode.PHI:
+                    for pred, arg in zip(instr.arg2, instr.arg1):
+                        if isinstance(arg, Var):
+                            phi_uses.setdefault((pred, block.index), set()).add(arg)
+                else:
+                    reads.update(var for var in used_vars(instr) if var not in writes)
+                target = defined_var(instr)
+                if target is not None:
+                    writes.add(target)
+            upward[block.index] = reads
+            defined[block.index] = writes
+
+        live_in = {block.index: set(upward[block.index]) for block in self.blocks}
+        live_out = {block.index: set() for block in self.blocks}
+        # Postorden: los sucesores se procesan antes que el bloque salvo en los ciclos
+        order = list(reversed(self.order)) + [index for index in range(len(self.blocks))
+                                              if index not in self.idom]
+        changed = True
+        while changed:
+            changed = False
+            for index in order:
+                out = set()
+                for succ in self.blocks[index].succs:
+                    out |= live_in[succ]
+                    out |= phi_uses.get((index, succ), set())
+                if out != live_out[index]:
+                    live_out[index] = out
+                    live_in[index] = upward[index] | (out - defined[index])
+                    changed = True
+        return live_in, live_out
+
+    # ----- Vuelta a la lista lineal -----
+
+    def to_instructions(self):
+        """Lista lineal de instrucciones en el orden de los bloques"""
+        instructions = []
+        for block in self.blocks:
+            instructions.extend(block.instructions)
+        return instructions
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+
+class BitLiveness:
+    """Vivacidad hacia atrás con conjuntos de bits.
+
+    Cada variable recibe un índice y un conjunto de variables es un entero
+    cuyo bit i corresponde a la variable de índice i: la unión y la diferencia
+    de conjuntos son operaciones sobre enteros. Una lista de trabajo solo
+    revisa un bloque cuando cambia la entrada de alguno de sus sucesores.
+
+    Con removable (instrucción -> bool) el análisis es de vivacidad fuerte:
+    una instrucción removible cuya variable está muerta no hace vivas las
+    variables que lee, así una cadena de definiciones muertas (también la de
+    un contador que solo se lee a sí mismo) muere entera.
+
+    Una llamada a una función del usuario lee las variables vivas a la entrada
+    de cualquier función, porque el llamado ve el marco del llamador. El
+    siguiente valor de un bucle no mata su variable: al agotarse el iterador
+    salta sin asignarla y la variable conserva el valor anterior.
+    """
+
+    def __init__(self, cfg, removable=None):
+        self.cfg = cfg
+        self.removable = removable
+        self.ids = {}  # {variable: índice de su bit}
+        self.effects = {}  # {bloque: [(bit definido, índices leídos, es llamada, removible)]}
+        self.call_reads = 0  # Variables que puede leer una llamada
+        for block in cfg:
+            self.effects[block.index] = [self.effect(instr) for instr in block.instructions]
+        self.live_in = {}
+        self.live_out = {}
+        # Las funciones pueden leer variables del llamador: se repite hasta
+        # que el conjunto que lee una llamada deja de crecer
+        while True:
+            self.solve()
+            reads = self.call_reads
+            for index in cfg.function_entries.values():
+                reads |= self.live_in[index]
+            if reads == self.call_reads:
+                break
+            self.call_reads = reads
+
+    def index(self, var):
+        index = self.ids.get(var)
+        if index is None:
+            index = self.ids[var] = len(self.ids)
+        return index
+
+    def effect(self, instr):
+        """Bit que define la instrucción, índices que lee, si es una llamada y
+        si es removible"""
+        if instr.op is OpCode.ENTER:
+            # ENTER define los parámetros de la función
+            defined = 0
+            for param in instr.arg1:
+                defined |= 1 << self.index(param)
+            return defined, (), False, False
+        target = defined_var(instr)
+        defined = 0 if target is None or instr.op in LOOP_NEXT_OPS else 1 << self.index(target)
+        reads = () if instr.op is OpCode.PHI else tuple(self.index(var) for var in used_vars(instr))
+        is_call = instr.op is OpCode.CALL and instr.arg1 not in BUILTIN_FUNCTIONS
+        removable = bool(defined) and self.removable is not None and self.removable(instr)
+        return defined, reads, is_call, removable
+
+    def transfer(self, block_index, live, dead=None):
+        """Variables vivas a la entrada del bloque dadas las vivas a la salida;
+        dead recibe las posiciones de las instrucciones removibles muertas"""
+        effects = self.effects[block_index]
+        for position in range(len(effects) - 1, -1, -1):
+            defined, reads, is_call, removable = effects[position]
+            if removable and not live & defined:
+                if dead is not None:
+                    dead.append(position)
+                continue
+            if live & defined:
+                live ^= live & defined
+            for index in reads:
+                live |= 1 << index
+            if is_call:
+                live |= self.call_reads
+        return live
+
+    def edge_reads(self):
+        """Argumentos de phi que se leen en cada arista (predecesor, bloque)"""
+        reads = {}
+        for block in self.cfg:
+            for instr in block.instructions:
+                if instr.op is OpCode.PHI:
+                    for pred, arg in zip(instr.arg2, instr.arg1):
+                        if isinstance(arg, Var):
+                            reads[(pred, block.index)] = reads.get((pred, block.index), 0) | 1 << self.index(arg)
+        return reads
+
+    def solve(self):
+        blocks = self.cfg.blocks
+        edges = self.edge_reads()
+        self.live_in = {block.index: 0 for block in blocks}
+        self.live_out = {block.index: 0 for block in blocks}
+        # Postorden: los sucesores se procesan antes que el bloque salvo en los ciclos
+        worklist = [index for index in range(len(blocks)) if index not in self.cfg.idom]
+        worklist += self.cfg.order
+        pending = set(worklist)
+        while worklist:
+            index = worklist.pop()
+            pending.discard(index)
+            out = 0
+            for succ in blocks[index].succs:
+                out |= self.live_in[succ] | edges.get((index, succ), 0)
+            self.live_out[index] = out
+            live = self.transfer(index, out)
+            if live != self.live_in[index]:
+                self.live_in[index] = live
+                for pred in blocks[index].preds:
+                    if pred not in pending:
+                        pending.add(pred)
+                        worklist.append(pred)
+
+    def dead_instructions(self, block_index):
+        """Posiciones de las instrucciones removibles muertas del bloque"""
+        dead = []
+        self.transfer(block_index, self.live_out[block_index], dead)
+        return dead
+
+
+def definitely_defined(cfg, index):
+    """Variables definidas en todos los caminos desde la entrada del programa o
+    de la función hasta la salida de cada bloque.
+
+    Análisis hacia delante con conjuntos de bits: index (variable -> índice
+    de su bit) es el de BitLiveness. Un bloque inalcanzable no restringe a sus
+    sucesores. En una función solo cuentan sus parámetros y sus definiciones,
+    aunque el llamador pueda haber definido otras variables.
+
+    Returns:
+        dict: {bloque: conjunto de bits de las variables definidas a su salida}
+    """
+    generated = {}
+    for block in cfg:
+        bits = 0
+        for instr in block.instructions:
+            names = instr.arg1 if instr.op is OpCode.ENTER else (defined_var(instr),)
+            for name in names:
+                if name is not None:
+                    bits |= 1 << index(name)
+        generated[block.index] = bits
+
+    defined_out = {block.index: -1 for block in cfg}  # -1: todos los bits
+    entries = set(cfg.entries)
+    changed = True
+    while changed:
+        changed = False
+        for block_index in cfg.order:
+            incoming = -1
+            if block_index in entries:
+                incoming = 0
+            for pred in cfg.blocks[block_index].preds:
+                incoming &= defined_out[pred]
+            out = incoming | generated[block_index]
+            if out != defined_out[block_index]:
+                defined_out[block_index] = out
+                changed = True
+    return defined_out
+
+
+def basic_blocks(instructions):
+    """Divide una lista de instrucciones TAC en las listas de sus bloques básicos"""
+    blocks = []
+    current = []
+    for instr in instructions:
+        if instr.op is OpCode.LABEL and current:
+            blocks.append(current)
+            current = []
+        current.append(instr)
+        if instr.op in TERMINATORS:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def build_cfg(instructions):
+    """Construye el grafo de flujo de control de una lista de instrucciones TAC"""
+    return ControlFlowGraph(instructions)
@@ -3,73 +3,490 @@ Generador de Código Intermedio (TAC - Three Address Code)
 Convierte el AST en código de tres direcciones
 """
 
+from array import array
+from enum import IntEnum
+from heapq import heappush, heappop
+
 from python_compiler import *
 
 
+class OpCode(IntEnum):
+    """Códigos de operación TAC.
+    
+    Se muestra por su nombre; las operaciones dadas como cadena ('ADD') se
+    convierten una sola vez con OpCode[nombre] y los enteros con OpCode(valor).
+    """
+    ASSIGN = 1
+    ADD = 2
+    SUB = 3
+    MUL = 4
+    DIV = 5
+    MOD = 6
+    NEG = 7
+    EQ = 8
+    NEQ = 9
+    LT = 10
+    GT = 11
+    LTE = 12
+    GTE = 13
+    PRINT = 14
+    LABEL = 15
+    GOTO = 16
+    IF_FALSE = 17
+    LIST_CREATE = 18
+    LIST_APPEND = 19
+    LIST_GET = 20
+    LIST_SET = 21
+    DICT_CREATE = 22
+    DICT_SET = 23
+    CALL = 24
+    RETURN = 25
+    DEL = 26
+    BREAK = 27
+    CONTINUE = 28
+    PARAM = 29
+    FUNCTION_CALL = 30
+    PHI = 31
+    ENTER = 32
+    LEAVE = 33
+    FOR_RANGE_INIT = 34
+    FOR_RANGE_NEXT = 35
+    ITER_INIT = 36
+    ITER_NEXT = 37
+    IF_EQ = 38
+    IF_NE = 39
+    IF_LT = 40
+    IF_GT = 41
+    IF_LE = 42
+    IF_GE = 43
+    ADD_INPLACE = 44
+    SUB_INPLACE = 45
+    MUL_INPLACE = 46
+    DIV_INPLACE = 47
+    MOD_INPLACE = 48
+    IF_TRUE = 49
+    NOT = 50
+    
+    def __str__(self):
+        return self.name
+    
+    def __format__(self, spec):
+        return format(self.name, spec)
+
+
+ARITHMETIC_OPS = frozenset({OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD})
+COMPARISON_OPS = frozenset({OpCode.EQ, OpCode.NEQ, OpCode.LT, OpCode.GT, OpCode.LTE, OpCode.GTE})
+
+# Símbolo de cada operación binaria en la forma textual del TAC
+OP_SYMBOLS = {
+    OpCode.ADD: '+', OpCode.SUB: '-', OpCode.MUL: '*', OpCode.DIV: '/', OpCode.MOD: '%',
+    OpCode.EQ: '==', OpCode.NEQ: '!=', OpCode.LT: '<', OpCode.GT: '>',
+    OpCode.LTE: '<=', OpCode.GTE: '>='
+}
+
+# Forma textual de cada operación
+TAC_FORMATS = {
+    OpCode.ASSIGN: "{result} = {arg1}",
+    OpCode.NEG: "{result} = -{arg1}",
+    OpCode.PRINT: "print({arg1})",
+    OpCode.LABEL: "{arg1}:",
+    OpCode.GOTO: "goto {arg1}",
+    OpCode.IF_FALSE: "if_false {arg1} goto {arg2}",
+    OpCode.IF_TRUE: "if {arg1} goto {arg2}",
+    OpCode.NOT: "{result} = not {arg1}",
+    OpCode.LIST_CREATE: "{result} = []",
+    OpCode.LIST_APPEND: "{arg1}.append({arg2})",
+    OpCode.LIST_GET: "{result} = {arg1}[{arg2}]",
+    OpCode.LIST_SET: "{arg1}[{arg2}] = {result}",
+    OpCode.DICT_CREATE: "{result} = {{}}",
+    OpCode.DICT_SET: "{arg1}[{arg2}] = {result}",
+    OpCode.BREAK: "break",
+    OpCode.CONTINUE: "continue",
+    OpCode.PHI: "{result} = phi({arg1})",
+    OpCode.PARAM: "param {arg1}",
+    OpCode.ENTER: "enter ({arg1}), {arg2}",
+    OpCode.LEAVE: "leave",
+    OpCode.FOR_RANGE_INIT: "{result} = range({arg1})",
+    OpCode.FOR_RANGE_NEXT: "{result} = next({arg1}) else goto {arg2}",
+    OpCode.ITER_INIT: "{result} = iter({arg1})",
+    OpCode.ITER_NEXT: "{result} = next({arg1}) else goto {arg2}",
+}
+for _op, _symbol in OP_SYMBOLS.items():
+    TAC_FORMATS[_op] = "{result} = {arg1} %s {arg2}" % _symbol
+
+# Saltos condicionales fundidos con una comparación: saltan a la etiqueta de
+# result si arg1 y arg2 cumplen la comparación
+COMPARE_JUMPS = {
+    OpCode.IF_EQ: '==', OpCode.IF_NE: '!=', OpCode.IF_LT: '<',
+    OpCode.IF_GT: '>', OpCode.IF_LE: '<=', OpCode.IF_GE: '>='
+}
+for _op, _symbol in COMPARE_JUMPS.items():
+    TAC_FORMATS[_op] = "if {arg1} %s {arg2} goto {result}" % _symbol
+
+# Salto fundido que equivale a una comparación seguida de IF_FALSE: salta si no se cumple
+NEGATED_JUMPS = {
+    OpCode.EQ: OpCode.IF_NE, OpCode.NEQ: OpCode.IF_EQ, OpCode.LT: OpCode.IF_GE,
+    OpCode.GT: OpCode.IF_LE, OpCode.LTE: OpCode.IF_GT, OpCode.GTE: OpCode.IF_LT
+}
+
+# Salto fundido que equivale a una comparación seguida de IF_TRUE: salta si se cumple
+COMPARISON_JUMPS = {
+    OpCode.EQ: OpCode.IF_EQ, OpCode.NEQ: OpCode.IF_NE, OpCode.LT: OpCode.IF_LT,
+    OpCode.GT: OpCode.IF_GT, OpCode.LTE: OpCode.IF_LE, OpCode.GTE: OpCode.IF_GE
+}
+
+# Actualizaciones en el lugar (x += v): result se lee y se redefine con la
+# operación aritmética de su valor y arg1, sin pasar por un temporal
+INPLACE_OPS = {
+    OpCode.ADD_INPLACE: OpCode.ADD, OpCode.SUB_INPLACE: OpCode.SUB, OpCode.MUL_INPLACE: OpCode.MUL,
+    OpCode.DIV_INPLACE: OpCode.DIV, OpCode.MOD_INPLACE: OpCode.MOD
+}
+INPLACE_FORMS = {base: op for op, base in INPLACE_OPS.items()}
+# Operación en el lugar de cada asignación aumentada, por su operador ('+' para +=)
+AUGMENTED_OPS = {OP_SYMBOLS[base]: op for op, base in INPLACE_OPS.items()}
+for _op, _base in INPLACE_OPS.items():
+    TAC_FORMATS[_op] = "{result} %s= {arg1}" % OP_SYMBOLS[_base]
+
+# Operaciones cuya forma cambia si el operando opcional está vacío
+TAC_OPTIONAL_FORMATS = {
+    OpCode.CALL: ('arg2', "{result} = {arg1}({arg2})", "{result} = {arg1}()"),
+    OpCode.RETURN: ('arg1', "return {arg1}", "return"),
+    OpCode.DEL: ('arg2', "del {arg1}[{arg2}]", "del {arg1}"),
+}
+
+# Funciones predefinidas: reciben su argumento en arg2; las demás llamadas son
+# a funciones de usuario, con los argumentos pasados antes con PARAM
+BUILTIN_FUNCTIONS = ('len', 'input', 'int', 'float', 'str')
+
+# Llamada a función de usuario: arg2 es el número de argumentos
+USER_CALL_FORMAT = "{result} = call {arg1}, {arg2}"
+
+
+class Operand(str):
+    """Operando TAC tipado.
+    
+    Su texto es la forma en que aparece en el TAC, así se compara, indexa y
+    muestra igual que un nombre; las fases distinguen constantes, variables,
+    temporales y etiquetas con isinstance en lugar de analizar el texto.
+    """
+    __slots__ = ()
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({str.__repr__(self)})"
+
+
+class Var(Operand):
+    """Variable del programa"""
+    __slots__ = ()
+
+
+class Temp(Var):
+    """Variable generada por el compilador (temporales y contadores de bucle)"""
+    __slots__ = ()
+
+
+class Label(Operand):
+    """Etiqueta de salto o de función"""
+    __slots__ = ()
+
+
+class Const(Operand):
+    """Constante; value guarda el valor de Python ya convertido"""
+    
+    def __new__(cls, value):
+        text = f'"{value}"' if isinstance(value, str) else str(value)
+        const = super().__new__(cls, text)
+        const.value = value
+        return const
+    
+    def __getnewargs__(self):
+        return (self.value,)
+    
+    def __repr__(self):
+        return f"Const({self.value!r})"
+    
+    @property
+    def is_number(self):
+        return type(self.value) in (int, float)
+
+
+class ArgList(tuple):
+    """Lista de operandos (parámetros de ENTER, argumentos de una phi, inicio, fin y
+    paso de FOR_RANGE_INIT), separados por comas en el TAC"""
+    __slots__ = ()
+    
+    def __str__(self):
+        return ', '.join(self)
+
+
+# Operaciones que agregan elementos al contenedor de arg1: no es su último uso
+BUILDING_OPS = frozenset({OpCode.LIST_APPEND, OpCode.DICT_SET})
+
+# Avanzan el iterador de arg1 y asignan el siguiente valor a result; al agotarse saltan a arg2
+LOOP_NEXT_OPS = frozenset({OpCode.FOR_RANGE_NEXT, OpCode.ITER_NEXT})
+
+# Campo con la etiqueta de destino de cada salto
+JUMP_FIELDS = {
+    OpCode.GOTO: 'arg1', OpCode.IF_FALSE: 'arg2', OpCode.IF_TRUE: 'arg2',
+    OpCode.FOR_RANGE_NEXT: 'arg2', OpCode.ITER_NEXT: 'arg2'
+}
+JUMP_FIELDS.update((_op, 'result') for _op in COMPARE_JUMPS)
+
+# Campos que contienen una etiqueta (0: arg1, 1: arg2, 2: result)
+LABEL_FIELDS = {(OpCode.LABEL, 0)} | {
+    (op, ('arg1', 'arg2', 'result').index(field)) for op, field in JUMP_FIELDS.items()
+}
+
+
+def jump_target(instr):
+    """Etiqueta a la que puede saltar la instrucción, o None"""
+    field = JUMP_FIELDS.get(instr.op)
+    return getattr(instr, field) if field else None
+
+
+def retarget(instr, label):
+    """Copia de un salto con otra etiqueta de destino"""
+    fields = {'arg1': instr.arg1, 'arg2': instr.arg2, 'result': instr.result}
+    fields[JUMP_FIELDS[instr.op]] = label
+    return TACInstruction(instr.op, **fields)
+
+
+def parse_operand(text):
+    """Convierte el texto de un operando en un operando tipado.
+    
+    El generador ya emite operandos tipados; esto solo se usa para las
+    instrucciones construidas con texto, una vez al crearlas.
+    """
+    if len(text) >= 2 and text.startswith('"') and text.endswith('"'):
+        return Const(text[1:-1])
+    if text in ('True', 'False'):
+        return Const(text == 'True')
+    try:
+        return Const(float(text) if '.' in text else int(text))
+    except ValueError:
+        pass
+    if text.startswith('_') or (text[:1] == 't' and text[1:].isdigit()):
+        return Temp(text)
+    return Var(text)
+
+
+def typed_operands(op, operands):
+    """Convierte a operandos tipados los campos de texto de una instrucción"""
+    typed = []
+    for field, value in enumerate(operands):
+        if type(value) is str:
+            if (op, field) in LABEL_FIELDS:
+                value = Label(value)
+            elif op is OpCode.CALL and field == 0:
+                pass  # Nombre de la función llamada
+            else:
+                value = parse_operand(value)
+        typed.append(value)
+    return typed
+
+
+def frame_locals(params, body):
+    """Variables locales del marco de una función, en orden de primera definición.
+    
+    body son las instrucciones que siguen a ENTER; se recorren hasta LEAVE.
+    Los parámetros y los temporales no ocupan posiciones locales.
+    """
+    names = []
+    for instr in body:
+        if instr.op is OpCode.LEAVE:
+            break
+        result = instr.result
+        if instr.op in (OpCode.LIST_SET, OpCode.DICT_SET) or not isinstance(result, Var):
+            continue
+        if isinstance(result, Temp) or result in params or result in names:
+            continue
+        names.append(result)
+    return names
+
+
+def returns_value(body):
+    """Indica si toda salida de una función retorna un valor.
+
+    body son las instrucciones entre ENTER y LEAVE: ningún return alcanzable va
+    sin valor y no se llega al LEAVE. Tras un return o un goto el código es
+    inalcanzable hasta la siguiente etiqueta (el return 1 y el goto que lo
+    sigue en un if/else que retorna en ambas ramas).
+    """
+    jumps = set()  # Etiquetas a las que salta código alcanzable
+    reachable = True
+    for instr in body:
+        if instr.op is OpCode.LABEL:
+            reachable = True
+        elif reachable:
+            if instr.op is OpCode.RETURN and instr.arg1 is None:
+                return False
+            target = jump_target(instr)
+            if target is not None:
+                jumps.add(target)
+            reachable = instr.op not in (OpCode.RETURN, OpCode.GOTO)
+    position = len(body)
+    while position > 0 and body[position - 1].op is OpCode.LABEL:
+        if body[position - 1].arg1 in jumps:
+            return False
+        position -= 1
+    return position > 0 and body[position - 1].op in (OpCode.RETURN, OpCode.GOTO)
+
+
+def is_range_call(node):
+    """Indica si el iterable de un for es una llamada a range()"""
+    return isinstance(node, CallNode) and node.function == 'range'
+
+
+def lower_loops(instructions):
+    """TAC equivalente sin FOR_RANGE_* ni ITER_*, para los backends que no los implementan.
+    
+    El iterador pasa a ser un contador: FOR_RANGE_NEXT compara con el fin
+    (según el signo del paso) y ITER_NEXT con la longitud actual de la
+    secuencia, que se vuelve a leer en cada vuelta. El valor se asigna y el
+    contador avanza antes del cuerpo, así el cuerpo no cambia.
+    """
+    lowered = []
+    loops = {}  # {iterador: (fin, paso) o secuencia}
+    for instr in instructions:
+        op = instr.op
+        iterator = instr.result if op in (OpCode.FOR_RANGE_INIT, OpCode.ITER_INIT) else instr.arg1
+        if op is OpCode.FOR_RANGE_INIT:
+            start, stop, step = instr.arg1
+            # El fin y el paso se evalúan una sola vez, como en range()
+            if not isinstance(stop, Const):
+                lowered.append(TACInstruction(OpCode.ASSIGN, stop, None, Temp(f"{iterator}_stop")))
+                stop = Temp(f"{iterator}_stop")
+            if not isinstance(step, Const):
+                lowered.append(TACInstruction(OpCode.ASSIGN, step, None, Temp(f"{iterator}_step")))
+                step = Temp(f"{iterator}_step")
+            lowered.append(TACInstruction(OpCode.ASSIGN, start, None, iterator))
+            loops[iterator] = (stop, step)
+        elif op is OpCode.FOR_RANGE_NEXT:
+            stop, step = loops[iterator]
+            cond = Temp(f"{iterator}_t")
+            if isinstance(step, Const):
+                compare = OpCode.LT if step.value > 0 else OpCode.GT
+                lowered.append(TACInstruction(compare, iterator, stop, cond))
+            else:
+                # (contador - fin) * paso < 0 vale para pasos de cualquier signo
+                lowered.append(TACInstruction(OpCode.SUB, iterator, stop, cond))
+                lowered.append(TACInstruction(OpCode.MUL, cond, step, cond))
+                lowered.append(TACInstruction(OpCode.LT, cond, Const(0), cond))
+            lowered.append(TACInstruction(OpCode.IF_FALSE, cond, instr.arg2))
+            lowered.append(TACInstruction(OpCode.ASSIGN, iterator, None, instr.result))
+            lowered.append(TACInstruction(OpCode.ADD, iterator, step, iterator))
+        elif op is OpCode.ITER_INIT:
+            sequence = Temp(f"{iterator}_seq")
+            lowered.append(TACInstruction(OpCode.ASSIGN, instr.arg1, None, sequence))
+            lowered.append(TACInstruction(OpCode.ASSIGN, Const(0), None, iterator))
+            loops[iterator] = sequence
+        elif op is OpCode.ITER_NEXT:
+            sequence = loops[iterator]
+            length, cond = Temp(f"{iterator}_len"), Temp(f"{iterator}_t")
+            lowered.append(TACInstruction(OpCode.CALL, 'len', sequence, length))
+            lowered.append(TACInstruction(OpCode.LT, iterator, length, cond))
+            lowered.append(TACInstruction(OpCode.IF_FALSE, cond, instr.arg2))
+            get = TACInstruction(OpCode.LIST_GET, sequence, iterator, instr.result)
+            get.in_bounds = True  # Comprobado contra la longitud justo antes
+            lowered.append(get)
+            lowered.append(TACInstruction(OpCode.ADD, iterator, Const(1), iterator))
+        else:
+            lowered.append(instr)
+    return lowered
+
+
 class TACInstruction:
     """Representa una instrucción TAC"""
+    __slots__ = ('op', 'arg1', 'arg2', 'result', 'types', 'in_bounds')
+    
     def __init__(self, op, arg1=None, arg2=None, result=None):
-        self.op = op
+        # Las operaciones dadas por nombre se convierten a OpCode
+        self.op = OpCode[op] if isinstance(op, str) else op
+        if type(arg1) is str or type(arg2) is str or type(result) is str:
+            arg1, arg2, result = typed_operands(self.op, (arg1, arg2, result))
         self.arg1 = arg1
         self.arg2 = arg2
         self.result = result
+        self.types = None  # (arg1, arg2, result) anotados por tac_types.annotate_types
+        self.in_bounds = False  # Índice probado dentro de los límites (range_analysis)
     
     def __str__(self):
-        if self.op == 'ASSIGN':
-            return f"{self.result} = {self.arg1}"
-        elif self.op in ['ADD', 'SUB', 'MUL', 'DIV', 'MOD']:
-            op_symbol = {
-                'ADD': '+', 'SUB': '-', 'MUL': '*', 'DIV': '/', 'MOD': '%'
-            }[self.op]
-            return f"{self.result} = {self.arg1} {op_symbol} {self.arg2}"
-        elif self.op in ['EQ', 'NEQ', 'LT', 'GT', 'LTE', 'GTE']:
-            op_symbol = {
-                'EQ': '==', 'NEQ': '!=', 'LT': '<', 'GT': '>', 'LTE': '<=', 'GTE': '>='
-            }[self.op]
-            return f"{self.result} = {self.arg1} {op_symbol} {self.arg2}"
-        elif self.op == 'NEG':
-            return f"{self.result} = -{self.arg1}"
-        elif self.op == 'PRINT':
-            return f"print({self.arg1})"
-        elif self.op == 'LABEL':
-            return f"{self.arg1}:"
-        elif self.op == 'GOTO':
-            return f"goto {self.arg1}"
-        elif self.op == 'IF_FALSE':
-            return f"if_false {self.arg1} goto {self.arg2}"
-        elif self.op == 'LIST_CREATE':
-            return f"{self.result} = []"
-        elif self.op == 'LIST_APPEND':
-            return f"{self.arg1}.append({self.arg2})"
-        elif self.op == 'LIST_GET':
-            return f"{self.result} = {self.arg1}[{self.arg2}]"
-        elif self.op == 'LIST_SET':
-            return f"{self.arg1}[{self.arg2}] = {self.result}"
-        elif self.op == 'DICT_CREATE':
-            return f"{self.result} = {{}}"
-        elif self.op == 'DICT_SET':
-            return f"{self.arg1}[{self.arg2}] = {self.result}"
-        elif self.op == 'CALL':
-            if self.arg2:
-                return f"{self.result} = {self.arg1}({self.arg2})"
-            else:
-                return f"{self.result} = {self.arg1}()"
-        elif self.op == 'RETURN':
-            if self.arg1:
-                return f"return {self.arg1}"
-            else:
-                return "return"
-        elif self.op == 'DEL':
-            if self.arg2:
-                return f"del {self.arg1}[{self.arg2}]"
-            else:
-                return f"del {self.arg1}"
-        elif self.op == 'BREAK':
-            return "break"
-        elif self.op == 'CONTINUE':
-            return "continue"
-        else:
-            return f"{self.op} {self.arg1} {self.arg2} {self.result}"
+        op = self.op
+        template = TAC_FORMATS.get(op)
+        if op is OpCode.CALL and self.arg1 not in BUILTIN_FUNCTIONS:
+            template = USER_CALL_FORMAT
+        if template is None:
+            optional = TAC_OPTIONAL_FORMATS.get(op)
+            if optional is None:
+                return f"{self.op} {self.arg1} {self.arg2} {self.result}"
+            field, with_value, without_value = optional
+            template = with_value if getattr(self, field) else without_value
+        return template.format(arg1=self.arg1, arg2=self.arg2, result=self.result)
+
+
+class TACProgram:
+    """Programa TAC empaquetado en columnas.
+    
+    Guarda los códigos de operación y los identificadores de operandos en
+    arrays compactos; cada operando distinto se almacena una sola vez en la
+    tabla de operandos (-1 representa un operando vacío).
+    """
+    
+    def __init__(self, instructions=()):
+        self.opcodes = array('B')
+        self.arg1 = array('i')
+        self.arg2 = array('i')
+        self.result = array('i')
+        self.flags = array('B')  # bit 0: in_bounds
+        self.operands = []
+        self.operand_ids = {}
+        for instr in instructions:
+            self.append(instr)
+    
+    def intern(self, operand):
+        """Identificador del operando en la tabla, agregándolo si es nuevo"""
+        if operand is None:
+            return -1
+        key = (type(operand), operand)
+        operand_id = self.operand_ids.get(key)
+        if operand_id is None:
+            operand_id = len(self.operands)
+            self.operands.append(operand)
+            self.operand_ids[key] = operand_id
+        return operand_id
+    
+    def append(self, instr):
+        if not isinstance(instr.op, OpCode):
+            raise ValueError(f"Operación TAC desconocida: {instr.op}")
+        self.opcodes.append(instr.op)
+        self.arg1.append(self.intern(instr.arg1))
+        self.arg2.append(self.intern(instr.arg2))
+        self.result.append(self.intern(instr.result))
+        self.flags.append(1 if instr.in_bounds else 0)
+    
+    def operand(self, operand_id):
+        return None if operand_id < 0 else self.operands[operand_id]
+    
+    def __len__(self):
+        return len(self.opcodes)
+    
+    def __getitem__(self, index):
+        """Reconstruye la instrucción en la posición index"""
+        instr = TACInstruction(
+            OpCode(self.opcodes[index]),
+            self.operand(self.arg1[index]),
+            self.operand(self.arg2[index]),
+            self.operand(self.result[index]),
+        )
+        instr.in_bounds = bool(self.flags[index] & 1)
+        return instr
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def to_instructions(self):
+        return list(self)
 
 
 class TACGenerator:
@@ -79,20 +496,54 @@ class TACGenerator:
         self.instructions = []
         self.temp_counter = 0
         self.label_counter = 0
+        self.iter_counter = 0
+        self.free_temps = []      # Números de temporales liberados (montículo)
+        self.live_temps = set()   # Temporales cuyo único uso aún no se emitió
+        self.peak_temps = 0
     
     def new_temp(self):
-        temp = f"t{self.temp_counter}"
-        self.temp_counter += 1
+        """Temporal libre de menor número; si no queda ninguno, uno nuevo"""
+        if self.free_temps:
+            number = heappop(self.free_temps)
+        else:
+            number = self.temp_counter
+            self.temp_counter += 1
+        temp = Temp(f"t{number}")
+        self.live_temps.add(temp)
+        self.peak_temps = max(self.peak_temps, len(self.live_temps))
         return temp
     
+    def release_temp(self, operand):
+        """Devuelve un temporal a la reserva una vez emitido su uso"""
+        if isinstance(operand, ArgList):
+            for arg in operand:
+                self.release_temp(arg)
+        elif isinstance(operand, Temp) and operand in self.live_temps:
+            self.live_temps.remove(operand)
+            heappush(self.free_temps, int(operand[1:]))
+    
+    def new_iterator(self):
+        """Nombre del iterador de un bucle for"""
+        iterator = Temp(f"_it{self.iter_counter}")
+        self.iter_counter += 1
+        return iterator
+    
     def new_label(self):
-        label = f"L{self.label_counter}"
+        label = Label(f"L{self.label_counter}")
         self.label_counter += 1
         return label
     
-    def emit(self, op, arg1=None, arg2=None, result=None):
+    def emit(self, op, arg1=None, arg2=None, result=None, release=True):
+        """Agrega una instrucción; con release=False sus temporales siguen reservados"""
         instr = TACInstruction(op, arg1, arg2, result)
         self.instructions.append(instr)
+        if self.live_temps and release:
+            # Cada temporal de una expresión se lee una sola vez
+            if instr.op not in BUILDING_OPS:
+                self.release_temp(instr.arg1)
+            self.release_temp(instr.arg2)
+            if instr.op in (OpCode.LIST_SET, OpCode.DICT_SET):
+                self.release_temp(instr.result)
         return instr
     
     def generate(self, ast):
@@ -107,13 +558,29 @@ class TACGenerator:
     def generic_visit(self, node):
         raise Exception(f'No hay método visit para {node.__class__.__name__}')
     
+    def visit_statement(self, node):
+        live = set(self.live_temps)
+        self.visit(node)
+        # Los temporales de la sentencia cuyo valor no se usó (p. ej. una llamada suelta)
+        for temp in self.live_temps - live:
+            self.release_temp(temp)
+    
+    def get_temp_report(self):
+        """Retorna un reporte del uso de temporales"""
+        return (f"Temporales distintos: {self.temp_counter}\n"
+                f"Pico de temporales vivos: {self.peak_temps}\n")
+    
     def visit_ProgramNode(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            self.visit_statement(statement)
     
     def visit_AssignmentNode(self, node):
         expr_result = self.visit(node.expression)
-        self.emit('ASSIGN', expr_result, None, node.identifier)
+        self.emit(OpCode.ASSIGN, expr_result, None, Var(node.identifier))
+    
+    def visit_AugAssignNode(self, node):
+        expr_result = self.visit(node.expression)
+        self.emit(AUGMENTED_OPS[node.operator], expr_result, None, Var(node.identifier))
     
     def visit_IndexAssignmentNode(self, node):
         index_result = self.visit(node.index_expr)
@@ -121,97 +588,112 @@ class TACGenerator:
         
         # Si target es un string simple
         if isinstance(node.target, str):
-            self.emit('LIST_SET', node.target, index_result, value_result)
+            instr = self.emit(OpCode.LIST_SET, Var(node.target), index_result, value_result)
+            instr.in_bounds = getattr(node, 'in_bounds', False)
         else:
             # Si target es un IndexNode (acceso anidado)
             # Primero obtenemos el valor del contenedor
-            container_result = self.visit(node.target)
+            container_result = self.visit_store_target(node)
             # Luego asignamos al índice de ese contenedor
-            self.emit('LIST_SET', container_result, index_result, value_result)
+            self.emit(OpCode.LIST_SET, container_result, index_result, value_result)
     
     def visit_PrintNode(self, node):
         expr_result = self.visit(node.expression)
-        self.emit('PRINT', expr_result)
+        self.emit(OpCode.PRINT, expr_result)
+    
+    def visit_condition(self, node, condition, false_label):
+        """Evalúa la condición principal de un if/while y salta a false_label si es falsa"""
+        self.visit_branch(condition, false_label, False)
+    
+    def visit_branch(self, node, label, jump_if):
+        """Salta a label si el valor de verdad de node es jump_if; si no, sigue.
+        
+        and, or y not no calculan un valor: cada operando salta directamente a
+        su destino y el derecho solo se evalúa si el izquierdo no decide.
+        """
+        if isinstance(node, BoolOpNode):
+            # and decide con un operando falso; or, con uno verdadero
+            decides = node.operator == 'or'
+            if jump_if == decides:
+                self.visit_branch(node.left, label, jump_if)
+                self.visit_branch(node.right, label, jump_if)
+            else:
+                skip_label = self.new_label()
+                self.visit_branch(node.left, skip_label, decides)
+                self.visit_branch(node.right, label, jump_if)
+                self.emit(OpCode.LABEL, skip_label)
+        elif isinstance(node, UnaryOpNode) and node.operator == 'not':
+            self.visit_branch(node.operand, label, not jump_if)
+        else:
+            value = self.visit(node)
+            self.emit(OpCode.IF_TRUE if jump_if else OpCode.IF_FALSE, value, label)
+    
+    def visit_iterable(self, node):
+        """Evalúa el iterable de un for; para range() devuelve (inicio, fin, paso)"""
+        if is_range_call(node.iterable):
+            args = [self.visit(arg) for arg in node.iterable.args[:3]]
+            if len(args) < 2:
+                args = [Const(0)] + (args or [Const(0)])
+            if len(args) < 3:
+                args.append(Const(1))
+            return ArgList(args)
+        return self.visit(node.iterable)
+    
+    def visit_store_target(self, node):
+        """Evalúa el contenedor de una asignación a índice anidada"""
+        return self.visit(node.target)
     
     def visit_IfNode(self, node):
-        cond_result = self.visit(node.condition)
         else_label = self.new_label()
+        self.visit_condition(node, node.condition, else_label)
         end_label = self.new_label()
         
-        self.emit('IF_FALSE', cond_result, else_label)
         self.visit(node.then_block)
-        self.emit('GOTO', end_label)
+        self.emit(OpCode.GOTO, end_label)
         
-        self.emit('LABEL', else_label)
+        self.emit(OpCode.LABEL, else_label)
         for elif_cond, elif_block in node.elif_parts:
             next_label = self.new_label()
-            elif_result = self.visit(elif_cond)
-            self.emit('IF_FALSE', elif_result, next_label)
+            self.visit_branch(elif_cond, next_label, False)
             self.visit(elif_block)
-            self.emit('GOTO', end_label)
-            self.emit('LABEL', next_label)
+            self.emit(OpCode.GOTO, end_label)
+            self.emit(OpCode.LABEL, next_label)
         
         if node.else_block:
             self.visit(node.else_block)
         
-        self.emit('LABEL', end_label)
+        self.emit(OpCode.LABEL, end_label)
     
     def visit_WhileNode(self, node):
         start_label = self.new_label()
         end_label = self.new_label()
         
-        self.emit('LABEL', start_label)
-        cond_result = self.visit(node.condition)
-        self.emit('IF_FALSE', cond_result, end_label)
+        self.emit(OpCode.LABEL, start_label)
+        self.visit_condition(node, node.condition, end_label)
         self.visit(node.block)
-        self.emit('GOTO', start_label)
-        self.emit('LABEL', end_label)
+        self.emit(OpCode.GOTO, start_label)
+        self.emit(OpCode.LABEL, end_label)
     
     def visit_ForNode(self, node):
-        if isinstance(node.iterable, CallNode) and node.iterable.function == 'range':
-            limit_result = self.visit(node.iterable.args[0])
-            counter = node.identifier
-            
-            self.emit('ASSIGN', '0', None, counter)
-            start_label = self.new_label()
-            end_label = self.new_label()
-            
-            self.emit('LABEL', start_label)
-            temp_cond = self.new_temp()
-            self.emit('LT', counter, limit_result, temp_cond)
-            self.emit('IF_FALSE', temp_cond, end_label)
-            
-            self.visit(node.block)
-            
-            temp_inc = self.new_temp()
-            self.emit('ADD', counter, '1', temp_inc)
-            self.emit('ASSIGN', temp_inc, None, counter)
-            self.emit('GOTO', start_label)
-            self.emit('LABEL', end_label)
+        # El iterador guarda el estado del bucle: la cabecera es una sola instrucción
+        # que asigna el siguiente valor o sale del bucle
+        iterable = self.visit_iterable(node)
+        iterator = self.new_iterator()
+        if is_range_call(node.iterable):
+            self.emit(OpCode.FOR_RANGE_INIT, iterable, None, iterator)
+            next_op = OpCode.FOR_RANGE_NEXT
         else:
-            list_result = self.visit(node.iterable)
-            counter = f"_idx_{node.identifier}"
-            list_len = self.new_temp()
-            
-            self.emit('CALL', 'len', list_result, list_len)
-            self.emit('ASSIGN', '0', None, counter)
-            
-            start_label = self.new_label()
-            end_label = self.new_label()
-            
-            self.emit('LABEL', start_label)
-            temp_cond = self.new_temp()
-            self.emit('LT', counter, list_len, temp_cond)
-            self.emit('IF_FALSE', temp_cond, end_label)
-            
-            self.emit('LIST_GET', list_result, counter, node.identifier)
-            self.visit(node.block)
-            
-            temp_inc = self.new_temp()
-            self.emit('ADD', counter, '1', temp_inc)
-            self.emit('ASSIGN', temp_inc, None, counter)
-            self.emit('GOTO', start_label)
-            self.emit('LABEL', end_label)
+            self.emit(OpCode.ITER_INIT, iterable, None, iterator)
+            next_op = OpCode.ITER_NEXT
+        
+        start_label = self.new_label()
+        end_label = self.new_label()
+        
+        self.emit(OpCode.LABEL, start_label)
+        self.emit(next_op, iterator, end_label, Var(node.identifier))
+        self.visit(node.block)
+        self.emit(OpCode.GOTO, start_label)
+        self.emit(OpCode.LABEL, end_label)
     
     def visit_BinaryOpNode(self, node):
         left_result = self.visit(node.left)
@@ -219,8 +701,9 @@ class TACGenerator:
         temp = self.new_temp()
         
         op_map = {
-            '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV', '%': 'MOD',
-            '==': 'EQ', '!=': 'NEQ', '<': 'LT', '>': 'GT', '<=': 'LTE', '>=': 'GTE'
+            '+': OpCode.ADD, '-': OpCode.SUB, '*': OpCode.MUL, '/': OpCode.DIV, '%': OpCode.MOD,
+            '==': OpCode.EQ, '!=': OpCode.NEQ, '<': OpCode.LT, '>': OpCode.GT,
+            '<=': OpCode.LTE, '>=': OpCode.GTE
         }
         
         op_code = op_map.get(node.operator, 'UNKNOWN')
@@ -228,80 +711,107 @@ class TACGenerator:
         
         return temp
     
+    def visit_BoolOpNode(self, node):
+        # a and b vale a si a es falso y b si no (or al revés): sin evaluar b si a decide
+        left_result = self.visit(node.left)
+        if isinstance(left_result, Temp) and left_result in self.live_temps:
+            result = left_result
+        else:
+            result = self.new_temp()
+            self.emit(OpCode.ASSIGN, left_result, None, result)
+        end_label = self.new_label()
+        jump = OpCode.IF_TRUE if node.operator == 'or' else OpCode.IF_FALSE
+        self.emit(jump, result, end_label, release=False)
+        right_result = self.visit(node.right)
+        self.emit(OpCode.ASSIGN, right_result, None, result)
+        self.emit(OpCode.LABEL, end_label)
+        return result
+    
     def visit_UnaryOpNode(self, node):
         operand_result = self.visit(node.operand)
         temp = self.new_temp()
-        self.emit('NEG', operand_result, None, temp)
+        self.emit(OpCode.NOT if node.operator == 'not' else OpCode.NEG, operand_result, None, temp)
         return temp
     
     def visit_NumberNode(self, node):
-        return str(node.value)
+        return Const(node.value)
     
     def visit_StringNode(self, node):
-        return f'"{node.value}"'
+        return Const(node.value)
     
     def visit_IdentifierNode(self, node):
-        return node.name
+        return Var(node.name)
     
     def visit_ListNode(self, node):
         temp_list = self.new_temp()
-        self.emit('LIST_CREATE', None, None, temp_list)
+        self.emit(OpCode.LIST_CREATE, None, None, temp_list)
         for element in node.elements:
             elem_result = self.visit(element)
-            self.emit('LIST_APPEND', temp_list, elem_result)
+            self.emit(OpCode.LIST_APPEND, temp_list, elem_result)
         return temp_list
     
     def visit_DictionaryNode(self, node):
         temp_dict = self.new_temp()
-        self.emit('DICT_CREATE', None, None, temp_dict)
+        self.emit(OpCode.DICT_CREATE, None, None, temp_dict)
         for key, value in node.items:
             key_result = self.visit(key)
             value_result = self.visit(value)
-            self.emit('DICT_SET', temp_dict, key_result, value_result)
+            self.emit(OpCode.DICT_SET, temp_dict, key_result, value_result)
         return temp_dict
     
     def visit_IndexNode(self, node):
         list_result = self.visit(node.list_expr)
         index_result = self.visit(node.index_expr)
         temp = self.new_temp()
-        self.emit('LIST_GET', list_result, index_result, temp)
+        instr = self.emit(OpCode.LIST_GET, list_result, index_result, temp)
+        instr.in_bounds = getattr(node, 'in_bounds', False)
         return temp
     
     def visit_CallNode(self, node):
         if node.function == 'range':
             if node.args:
                 return self.visit(node.args[0])
-            return '0'
+            return Const(0)
         elif node.function == 'len':
             arg_result = self.visit(node.args[0]) if node.args else None
             temp = self.new_temp()
-            self.emit('CALL', 'len', arg_result, temp)
+            self.emit(OpCode.CALL, 'len', arg_result, temp)
             return temp
         elif '.' in node.function:
             parts = node.function.split('.')
-            list_name = parts[0]
+            list_name = Var(parts[0])
             method = parts[1]
             if method == 'append' and node.args:
                 arg_result = self.visit(node.args[0])
-                self.emit('LIST_APPEND', list_name, arg_result)
+                self.emit(OpCode.LIST_APPEND, list_name, arg_result)
             return list_name
         else:
-            args_str = ', '.join([self.visit(arg) for arg in node.args]) if node.args else None
+            # Se evalúan todos los argumentos antes de pasarlos, así una llamada
+            # anidada no intercala sus PARAM con los de esta
+            args = [self.visit(arg) for arg in node.args]
+            for arg in args:
+                self.emit(OpCode.PARAM, arg)
             temp = self.new_temp()
-            self.emit('CALL', node.function, args_str, temp)
+            self.emit(OpCode.CALL, node.function, Const(len(args)), temp)
             return temp
     
     def visit_FunctionNode(self, node):
-        self.emit('LABEL', f"func_{node.name}")
+        # ENTER enlaza los argumentos con los parámetros declarados, por posición,
+        # y reserva el marco; LEAVE cierra la función y retorna sin valor
+        params = ArgList(Var(param) for param in node.params)
+        self.emit(OpCode.LABEL, Label(f"func_{node.name}"))
+        enter = self.emit(OpCode.ENTER, params)
+        start = len(self.instructions)
         self.visit(node.body)
-        self.emit('RETURN')
+        enter.arg2 = Const(len(frame_locals(params, self.instructions[start:])))
+        self.emit(OpCode.LEAVE)
     
     def visit_ReturnNode(self, node):
         if node.expression:
             expr_result = self.visit(node.expression)
-            self.emit('RETURN', expr_result)
+            self.emit(OpCode.RETURN, expr_result)
         else:
-            self.emit('RETURN')
+            self.emit(OpCode.RETURN)
     
     def visit_GlobalNode(self, node):
         pass
@@ -311,31 +821,31 @@ class TACGenerator:
         except_label = self.new_label()
         end_label = self.new_label()
         
-        self.emit('LABEL', try_label)
+        self.emit(OpCode.LABEL, try_label)
         self.visit(node.try_block)
-        self.emit('GOTO', end_label)
+        self.emit(OpCode.GOTO, end_label)
         
-        self.emit('LABEL', except_label)
+        self.emit(OpCode.LABEL, except_label)
         for exception_type, except_block in node.except_blocks:
             self.visit(except_block)
         
-        self.emit('LABEL', end_label)
+        self.emit(OpCode.LABEL, end_label)
     
     def visit_DelNode(self, node):
         if isinstance(node.target, IndexNode):
             list_result = self.visit(node.target.list_expr)
             index_result = self.visit(node.target.index_expr)
-            self.emit('DEL', list_result, index_result)
+            self.emit(OpCode.DEL, list_result, index_result)
         else:
-            target_name = node.target.name if isinstance(node.target, IdentifierNode) else str(node.target)
-            self.emit('DEL', target_name)
+            target_name = Var(node.target.name if isinstance(node.target, IdentifierNode) else str(node.target))
+            self.emit(OpCode.DEL, target_name)
     
     def visit_BreakNode(self, node):
-        self.emit('BREAK')
+        self.emit(OpCode.BREAK)
     
     def visit_ContinueNode(self, node):
-        self.emit('CONTINUE')
+        self.emit(OpCode.CONTINUE)
     
     def visit_BlockNode(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            self.visit_statement(statement)
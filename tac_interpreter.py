@@ -3,7 +3,29 @@ Intérprete de Código TAC
 Ejecuta el código de tres direcciones y genera la salida
 """
 
-from tac_generator import TACInstruction
+import operator
+
+from tac_generator import (
+    TACInstruction, OpCode, Const, LOOP_NEXT_OPS, COMPARE_JUMPS, INPLACE_OPS, BUILTIN_FUNCTIONS, returns_value
+)
+from tac_types import annotate_types, NUMERIC_TYPES
+
+
+# Operaciones que admiten una versión especializada para operandos numéricos probados
+NUMERIC_OPERATIONS = {
+    OpCode.ADD: operator.add, OpCode.SUB: operator.sub, OpCode.MUL: operator.mul,
+    OpCode.EQ: operator.eq, OpCode.NEQ: operator.ne, OpCode.LT: operator.lt,
+    OpCode.GT: operator.gt, OpCode.LTE: operator.le, OpCode.GTE: operator.ge
+}
+
+# Comparación de cada salto fundido: salta si se cumple
+JUMP_COMPARISONS = {
+    OpCode.IF_EQ: operator.eq, OpCode.IF_NE: operator.ne, OpCode.IF_LT: operator.lt,
+    OpCode.IF_GT: operator.gt, OpCode.IF_LE: operator.le, OpCode.IF_GE: operator.ge
+}
+
+# Valor que devuelve next() cuando el iterador de un bucle se agota
+EXHAUSTED = object()
 
 
 class TACInterpreter:
@@ -14,8 +36,11 @@ class TACInterpreter:
         self.output = []
         self.pc = 0
         self.labels = {}
+        self.function_ends = {}  # {etiqueta de función: índice de su última instrucción}
+        self.loop_headers = {}  # {etiqueta: (índice, instrucción) del avance de bucle que la sigue}
         self.call_stack = []
         self.function_params = []
+        self.program_size = 0
     
     def interpret(self, instructions):
         """Ejecuta las instrucciones TAC"""
@@ -23,383 +48,680 @@ class TACInterpreter:
         self.output = []
         self.pc = 0
         self.labels = {}
+        self.function_ends = {}
+        self.loop_headers = {}
         self.call_stack = []
         self.function_params = []
+        self.program_size = len(instructions)
         
-        # Primera pasada: identificar etiquetas y funciones
+        # Tipos probados para elegir manejadores especializados
+        annotate_types(instructions)
+        
+        # Primera pasada: identificar etiquetas y el final de cada función
         for i, instr in enumerate(instructions):
-            if instr.op == 'LABEL':
+            if instr.op is OpCode.LABEL:
                 self.labels[instr.arg1] = i
+                if instr.arg1.startswith('func_'):
+                    self.function_ends[instr.arg1] = self.find_function_end(instructions, i)
+                elif i + 1 < len(instructions) and instructions[i + 1].op in LOOP_NEXT_OPS:
+                    self.loop_headers[instr.arg1] = (i + 1, instructions[i + 1])
         
-        # Encontrar el inicio del código principal (después de las definiciones de función)
-        # Buscar la última instrucción RETURN que no tiene argumentos (fin de función)
-        main_start = 0
-        for i, instr in enumerate(instructions):
-            if instr.op == 'LABEL' and instr.arg1.startswith('func_'):
-                # Encontrar el final de esta función (RETURN sin argumentos)
-                for j in range(i + 1, len(instructions)):
-                    if instructions[j].op == 'RETURN' and instructions[j].arg1 is None:
-                        main_start = j + 1
-                        break
-                break  # Solo procesamos la primera función
-        
-        # Comenzar desde el código principal
-        self.pc = main_start
-        
-        while self.pc < len(instructions):
-            instr = instructions[self.pc]
-            self.execute_instruction(instr)
+        # Cada instrucción resuelve su manejador una sola vez
+        handlers = [self.select_handler(instr) for instr in instructions]
+        for i in self.tail_calls(instructions):
+            handlers[i] = self.tail_call_handler(instructions[i])
+        
+        # El código principal salta cada definición de función que encuentra
+        self.pc = 0
+        
+        while self.pc < self.program_size:
+            handlers[self.pc](instructions[self.pc])
             self.pc += 1
         
         return '\n'.join(self.output)
     
+    def find_function_end(self, instructions, start):
+        """Índice del LEAVE que cierra la función que empieza en start
+        (en TAC sin LEAVE, su primer return sin valor)"""
+        for j in range(start + 1, len(instructions)):
+            if instructions[j].op is OpCode.LEAVE:
+                return j
+        for j in range(start + 1, len(instructions)):
+            if instructions[j].op is OpCode.RETURN and instructions[j].arg1 is None:
+                return j
+        return len(instructions) - 1
+    
+    def tail_calls(self, instructions):
+        """Índices de las llamadas en posición de cola: t = call g seguida de
+        return t, con g una función que retorna un valor en todas sus salidas
+        (si no, el llamador retornaría el valor anterior de t)"""
+        returning = set()
+        for label, end in self.function_ends.items():
+            start = self.labels[label]
+            if end <= start or instructions[start + 1].op is not OpCode.ENTER:
+                continue
+            if instructions[end].op is OpCode.LEAVE and returns_value(instructions[start + 2:end]):
+                returning.add(label[len('func_'):])
+        return [i for i, instr in enumerate(instructions[:-1])
+                if instr.op is OpCode.CALL and instr.arg1 in returning and instr.arg1 not in BUILTIN_FUNCTIONS
+                and instructions[i + 1].op is OpCode.RETURN and instructions[i + 1].arg1 == instr.result]
+    
     def execute_instruction(self, instr):
         """Ejecuta una instrucción individual"""
+        self.select_handler(instr)(instr)
+    
+    def select_handler(self, instr):
+        """Elige el manejador de una instrucción.
+        
+        Si los tipos anotados prueban los operandos se usa una versión
+        especializada que omite las comprobaciones dinámicas.
+        """
+        if instr.types:
+            handler = self.specialize(instr)
+            if handler is not None:
+                return handler
+        if instr.op is OpCode.LABEL and instr.arg1 in self.function_ends:
+            return self.exec_LABEL_function
+        if instr.op in LOOP_NEXT_OPS and instr.arg2 in self.labels:
+            return self.loop_next_handler(instr)
+        if instr.op is OpCode.GOTO and instr.arg1 in self.labels:
+            return self.goto_handler(instr)
+        if instr.op in (OpCode.IF_FALSE, OpCode.IF_TRUE) and instr.arg2 in self.labels:
+            return self.branch_handler(instr)
+        if instr.op in COMPARE_JUMPS:
+            if instr.result in self.labels:
+                return self.compare_jump_handler(instr)
+            return self.exec_compare_jump
+        return getattr(self, f'exec_{instr.op}', self.exec_NOP)
+    
+    def specialize(self, instr):
+        """Manejador especializado según los tipos probados, o None"""
+        arg1_type, arg2_type, result_type = instr.types
+        op = instr.op
+        
+        if op in NUMERIC_OPERATIONS:
+            if arg1_type in NUMERIC_TYPES and arg2_type in NUMERIC_TYPES:
+                return self.numeric_handler(instr, NUMERIC_OPERATIONS[op])
+        elif op in INPLACE_OPS and INPLACE_OPS[op] in NUMERIC_OPERATIONS:
+            if arg1_type in NUMERIC_TYPES and result_type in NUMERIC_TYPES:
+                return self.inplace_handler(instr, NUMERIC_OPERATIONS[INPLACE_OPS[op]])
+        elif op is OpCode.LIST_GET:
+            if arg1_type == 'list' and arg2_type == 'int':
+                if instr.in_bounds:
+                    return self.unchecked_get_handler(instr)
+                return self.exec_LIST_GET_list
+            if arg1_type == 'dict':
+                return self.exec_LIST_GET_dict
+        elif op is OpCode.LIST_SET:
+            if arg1_type == 'list' and arg2_type == 'int':
+                if instr.in_bounds:
+                    return self.exec_LIST_SET_unchecked
+                return self.exec_LIST_SET_list
+            if arg1_type == 'dict':
+                return self.exec_LIST_SET_dict
+        elif op is OpCode.LIST_APPEND:
+            if arg1_type == 'list':
+                return self.exec_LIST_APPEND_list
+        elif op is OpCode.CALL and instr.arg1 == 'len':
+            if arg2_type in ('list', 'str', 'dict'):
+                return self.exec_CALL_len
+        return None
+    
+    def numeric_handler(self, instr, operation):
+        """Crea un manejador para una operación con ambos operandos numéricos"""
+        read_left = self.operand_reader(instr.arg1)
+        read_right = self.operand_reader(instr.arg2)
+        result = instr.result
         
-        if instr.op == 'ASSIGN':
-            value = self.get_value(instr.arg1)
-            self.variables[instr.result] = value
+        def handler(instr):
+            self.variables[result] = operation(read_left(), read_right())
+        
+        return handler
+    
+    def inplace_handler(self, instr, operation):
+        """Crea un manejador para x op= v con x y v numéricos"""
+        read_value = self.operand_reader(instr.arg1)
+        target = instr.result
         
-        elif instr.op == 'ADD':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left + right
-        
-        elif instr.op == 'SUB':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left - right
-        
-        elif instr.op == 'MUL':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left * right
-        
-        elif instr.op == 'DIV':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            if right == 0:
-                raise Exception("Error de ejecución: División por cero")
-            self.variables[instr.result] = left / right
-        
-        elif instr.op == 'MOD':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            if right == 0:
-                raise Exception("Error de ejecución: Módulo por cero")
-            self.variables[instr.result] = left % right
-        
-        elif instr.op == 'NEG':
-            value = self.get_value(instr.arg1)
-            self.variables[instr.result] = -value
-        
-        elif instr.op == 'EQ':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left == right
-        
-        elif instr.op == 'NEQ':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left != right
-        
-        elif instr.op == 'LT':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left < right
-        
-        elif instr.op == 'GT':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left > right
-        
-        elif instr.op == 'LTE':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left <= right
-        
-        elif instr.op == 'GTE':
-            left = self.get_value(instr.arg1)
-            right = self.get_value(instr.arg2)
-            self.variables[instr.result] = left >= right
-        
-        elif instr.op == 'PRINT':
-            value = self.get_value(instr.arg1)
-            self.output.append(str(value))
-        
-        elif instr.op == 'LABEL':
-            pass
-        
-        elif instr.op == 'GOTO':
-            if instr.arg1 in self.labels:
-                self.pc = self.labels[instr.arg1] - 1
+        def inplace(instr):
+            variables = self.variables
+            variables[target] = operation(variables[target], read_value())
+        
+        return inplace
+    
+    def unchecked_get_handler(self, instr):
+        """Crea un manejador para un acceso a lista con índice probado en rango"""
+        read_list = self.operand_reader(instr.arg1)
+        read_index = self.operand_reader(instr.arg2)
+        result = instr.result
+        
+        def unchecked_get(instr):
+            self.variables[result] = read_list()[read_index()]
+        
+        return unchecked_get
+    
+    def loop_next_handler(self, instr):
+        """Crea el manejador de la cabecera de un bucle: siguiente valor o salida"""
+        iterator = instr.arg1
+        result = instr.result
+        # La etiqueta no hace nada: se continúa directamente tras ella
+        exit_pc = self.labels[instr.arg2]
+        
+        def loop_next(instr):
+            value = next(self.variables[iterator], EXHAUSTED)
+            if value is EXHAUSTED:
+                self.pc = exit_pc
             else:
-                raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg1}")
+                self.variables[result] = value
         
-        elif instr.op == 'IF_FALSE':
-            condition = self.get_value(instr.arg1)
-            if not condition:
-                if instr.arg2 in self.labels:
-                    self.pc = self.labels[instr.arg2] - 1
-                else:
-                    raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg2}")
+        return loop_next
+    
+    def goto_handler(self, instr):
+        """Crea el manejador de un salto con su destino ya resuelto"""
+        target_pc = self.labels[instr.arg1]
+        header = self.loop_headers.get(instr.arg1)
+        if header is not None and header[1].arg2 in self.labels:
+            return self.back_edge_handler(*header)
+        
+        def goto(instr):
+            self.pc = target_pc
+        
+        return goto
+    
+    def branch_handler(self, instr):
+        """Crea el manejador de un salto condicional con su destino ya resuelto"""
+        read_condition = self.operand_reader(instr.arg1)
+        target_pc = self.labels[instr.arg2]
+        jump_if = instr.op is OpCode.IF_TRUE
         
-        elif instr.op == 'LIST_CREATE':
-            self.variables[instr.result] = []
+        def branch(instr):
+            if bool(read_condition()) == jump_if:
+                self.pc = target_pc
         
-        elif instr.op == 'LIST_APPEND':
-            list_var = self.variables.get(instr.arg1, [])
-            value = self.get_value(instr.arg2)
-            if isinstance(list_var, list):
-                list_var.append(value)
+        return branch
+    
+    def back_edge_handler(self, header_pc, header):
+        """Crea el manejador del salto de vuelta a la cabecera de un bucle, que
+        avanza el iterador en el mismo paso"""
+        iterator = header.arg1
+        result = header.result
+        exit_pc = self.labels[header.arg2]
+        
+        def back_edge(instr):
+            value = next(self.variables[iterator], EXHAUSTED)
+            if value is EXHAUSTED:
+                self.pc = exit_pc
             else:
-                raise Exception(f"Error de ejecución: {instr.arg1} no es una lista")
+                self.variables[result] = value
+                self.pc = header_pc
         
-        elif instr.op == 'LIST_GET':
-            container = self.get_value(instr.arg1)
-            key = self.get_value(instr.arg2)
-            
-            if isinstance(container, list):
-                if isinstance(key, (int, float)):
-                    index = int(key)
-                    if 0 <= index < len(container):
-                        self.variables[instr.result] = container[index]
-                    else:
-                        raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
-                else:
-                    raise Exception(f"Error de ejecución: Índice debe ser número: {key}")
-            elif isinstance(container, dict):
-                if key in container:
-                    self.variables[instr.result] = container[key]
+        return back_edge
+    
+    def compare_jump_handler(self, instr):
+        """Crea el manejador de un salto fundido con su comparación"""
+        compare = JUMP_COMPARISONS[instr.op]
+        read_left = self.operand_reader(instr.arg1)
+        read_right = self.operand_reader(instr.arg2)
+        target_pc = self.labels[instr.result]
+        
+        def compare_jump(instr):
+            if compare(read_left(), read_right()):
+                self.pc = target_pc
+        
+        return compare_jump
+    
+    def operand_reader(self, operand):
+        """Devuelve una función que lee el operando"""
+        if isinstance(operand, Const):
+            value = operand.value
+            return lambda: value
+        
+        def read():
+            try:
+                return self.variables[operand]
+            except KeyError:
+                raise Exception(f"Error de ejecución: Variable no definida: {operand}")
+        
+        return read
+    
+    def exec_ASSIGN(self, instr):
+        value = self.get_value(instr.arg1)
+        self.variables[instr.result] = value
+    
+    def exec_ADD(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left + right
+    
+    def exec_SUB(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left - right
+    
+    def exec_MUL(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left * right
+    
+    def exec_DIV(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        if right == 0:
+            raise Exception("Error de ejecución: División por cero")
+        self.variables[instr.result] = left / right
+    
+    def exec_MOD(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        if right == 0:
+            raise Exception("Error de ejecución: Módulo por cero")
+        self.variables[instr.result] = left % right
+    
+    def exec_ADD_INPLACE(self, instr):
+        self.variables[instr.result] = self.get_value(instr.result) + self.get_value(instr.arg1)
+    
+    def exec_SUB_INPLACE(self, instr):
+        self.variables[instr.result] = self.get_value(instr.result) - self.get_value(instr.arg1)
+    
+    def exec_MUL_INPLACE(self, instr):
+        self.variables[instr.result] = self.get_value(instr.result) * self.get_value(instr.arg1)
+    
+    def exec_DIV_INPLACE(self, instr):
+        right = self.get_value(instr.arg1)
+        if right == 0:
+            raise Exception("Error de ejecución: División por cero")
+        self.variables[instr.result] = self.get_value(instr.result) / right
+    
+    def exec_MOD_INPLACE(self, instr):
+        right = self.get_value(instr.arg1)
+        if right == 0:
+            raise Exception("Error de ejecución: Módulo por cero")
+        self.variables[instr.result] = self.get_value(instr.result) % right
+    
+    def exec_NEG(self, instr):
+        value = self.get_value(instr.arg1)
+        self.variables[instr.result] = -value
+    
+    def exec_NOT(self, instr):
+        value = self.get_value(instr.arg1)
+        self.variables[instr.result] = not value
+    
+    def exec_EQ(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left == right
+    
+    def exec_NEQ(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left != right
+    
+    def exec_LT(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left < right
+    
+    def exec_GT(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left > right
+    
+    def exec_LTE(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left <= right
+    
+    def exec_GTE(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        self.variables[instr.result] = left >= right
+    
+    def exec_PRINT(self, instr):
+        value = self.get_value(instr.arg1)
+        self.output.append(str(value))
+    
+    def exec_LABEL(self, instr):
+        pass
+    
+    def exec_GOTO(self, instr):
+        if instr.arg1 in self.labels:
+            self.pc = self.labels[instr.arg1] - 1
+        else:
+            raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg1}")
+    
+    def exec_IF_FALSE(self, instr):
+        condition = self.get_value(instr.arg1)
+        if not condition:
+            if instr.arg2 in self.labels:
+                self.pc = self.labels[instr.arg2] - 1
+            else:
+                raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg2}")
+    
+    def exec_IF_TRUE(self, instr):
+        condition = self.get_value(instr.arg1)
+        if condition:
+            if instr.arg2 in self.labels:
+                self.pc = self.labels[instr.arg2] - 1
+            else:
+                raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg2}")
+    
+    def exec_FOR_RANGE_INIT(self, instr):
+        start, stop, step = (self.get_value(arg) for arg in instr.arg1)
+        try:
+            self.variables[instr.result] = iter(range(start, stop, step))
+        except TypeError:
+            raise Exception("Error de ejecución: range() requiere argumentos enteros")
+        except ValueError:
+            raise Exception("Error de ejecución: El paso de range() no puede ser cero")
+    
+    def exec_ITER_INIT(self, instr):
+        container = self.get_value(instr.arg1)
+        if isinstance(container, (list, str, dict)):
+            self.variables[instr.result] = iter(container)
+        else:
+            raise Exception(f"Error de ejecución: {instr.arg1} no es iterable")
+    
+    def exec_ITER_NEXT(self, instr):
+        value = next(self.get_value(instr.arg1), EXHAUSTED)
+        if value is not EXHAUSTED:
+            self.variables[instr.result] = value
+        elif instr.arg2 in self.labels:
+            self.pc = self.labels[instr.arg2] - 1
+        else:
+            raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.arg2}")
+    
+    exec_FOR_RANGE_NEXT = exec_ITER_NEXT
+    
+    def exec_compare_jump(self, instr):
+        left = self.get_value(instr.arg1)
+        right = self.get_value(instr.arg2)
+        if JUMP_COMPARISONS[instr.op](left, right):
+            if instr.result in self.labels:
+                self.pc = self.labels[instr.result] - 1
+            else:
+                raise Exception(f"Error de ejecución: Etiqueta no encontrada: {instr.result}")
+    
+    def exec_LIST_CREATE(self, instr):
+        self.variables[instr.result] = []
+    
+    def exec_LIST_APPEND(self, instr):
+        list_var = self.variables.get(instr.arg1, [])
+        value = self.get_value(instr.arg2)
+        if isinstance(list_var, list):
+            list_var.append(value)
+        else:
+            raise Exception(f"Error de ejecución: {instr.arg1} no es una lista")
+    
+    def exec_LIST_GET(self, instr):
+        container = self.get_value(instr.arg1)
+        key = self.get_value(instr.arg2)
+        
+        if isinstance(container, list):
+            if isinstance(key, (int, float)):
+                index = int(key)
+                if 0 <= index < len(container):
+                    self.variables[instr.result] = container[index]
                 else:
-                    raise Exception(f"Error de ejecución: Clave '{key}' no existe en el diccionario")
+                    raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
             else:
-                raise Exception(f"Error de ejecución: {instr.arg1} no es una lista o diccionario")
+                raise Exception(f"Error de ejecución: Índice debe ser número: {key}")
+        elif isinstance(container, dict):
+            if key in container:
+                self.variables[instr.result] = container[key]
+            else:
+                raise Exception(f"Error de ejecución: Clave '{key}' no existe en el diccionario")
+        else:
+            raise Exception(f"Error de ejecución: {instr.arg1} no es una lista o diccionario")
+    
+    def exec_LIST_SET(self, instr):
+        # Obtener el contenedor (puede ser el nombre de una variable o un temporal)
+        if instr.arg1 in self.variables:
+            container = self.variables[instr.arg1]
+        else:
+            # Puede ser un valor directo (caso raro)
+            container = self.get_value(instr.arg1)
         
-        elif instr.op == 'LIST_SET':
-            # Obtener el contenedor (puede ser el nombre de una variable o un temporal)
-            if instr.arg1 in self.variables:
-                container = self.variables[instr.arg1]
+        key = self.get_value(instr.arg2)
+        value = self.get_value(instr.result)
+        
+        if isinstance(container, list):
+            if isinstance(key, (int, float)):
+                index = int(key)
+                if 0 <= index < len(container):
+                    container[index] = value
+                else:
+                    raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
             else:
-                # Puede ser un valor directo (caso raro)
-                container = self.get_value(instr.arg1)
-            
+                raise Exception(f"Error de ejecución: Índice debe ser número")
+        elif isinstance(container, dict):
+            container[key] = value
+        else:
+            raise Exception(f"Error de ejecución: {instr.arg1} no es una lista o diccionario")
+    
+    def exec_LIST_GET_list(self, instr):
+        # Lista e índice entero probados: solo queda comprobar el rango
+        container = self.get_value(instr.arg1)
+        index = self.get_value(instr.arg2)
+        if 0 <= index < len(container):
+            self.variables[instr.result] = container[index]
+        else:
+            raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
+    
+    def exec_LIST_GET_dict(self, instr):
+        container = self.get_value(instr.arg1)
+        key = self.get_value(instr.arg2)
+        try:
+            self.variables[instr.result] = container[key]
+        except KeyError:
+            raise Exception(f"Error de ejecución: Clave '{key}' no existe en el diccionario")
+    
+    def exec_LIST_SET_list(self, instr):
+        container = self.variables[instr.arg1]
+        index = self.get_value(instr.arg2)
+        if 0 <= index < len(container):
+            container[index] = self.get_value(instr.result)
+        else:
+            raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
+    
+    def exec_LIST_SET_unchecked(self, instr):
+        self.variables[instr.arg1][self.get_value(instr.arg2)] = self.get_value(instr.result)
+    
+    def exec_LIST_SET_dict(self, instr):
+        container = self.variables[instr.arg1]
+        container[self.get_value(instr.arg2)] = self.get_value(instr.result)
+    
+    def exec_LIST_APPEND_list(self, instr):
+        self.variables.get(instr.arg1, []).append(self.get_value(instr.arg2))
+    
+    def exec_CALL_len(self, instr):
+        self.variables[instr.result] = len(self.get_value(instr.arg2))
+    
+    def exec_DICT_CREATE(self, instr):
+        self.variables[instr.result] = {}
+    
+    def exec_DICT_SET(self, instr):
+        dict_var = self.variables.get(instr.arg1, None)
+        if isinstance(dict_var, dict):
             key = self.get_value(instr.arg2)
             value = self.get_value(instr.result)
-            
-            if isinstance(container, list):
+            dict_var[key] = value
+        else:
+            raise Exception(f"Error de ejecución: {instr.arg1} no es un diccionario")
+    
+    def exec_CALL(self, instr):
+        func_name = instr.arg1
+        
+        # Verificar si es una función built-in
+        if func_name == 'len':
+            arg_value = self.get_value(instr.arg2)
+            if isinstance(arg_value, (list, str, dict)):
+                self.variables[instr.result] = len(arg_value)
+            else:
+                raise Exception(f"Error de ejecución: len() requiere una lista, string o diccionario")
+        elif func_name == 'input':
+            prompt = self.get_value(instr.arg2) if instr.arg2 else ""
+            if prompt:
+                user_input = input(prompt)
+            else:
+                user_input = input()
+            self.variables[instr.result] = user_input
+        elif instr.arg1 == 'int':
+            arg_value = self.get_value(instr.arg2) if instr.arg2 else None
+            if arg_value is not None:
+                try:
+                    self.variables[instr.result] = int(arg_value)
+                except:
+                    raise Exception(f"Error de ejecución: int() requiere un valor convertible a entero")
+            else:
+                raise Exception(f"Error de ejecución: int() requiere un argumento")
+        elif instr.arg1 == 'float':
+            arg_value = self.get_value(instr.arg2) if instr.arg2 else None
+            if arg_value is not None:
+                try:
+                    self.variables[instr.result] = float(arg_value)
+                except:
+                    raise Exception(f"Error de ejecución: float() requiere un valor convertible a float")
+            else:
+                raise Exception(f"Error de ejecución: float() requiere un argumento")
+        elif func_name == 'str':
+            arg_value = self.get_value(instr.arg2) if instr.arg2 else None
+            if arg_value is not None:
+                self.variables[instr.result] = str(arg_value)
+            else:
+                raise Exception(f"Error de ejecución: str() requiere un argumento")
+        else:
+            # Función definida por el usuario: sus argumentos ya están apilados con PARAM
+            self.call_function(instr, f"Error de ejecución: Función '{func_name}' no implementada")
+    
+    def call_function(self, instr, missing_error):
+        """Llama a la función instr.arg1 con los últimos instr.arg2 argumentos apilados"""
+        func_label = f"func_{instr.arg1}"
+        if func_label not in self.labels:
+            raise Exception(missing_error)
+        
+        count = self.get_value(instr.arg2) or 0
+        first = len(self.function_params) - count
+        args = self.function_params[first:]
+        del self.function_params[first:]
+        
+        # Guardar contexto actual; ENTER enlaza los argumentos en el nuevo marco
+        self.call_stack.append({
+            'return_pc': self.pc,
+            'variables': self.variables.copy(),
+            'result_var': instr.result,
+            'args': args
+        })
+        
+        # Saltar a la función
+        self.pc = self.labels[func_label]
+    
+    def tail_call_handler(self, instr):
+        """Crea el manejador de una llamada en posición de cola: la función
+        llamada ocupa el marco de la actual y retorna directamente a su
+        llamador, así la pila de llamadas no crece"""
+        func_label = f"func_{instr.arg1}"
+        
+        def tail_call(instr):
+            if not self.call_stack:
+                # En el programa principal el return termina la ejecución
+                self.exec_CALL(instr)
+                return
+            count = self.get_value(instr.arg2) or 0
+            first = len(self.function_params) - count
+            # El marco actual solo se usaría para retornar el resultado: la
+            # función llamada lo recibe sin copiarlo y ENTER enlaza sus argumentos
+            self.call_stack[-1]['args'] = self.function_params[first:]
+            del self.function_params[first:]
+            self.pc = self.labels[func_label]
+        
+        return tail_call
+    
+    def exec_DEL(self, instr):
+        if instr.arg2:
+            container = self.variables.get(instr.arg1, None)
+            key = self.get_value(instr.arg2)
+            if isinstance(container, dict):
+                if key in container:
+                    del container[key]
+                else:
+                    raise Exception(f"Error de ejecución: Clave '{key}' no existe")
+            elif isinstance(container, list):
                 if isinstance(key, (int, float)):
                     index = int(key)
                     if 0 <= index < len(container):
-                        container[index] = value
+                        del container[index]
                     else:
-                        raise Exception(f"Error de ejecución: Índice fuera de rango: {index}")
+                        raise Exception(f"Error de ejecución: Índice fuera de rango")
                 else:
                     raise Exception(f"Error de ejecución: Índice debe ser número")
-            elif isinstance(container, dict):
-                container[key] = value
-            else:
-                raise Exception(f"Error de ejecución: {instr.arg1} no es una lista o diccionario")
-        
-        elif instr.op == 'DICT_CREATE':
-            self.variables[instr.result] = {}
-        
-        elif instr.op == 'DICT_SET':
-            dict_var = self.variables.get(instr.arg1, None)
-            if isinstance(dict_var, dict):
-                key = self.get_value(instr.arg2)
-                value = self.get_value(instr.result)
-                dict_var[key] = value
-            else:
-                raise Exception(f"Error de ejecución: {instr.arg1} no es un diccionario")
-        
-        elif instr.op == 'CALL':
-            func_name = instr.arg1
-            
-            # Verificar si es una función built-in
-            if func_name == 'len':
-                arg_value = self.get_value(instr.arg2)
-                if isinstance(arg_value, (list, str, dict)):
-                    self.variables[instr.result] = len(arg_value)
-                else:
-                    raise Exception(f"Error de ejecución: len() requiere una lista, string o diccionario")
-            elif func_name == 'input':
-                prompt = self.get_value(instr.arg2) if instr.arg2 else ""
-                if prompt:
-                    user_input = input(prompt)
-                else:
-                    user_input = input()
-                self.variables[instr.result] = user_input
-            elif instr.arg1 == 'int':
-                arg_value = self.get_value(instr.arg2) if instr.arg2 else None
-                if arg_value is not None:
-                    try:
-                        self.variables[instr.result] = int(arg_value)
-                    except:
-                        raise Exception(f"Error de ejecución: int() requiere un valor convertible a entero")
-                else:
-                    raise Exception(f"Error de ejecución: int() requiere un argumento")
-            elif instr.arg1 == 'float':
-                arg_value = self.get_value(instr.arg2) if instr.arg2 else None
-                if arg_value is not None:
-                    try:
-                        self.variables[instr.result] = float(arg_value)
-                    except:
-                        raise Exception(f"Error de ejecución: float() requiere un valor convertible a float")
-                else:
-                    raise Exception(f"Error de ejecución: float() requiere un argumento")
-            elif func_name == 'str':
-                arg_value = self.get_value(instr.arg2) if instr.arg2 else None
-                if arg_value is not None:
-                    self.variables[instr.result] = str(arg_value)
-                else:
-                    raise Exception(f"Error de ejecución: str() requiere un argumento")
-            else:
-                # Función definida por el usuario
-                func_label = f"func_{func_name}"
-                if func_label in self.labels:
-                    # Guardar contexto actual
-                    saved_vars = self.variables.copy()
-                    saved_pc = self.pc
-                    
-                    self.call_stack.append({
-                        'return_pc': saved_pc,
-                        'variables': saved_vars,
-                        'result_var': instr.result
-                    })
-                    
-                    # Obtener argumentos (pueden estar separados por comas)
-                    if instr.arg2:
-                        # Parsear argumentos (pueden ser "temp" o "0, 1" etc)
-                        args_str = str(instr.arg2)
-                        if ',' in args_str:
-                            args = [arg.strip() for arg in args_str.split(',')]
-                        else:
-                            args = [args_str]
-                        
-                        # Evaluar cada argumento y asignarlo a parámetros
-                        param_names = ['n', 'x', 'y', 'z', 'a', 'b', 'c']
-                        for i, arg in enumerate(args):
-                            if i < len(param_names):
-                                self.variables[param_names[i]] = self.get_value(arg)
-                    
-                    # Saltar a la función
-                    self.pc = self.labels[func_label]
-                else:
-                    raise Exception(f"Error de ejecución: Función '{func_name}' no implementada")
-        
-        elif instr.op == 'DEL':
-            if instr.arg2:
-                container = self.variables.get(instr.arg1, None)
-                key = self.get_value(instr.arg2)
-                if isinstance(container, dict):
-                    if key in container:
-                        del container[key]
-                    else:
-                        raise Exception(f"Error de ejecución: Clave '{key}' no existe")
-                elif isinstance(container, list):
-                    if isinstance(key, (int, float)):
-                        index = int(key)
-                        if 0 <= index < len(container):
-                            del container[index]
-                        else:
-                            raise Exception(f"Error de ejecución: Índice fuera de rango")
-                    else:
-                        raise Exception(f"Error de ejecución: Índice debe ser número")
+        else:
+            if instr.arg1 in self.variables:
+                del self.variables[instr.arg1]
             else:
-                if instr.arg1 in self.variables:
-                    del self.variables[instr.arg1]
-                else:
-                    raise Exception(f"Error de ejecución: Variable '{instr.arg1}' no existe")
-        
-        elif instr.op == 'PARAM':
-            # Guardar parámetro para la próxima llamada a función
-            value = self.get_value(instr.arg1)
-            self.function_params.append(value)
-        
-        elif instr.op == 'FUNCTION_CALL':
-            # Llamada a función definida por el usuario
-            func_name = instr.arg1
-            num_params = int(instr.arg2) if instr.arg2 else 0
+                raise Exception(f"Error de ejecución: Variable '{instr.arg1}' no existe")
+    
+    def exec_PARAM(self, instr):
+        # Guardar parámetro para la próxima llamada a función
+        value = self.get_value(instr.arg1)
+        self.function_params.append(value)
+    
+    def exec_FUNCTION_CALL(self, instr):
+        # Llamada a función definida por el usuario
+        self.call_function(instr, f"Error de ejecución: Función '{instr.arg1}' no encontrada")
+    
+    def exec_ENTER(self, instr):
+        # Enlazar por posición los argumentos de la llamada con los parámetros declarados
+        if self.call_stack:
+            for param, value in zip(instr.arg1, self.call_stack[-1]['args']):
+                self.variables[param] = value
+    
+    def exec_LEAVE(self, instr):
+        # Fin de la función: retorna sin valor
+        self.exec_RETURN(instr)
+    
+    def exec_LABEL_function(self, instr):
+        # Una definición de función alcanzada en secuencia no se ejecuta
+        self.pc = self.function_ends[instr.arg1]
+    
+    def exec_RETURN(self, instr):
+        # Retornar de una función
+        if self.call_stack:
+            # IMPORTANTE: Evaluar el valor de retorno ANTES de restaurar el contexto
+            # para que las variables temporales estén disponibles
+            return_value = self.get_value(instr.arg1) if instr.arg1 else None
             
-            # Guardar contexto actual
-            saved_vars = self.variables.copy()
-            self.call_stack.append({
-                'return_pc': self.pc,
-                'variables': saved_vars,
-                'result_var': instr.result
-            })
+            context = self.call_stack.pop()
             
-            # Asignar parámetros a variables locales
-            # Los parámetros se pasan en orden inverso (último en entrar, primero en salir)
-            params = []
-            for _ in range(num_params):
-                if self.function_params:
-                    params.insert(0, self.function_params.pop())
+            # Restaurar contexto
+            self.variables = context['variables']
+            self.pc = context['return_pc']
             
-            # Buscar la función y sus parámetros
-            func_label = f"func_{func_name}"
-            if func_label in self.labels:
-                # Saltar a la función
-                self.pc = self.labels[func_label]
-                
-                # Asignar parámetros (asumiendo que la función espera 'n', 'x', etc.)
-                # Por simplicidad, usamos nombres genéricos
-                param_names = ['n', 'x', 'y', 'z']  # Nombres comunes de parámetros
-                for i, param_value in enumerate(params):
-                    if i < len(param_names):
-                        self.variables[param_names[i]] = param_value
-            else:
-                raise Exception(f"Error de ejecución: Función '{func_name}' no encontrada")
-        
-        elif instr.op == 'RETURN':
-            # Retornar de una función
-            if self.call_stack:
-                # IMPORTANTE: Evaluar el valor de retorno ANTES de restaurar el contexto
-                # para que las variables temporales estén disponibles
-                return_value = self.get_value(instr.arg1) if instr.arg1 else None
-                
-                context = self.call_stack.pop()
-                
-                # Restaurar contexto
-                self.variables = context['variables']
-                self.pc = context['return_pc']
-                
-                # Guardar valor de retorno
-                if context['result_var'] and return_value is not None:
-                    self.variables[context['result_var']] = return_value
-            else:
-                # Return en el programa principal - terminar ejecución
-                self.pc = len(self.variables) + 1000  # Forzar salida
-        
-        elif instr.op == 'BREAK':
-            pass
-        
-        elif instr.op == 'CONTINUE':
-            pass
+            # Guardar valor de retorno
+            if context['result_var'] and return_value is not None:
+                self.variables[context['result_var']] = return_value
+        else:
+            # Return en el programa principal - terminar ejecución
+            self.pc = self.program_size  # Forzar salida
+    
+    def exec_BREAK(self, instr):
+        pass
+    
+    def exec_CONTINUE(self, instr):
+        pass
+    
+    def exec_NOP(self, instr):
+        """Operaciones sin efecto en el intérprete"""
+        pass
     
     def get_value(self, operand):
         """Obtiene el valor de un operando (constante o variable)"""
         if operand is None:
             return None
         
-        if isinstance(operand, str) and operand.startswith('"') and operand.endswith('"'):
-            return operand[1:-1]
+        if isinstance(operand, Const):
+            return operand.value
         
         try:
-            if '.' in str(operand):
-                return float(operand)
-            else:
-                return int(operand)
-        except:
-            pass
-        
-        if operand == 'True':
-            return True
-        if operand == 'False':
-            return False
-        
-        if operand in self.variables:
             return self.variables[operand]
-        
-        raise Exception(f"Error de ejecución: Variable no definida: {operand}")
+        except KeyError:
+            raise Exception(f"Error de ejecución: Variable no definida: {operand}")
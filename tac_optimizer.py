@@ -3,68 +3,328 @@ Optimizador de Código TAC
 Aplica optimizaciones al código de tres direcciones
 """
 
-from tac_generator import TACInstruction
+from tac_generator import (
+    TACInstruction, OpCode, Const, Var, Temp, Label, ArgList, ARITHMETIC_OPS, COMPARISON_OPS,
+    NEGATED_JUMPS, COMPARISON_JUMPS, COMPARE_JUMPS, INPLACE_OPS, INPLACE_FORMS, LOOP_NEXT_OPS, BUILTIN_FUNCTIONS,
+    frame_locals, jump_target, retarget, returns_value
+)
+from tac_types import annotate_types, operand_keys, infer_keyed_types, operand_type, NUMERIC_TYPES
+from tac_cfg import (
+    build_cfg, basic_blocks, defined_var, used_vars, leading_phis, definitely_defined, is_function_label,
+    BitLiveness, TERMINATORS, CONDITIONAL_JUMPS, EXITS
+)
+from tac_ssa import to_ssa, from_ssa
+from peephole import Peephole, PeepholeRule, Window
+import itertools
+import math
+import operator
+import re
+import time
+
+
+# Pasadas de cada nivel de optimización (-O0, -O1, -O2):
+# (locales a un bloque básico, globales sobre el programa, finales)
+OPTIMIZATION_LEVELS = {
+    0: ((), (), ()),
+    1: (
+        ('constant_folding', 'constant_propagation', 'local_value_numbering', 'remove_redundant_assignments'),
+        ('conditional_constant_propagation', 'dead_code_elimination', 'eliminate_dead_jumps'),
+        (),
+    ),
+    2: (
+        ('constant_folding', 'constant_propagation', 'strength_reduction', 'local_value_numbering',
+         'remove_redundant_assignments'),
+        ('eliminate_tail_recursion', 'inline_functions', 'conditional_constant_propagation',
+         'loop_invariant_code_motion', 'unroll_loops', 'induction_strength_reduction', 'global_value_numbering',
+         'dead_code_elimination', 'eliminate_dead_jumps'),
+        ('fuse_inplace', 'fuse_branches'),
+    ),
+}
+
+DEFAULT_LEVEL = 2
+
+# Definiciones que se conservan aunque su valor no se lea: las llamadas pueden
+# tener efectos y los iteradores avanzan o saltan
+KEPT_DEFINITIONS = frozenset({
+    OpCode.CALL, OpCode.FOR_RANGE_INIT, OpCode.FOR_RANGE_NEXT, OpCode.ITER_INIT, OpCode.ITER_NEXT
+})
+
+# Divisiones: solo se eliminan si el divisor es una constante distinta de cero
+DIVISIONS = frozenset({OpCode.DIV, OpCode.MOD, OpCode.DIV_INPLACE, OpCode.MOD_INPLACE})
+
+# Operaciones puras que numera la numeración de valores (además de len)
+PURE_OPS = ARITHMETIC_OPS | COMPARISON_OPS | {OpCode.NEG, OpCode.NOT}
+
+# Operaciones cuyo resultado no depende del orden de los operandos
+# (la suma no: concatena cadenas y listas)
+COMMUTATIVE_OPS = frozenset({OpCode.MUL, OpCode.EQ, OpCode.NEQ})
+
+# Instrucciones que pueden cambiar la longitud de una lista o diccionario
+# (también a través de un alias, o dentro de una función llamada). x += v
+# crea un valor nuevo y redefine x, no modifica la lista a la que apuntaba
+MUTATING_OPS = frozenset({
+    OpCode.LIST_APPEND, OpCode.LIST_SET, OpCode.DICT_SET, OpCode.DEL, OpCode.FUNCTION_CALL
+})
+
+# Operaciones que no fallan con dos cadenas, y tipos cuya longitud da len()
+COMPARABLE_STR_OPS = COMPARISON_OPS | {OpCode.ADD}
+SIZED_TYPES = ('list', 'str', 'dict')
+
+# Instrucciones que puede añadir el desenrollado de un bucle: las copias
+# completas y las repeticiones del cuerpo en cada vuelta no pasan de aquí
+UNROLL_BUDGET = 32
+
+# Instrucciones que impiden copiar el cuerpo de un bucle
+UNROLL_BARRIERS = frozenset({OpCode.BREAK, OpCode.CONTINUE, OpCode.ENTER, OpCode.LEAVE})
+
+# Instrucciones del cuerpo de una función que se integra en cada llamada; una
+# función llamada desde un solo punto se integra con cualquier tamaño
+INLINE_BUDGET = 16
+
+# Operaciones que la propagación condicional calcula al compilar, y función
+# de Python de cada una con dos operandos (los saltos fundidos comparan)
+FOLDABLE_OPS = PURE_OPS | {OpCode.ASSIGN}
+FOLDING_FUNCTIONS = {
+    OpCode.ADD: operator.add, OpCode.SUB: operator.sub, OpCode.MUL: operator.mul,
+    OpCode.DIV: operator.truediv, OpCode.MOD: operator.mod,
+    OpCode.EQ: operator.eq, OpCode.NEQ: operator.ne, OpCode.LT: operator.lt,
+    OpCode.GT: operator.gt, OpCode.LTE: operator.le, OpCode.GTE: operator.ge,
+    OpCode.IF_EQ: operator.eq, OpCode.IF_NE: operator.ne, OpCode.IF_LT: operator.lt,
+    OpCode.IF_GT: operator.gt, OpCode.IF_LE: operator.le, OpCode.IF_GE: operator.ge,
+}
+
+# Valor del retículo de la propagación condicional para un nombre que toma
+# más de un valor o uno que no se conoce al compilar
+VARYING = object()
+
+# Operaciones cuyo arg1 es un contenedor, una variable que se borra o el
+# nombre de la función llamada: la propagación no pone una constante ahí
+CONTAINER_OPS = frozenset({
+    OpCode.LIST_APPEND, OpCode.LIST_GET, OpCode.LIST_SET, OpCode.DICT_SET, OpCode.ITER_INIT, OpCode.DEL,
+    OpCode.CALL
+})
+
+# Prefijos de los mensajes de las instrucciones redundantes reemplazadas por copias
+VALUE_NUMBERING = ('Numeración de valores local', 'Numeración de valores global')
+
+# Saltos que se encaminan directamente al final de una cadena de goto
+THREADED_JUMPS = frozenset({OpCode.GOTO, OpCode.IF_FALSE, OpCode.IF_TRUE}) | frozenset(COMPARE_JUMPS)
+
+# Definiciones de un temporal que la fusión de copias escribe directamente en
+# la variable copiada (el generador de código guarda sus resultados en memoria)
+COALESCED_OPS = ARITHMETIC_OPS | {OpCode.NEG, OpCode.NOT, OpCode.ASSIGN}
+
+# Reglas de mirilla de cada pasada: códigos de operación de la ventana y
+# método que la reescribe. Cada pasada aplica las suyas en un solo recorrido
+PEEPHOLE_RULES = {
+    'strength_reduction': (
+        PeepholeRule((OpCode.MUL,), '_multiplication_identity', "Reducción de fuerza"),
+        PeepholeRule((OpCode.ADD,), '_addition_identity', "Reducción de fuerza"),
+    ),
+    'remove_redundant_assignments': (
+        PeepholeRule((OpCode.ASSIGN,), '_self_assignment', "Asignación redundante eliminada", "{before}"),
+    ),
+    'eliminate_dead_jumps': (
+        PeepholeRule((THREADED_JUMPS,), '_thread_jump', "Salto encadenado"),
+        PeepholeRule((OpCode.GOTO, OpCode.LABEL), '_jump_to_next', "Salto innecesario eliminado", "{before[0]}"),
+        PeepholeRule((OpCode.GOTO, OpCode.LABEL, OpCode.LABEL), '_jump_to_next', "Salto innecesario eliminado",
+                     "{before[0]}"),
+    ),
+    'fuse_inplace': (
+        PeepholeRule((frozenset(INPLACE_FORMS), OpCode.ASSIGN), '_fuse_update', "Actualización en el lugar"),
+        PeepholeRule((COALESCED_OPS, OpCode.ASSIGN), '_fuse_copy', "Fusión de copias"),
+    ),
+}
+PEEPHOLES = {name: Peephole(rules, operator.attrgetter('op')) for name, rules in PEEPHOLE_RULES.items()}
+
+# Argumentos de las pasadas locales al ejecutarse sobre un bloque: los tipos
+# se anotan una vez por ronda sobre el programa completo
+BLOCK_OPTIONS = {'strength_reduction': {'typed': True}}
+
+
+class PassStats:
+    """Estadísticas acumuladas de una pasada"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+        self.changes = 0
+        self.seconds = 0.0
+        self.delta = 0  # Variación del número de instrucciones
+    
+    def __str__(self):
+        return (f"{self.name}: {self.runs} ejecuciones, {self.changes} cambios, "
+                f"{self.delta:+d} instrucciones, {self.seconds * 1000:.2f} ms")
+
+
+class OptimizationEvent:
+    """Reescritura aplicada por una pasada
+    
+    Guarda referencias a las instrucciones anteriores y posteriores en lugar
+    de su texto: detail se formatea solo al mostrar el evento, con before y
+    after como campos y args como argumentos posicionales. Las pasadas no
+    modifican instrucciones en el sitio, así el texto sigue siendo el del
+    momento de la reescritura.
+    """
+    __slots__ = ('kind', 'pass_name', 'index', 'before', 'after', 'detail', 'args')
+    
+    def __init__(self, kind, pass_name, index, before, after, detail, args):
+        self.kind = kind
+        self.pass_name = pass_name
+        self.index = index  # Posición en el resultado de la pasada, si la pasada la conoce
+        self.before = before
+        self.after = after
+        self.detail = detail
+        self.args = args
+    
+    def __str__(self):
+        return f"{self.kind}: {self.detail.format(*self.args, before=self.before, after=self.after)}"
 
 
 class TACOptimizer:
-    """Optimiza el código TAC aplicando diversas reglas"""
+    """Optimiza el código TAC aplicando diversas reglas
+    
+    Cada pasada anota cada reescritura con _record; el gestor de pasadas usa
+    el contador de reescrituras como indicador de cambio, así una pasada que
+    reescribe sin reducir el número de instrucciones también cuenta. Los
+    contadores por tipo siempre se llevan; los eventos con el detalle de cada
+    reescritura solo se guardan con record_events=True.
+    """
+    
+    def __init__(self, level=DEFAULT_LEVEL, record_events=False):
+        if level not in OPTIMIZATION_LEVELS:
+            raise ValueError(f"Nivel de optimización no válido: {level}")
+        self.level = level
+        self.record_events = record_events
+        self.events = []
+        self.counts = {}  # {tipo de optimización: reescrituras}
+        self.change_count = 0
+        self.current_pass = None
+        self.pass_stats = {}
+        self.rounds = 0
     
-    def __init__(self):
-        self.optimizations_applied = []
+    @property
+    def optimizations_applied(self):
+        """Texto de cada evento registrado (vacío sin record_events)"""
+        return [str(event) for event in self.events]
     
     def optimize(self, instructions):
-        """Aplica todas las optimizaciones al código TAC"""
-        self.optimizations_applied = []
+        """Aplica las pasadas del nivel de optimización al código TAC
+        
+        Las pasadas locales se repiten sobre cada bloque sucio hasta un punto
+        fijo; las globales se ejecutan una vez por ronda y solo se inicia otra
+        ronda si cambiaron el programa. En la ronda siguiente solo se revisan
+        los bloques que cambiaron y los que leen un nombre cuyo tipo cambió, así
+        el coste de las rondas posteriores depende de lo que se modificó y no
+        del tamaño del programa.
+        """
+        self.events = []
+        self.counts = {}
+        self.change_count = 0
+        self.pass_stats = {}
+        self.rounds = 0
+        local_passes, global_passes, final_passes = OPTIMIZATION_LEVELS[self.level]
         optimized = list(instructions)
         
-        changed = True
-        iteration = 0
-        while changed and iteration < 10:
-            changed = False
-            old_len = len(optimized)
-            
-            optimized = self.constant_folding(optimized)
-            optimized = self.constant_propagation(optimized)
-            optimized = self.dead_code_elimination(optimized)
-            optimized = self.strength_reduction(optimized)
-            optimized = self.remove_redundant_assignments(optimized)
-            optimized = self.eliminate_dead_jumps(optimized)
+        clean = set()  # Bloques (tuplas de instrucciones) ya en su punto fijo local
+        blocks = basic_blocks(optimized)
+        dirty = blocks
+        var_types = annotate_types(optimized) if local_passes else {}
+        while True:
+            self.rounds += 1
+            local_changed = False
+            for body in dirty:
+                changed = self.run_local_passes(local_passes, body)
+                local_changed = local_changed or changed
+                clean.add(tuple(body))
+            if local_changed:
+                optimized = [instr for body in blocks for instr in body]
+            if not local_changed and self.rounds > 1:
+                break
             
-            if len(optimized) != old_len or iteration == 0:
-                changed = True
+            global_changed = False
+            for name in global_passes:
+                optimized, changed = self.run_pass(name, optimized)
+                global_changed = global_changed or changed
+            if not global_changed or not local_passes:
+                break
             
-            iteration += 1
+            new_types = annotate_types(optimized)
+            retyped = {name for name in var_types.keys() | new_types.keys()
+                       if var_types.get(name) != new_types.get(name)}
+            var_types = new_types
+            blocks = basic_blocks(optimized)
+            dirty = [body for body in blocks
+                     if tuple(body) not in clean or self._reads_any(body, retyped)]
         
+        for name in final_passes:
+            optimized, _ = self.run_pass(name, optimized)
+        
+        # El código optimizado sale con sus tipos probados para el intérprete y el generador
+        annotate_types(optimized)
         return optimized
     
+    def run_local_passes(self, passes, body):
+        """Repite las pasadas locales sobre un bloque hasta que ninguna cambie;
+        el bloque se modifica en el sitio. Indica si hubo cambios"""
+        any_change = False
+        changed = True
+        while changed:
+            changed = False
+            for name in passes:
+                result, pass_changed = self.run_pass(name, body, **BLOCK_OPTIONS.get(name, {}))
+                if pass_changed:
+                    body[:] = result
+                    changed = any_change = True
+        return any_change
+    
+    def run_pass(self, name, instructions, **options):
+        """Ejecuta una pasada y acumula sus estadísticas
+        
+        Returns:
+            tuple: (instrucciones resultantes, indica si la pasada cambió algo)
+        """
+        stats = self.pass_stats.get(name)
+        if stats is None:
+            stats = self.pass_stats[name] = PassStats(name)
+        applied = self.change_count
+        self.current_pass = name
+        start = time.perf_counter()
+        result = getattr(self, name)(instructions, **options)
+        stats.seconds += time.perf_counter() - start
+        stats.runs += 1
+        changes = self.change_count - applied
+        stats.changes += changes
+        stats.delta += len(result) - len(instructions)
+        return result, changes > 0
+    
     def constant_folding(self, instructions):
         """Plegado de constantes"""
         optimized = []
         
         for instr in instructions:
-            if instr.op in ['ADD', 'SUB', 'MUL', 'DIV', 'MOD']:
+            if instr.op in ARITHMETIC_OPS:
                 try:
-                    left = self._parse_number(instr.arg1)
-                    right = self._parse_number(instr.arg2)
+                    left = self._numeric_value(instr.arg1)
+                    right = self._numeric_value(instr.arg2)
                     
                     if left is not None and right is not None:
                         result = None
-                        if instr.op == 'ADD':
+                        if instr.op is OpCode.ADD:
                             result = left + right
-                        elif instr.op == 'SUB':
+                        elif instr.op is OpCode.SUB:
                             result = left - right
-                        elif instr.op == 'MUL':
+                        elif instr.op is OpCode.MUL:
                             result = left * right
-                        elif instr.op == 'DIV' and right != 0:
+                        elif instr.op is OpCode.DIV and right != 0:
                             result = left / right
-                        elif instr.op == 'MOD' and right != 0:
+                        elif instr.op is OpCode.MOD and right != 0:
                             result = left % right
                         
                         if result is not None:
-                            optimized.append(TACInstruction('ASSIGN', str(result), None, instr.result))
-                            self.optimizations_applied.append(
-                                f"Plegado de constantes: {left} {instr.op} {right} = {result}"
-                            )
+                            optimized.append(TACInstruction(OpCode.ASSIGN, Const(result), None, instr.result))
+                            self._record("Plegado de constantes", "{0} {1} {2} = {3}", left, instr.op, right, result,
+                                         before=instr, after=optimized[-1], index=len(optimized) - 1)
                             continue
                 except:
                     pass
@@ -74,205 +334,1657 @@ class TACOptimizer:
         return optimized
     
     def constant_propagation(self, instructions):
-        """Propagación de constantes"""
+        """Propagación de constantes
+        
+        Dentro de un bloque básico, una variable asignada con una constante
+        numérica se reemplaza por la constante en las instrucciones que la
+        leen, hasta que se redefine. La tabla se vacía en cada etiqueta y cada
+        salto; entre bloques propaga conditional_constant_propagation.
+        """
         constants = {}
         optimized = []
         
         for instr in instructions:
-            if instr.op == 'ASSIGN':
-                const_val = self._parse_number(instr.arg1)
-                if const_val is not None:
-                    constants[instr.result] = instr.arg1
-            
+            if instr.op is OpCode.LABEL:
+                constants.clear()
             new_instr = self._replace_with_constants(instr, constants)
+            if new_instr is not instr:
+                self._record("Propagación de constantes", "{before} -> {after}",
+                             before=instr, after=new_instr, index=len(optimized))
             optimized.append(new_instr)
             
-            if instr.op in ['ASSIGN', 'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'NEG']:
-                if instr.result in constants:
-                    del constants[instr.result]
+            target = defined_var(instr)
+            if instr.op is OpCode.DEL:
+                constants.pop(instr.arg1, None)
+            elif instr.op is OpCode.ENTER:
+                constants.clear()
+            elif target is not None:
+                constants.pop(target, None)
+                if instr.op is OpCode.ASSIGN and self._numeric_value(instr.arg1) is not None:
+                    constants[target] = instr.arg1
+            if instr.op in TERMINATORS:
+                constants.clear()
         
         return optimized
     
+    def conditional_constant_propagation(self, instructions):
+        """Propagación condicional de constantes y de copias
+        
+        Propagación dispersa sobre la forma SSA: cada nombre tiene un valor
+        del retículo (sin valor aún, una constante o VARYING) y solo se
+        evalúan las instrucciones de los bloques a los que llega una arista
+        ejecutable; un salto condicional cuya condición es constante solo
+        marca la arista que toma. Con el punto fijo, los usos de un nombre
+        constante pasan a ser la constante, una copia se sustituye por la
+        variable del programa más antigua de su cadena que sigue vigente en el
+        uso, los saltos con condición constante se pliegan y los bloques sin
+        aristas ejecutables se eliminan: un programa que se puede evaluar al
+        compilar queda como una secuencia de print. Solo se propagan números y
+        bools, como en la propagación local.
+        """
+        if any(instr.op is OpCode.DEL and instr.arg2 is None for instr in instructions):
+            return instructions  # del x deja x sin definir aunque su versión SSA siga
+        program = to_ssa(instructions)
+        cfg = program.cfg
+        values, executable = self._propagate_constants(program)
+        copies = {}  # {nombre: nombre del que es copia}
+        for index in executable:
+            for instr in cfg.blocks[index].instructions:
+                if instr.op is OpCode.ASSIGN and isinstance(instr.arg1, Var) and \
+                        defined_var(instr) is not None and values.get(instr.result) is VARYING:
+                    copies[instr.result] = instr.arg1
+        
+        children = {}
+        for index, dominator in cfg.idom.items():
+            children.setdefault(dominator, []).append(index)
+        merges = self._merge_points(program, {program.base(source) for source in copies.values()})
+        stacks = {}  # {variable: versiones visibles, la última en la cima}
+        rewritten = {}  # {bloque ejecutable: instrucciones originales reescritas}
+        originals = basic_blocks(instructions)
+        stack = [(root, False) for root in reversed(children.get(None, ()))]
+        while stack:
+            index, leaving = stack.pop()
+            body = cfg.blocks[index].instructions
+            if leaving:
+                if index in executable:
+                    for var in merges.get(index, ()):
+                        stacks[var].pop()
+                    for instr in body:
+                        if defined_var(instr) is not None:
+                            stacks[program.base(instr.result)].pop()
+                continue
+            if index in executable:
+                # Donde se juntan definiciones distintas de una variable sin phi
+                # (la forma SSA podada omite las de variables muertas) ninguna
+                # versión anterior sigue vigente
+                for var in merges.get(index, ()):
+                    stacks.setdefault(var, []).append(None)
+                for phi in leading_phis(cfg.blocks[index]):
+                    stacks.setdefault(program.base(phi.result), []).append(phi.result)
+                ssa_body = [instr for instr in body if instr.op is not OpCode.PHI]
+                rewritten[index] = self._rewrite_constants(
+                    originals[index], ssa_body, program, values, copies, stacks
+                )
+            stack.append((index, True))
+            stack.extend((child, False) for child in reversed(children.get(index, ())))
+        
+        optimized = []
+        for index, body in enumerate(originals):
+            if index in rewritten:
+                optimized.extend(rewritten[index])
+                continue
+            kept = []
+            if body[-1].op is OpCode.LEAVE:
+                # El LEAVE cierra la función aunque no se alcance
+                kept = [instr for instr in body if instr.op in (OpCode.LABEL, OpCode.LEAVE)]
+            if len(kept) < len(body):
+                self._record("Propagación condicional de constantes",
+                             "bloque inalcanzable eliminado desde {before}", before=body[0])
+            optimized.extend(kept)
+        if len(optimized) == len(instructions) and all(a is b for a, b in zip(optimized, instructions)):
+            return instructions
+        # Sin los bloques eliminados, los saltos a la etiqueta siguiente sobran y
+        # las etiquetas a las que ya no salta nada dejan de partir bloques
+        optimized = self.eliminate_dead_jumps(optimized)
+        targets = {jump_target(instr) for instr in optimized}
+        return [instr for instr in optimized if instr.op is not OpCode.LABEL or
+                instr.arg1 in targets or is_function_label(instr)]
+    
     def dead_code_elimination(self, instructions):
-        """Eliminación de código muerto"""
-        changed = True
-        used_vars = set()
+        """Eliminación de código muerto
         
-        while changed:
-            changed = False
-            
-            for instr in instructions:
-                if instr.result and instr.result in used_vars:
-                    if instr.arg1 and instr.arg1 not in used_vars:
-                        used_vars.add(instr.arg1)
-                        changed = True
-                    if instr.arg2 and instr.arg2 not in used_vars:
-                        used_vars.add(instr.arg2)
-                        changed = True
-                
-                if instr.op in ['PRINT', 'IF_FALSE']:
-                    if instr.arg1 and instr.arg1 not in used_vars:
-                        used_vars.add(instr.arg1)
-                        changed = True
-                
-                if instr.op == 'ASSIGN' and instr.result in used_vars:
-                    if instr.arg1 and instr.arg1 not in used_vars:
-                        used_vars.add(instr.arg1)
-                        changed = True
-                
-                if instr.op in ['ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'EQ', 'NEQ', 'LT', 'GT', 'LTE', 'GTE']:
-                    if instr.result in used_vars:
-                        if instr.arg1 and instr.arg1 not in used_vars:
-                            used_vars.add(instr.arg1)
-                            changed = True
-                        if instr.arg2 and instr.arg2 not in used_vars:
-                            used_vars.add(instr.arg2)
-                            changed = True
-                
-                if instr.op in ['LIST_APPEND', 'LIST_GET', 'LIST_SET']:
-                    if instr.arg1:
-                        used_vars.add(instr.arg1)
-                    if instr.arg2:
-                        used_vars.add(instr.arg2)
-                
-                if instr.result and not instr.result.startswith('t') and not instr.result.startswith('_'):
-                    used_vars.add(instr.result)
+        Usa la vivacidad fuerte del grafo de flujo con conjuntos de bits
+        (BitLiveness): una definición sin efectos se elimina si su valor no se
+        lee antes de redefinirse, sea un temporal o una variable del programa.
+        El análisis y el recorrido posterior son lineales salvo por las
+        vueltas de la lista de trabajo en los bucles.
+        """
+        cfg = build_cfg(instructions)
+        liveness = BitLiveness(cfg, self._removable)
+        removed = 0
+        for block in cfg:
+            dead = liveness.dead_instructions(block.index)
+            if not dead:
+                continue
+            body = block.instructions
+            for position in reversed(dead):
+                self._record("Código muerto eliminado", "{before}", before=body[position])
+            dead = set(dead)
+            block.instructions = [instr for position, instr in enumerate(body) if position not in dead]
+            removed += len(dead)
+        return cfg.to_instructions() if removed else instructions
+    
+    def strength_reduction(self, instructions, typed=False):
+        """Reducción de fuerza
         
+        Las identidades algebraicas solo se aplican si el otro operando es
+        numérico probado: 'a' + 0 falla y lista * 1 crea una copia. Con
+        typed=True las instrucciones ya llevan los tipos del programa completo
+        (un bloque suelto no basta para inferirlos).
+        """
+        if not typed:
+            annotate_types(instructions)
+        return self._peephole('strength_reduction', instructions)
+    
+    def remove_redundant_assignments(self, instructions):
+        """Elimina asignaciones redundantes"""
+        return self._peephole('remove_redundant_assignments', instructions)
+    
+    def eliminate_dead_jumps(self, instructions):
+        """Elimina saltos innecesarios
+        
+        Un salto a una etiqueta seguida de goto pasa a saltar al final de la
+        cadena, y un goto a la etiqueta siguiente sobra; al quitarlo el goto
+        anterior puede quedar también justo antes de la etiqueta.
+        """
+        return self._peephole('eliminate_dead_jumps', instructions, self._jump_threads(instructions))
+    
+    def local_value_numbering(self, instructions):
+        """Numeración de valores local
+        
+        Dentro de un bloque básico, una operación pura (aritmética,
+        comparación, negación o len) que repite una expresión ya calculada,
+        sin que sus operandos se hayan redefinido entre medias, pasa a ser una
+        copia de la variable que guarda el valor. La tabla se vacía en cada
+        etiqueta y cada salto, así la pasada también vale sobre un programa
+        completo.
+        """
+        available = {}  # {expresión: variable que guarda su valor}
         optimized = []
+        
         for instr in instructions:
-            keep = True
-            
-            if instr.op in ['PRINT', 'LABEL', 'GOTO', 'IF_FALSE', 'LIST_CREATE', 
-                           'LIST_APPEND', 'LIST_GET', 'LIST_SET', 'CALL']:
-                keep = True
-            elif instr.result:
-                keep = instr.result in used_vars
+            if instr.op is OpCode.LABEL:
+                available.clear()
+            key = self._expression_key(instr)
+            if key is not None and key in available:
+                copy = TACInstruction(OpCode.ASSIGN, available[key], None, instr.result)
+                self._record("Numeración de valores local", "{before} -> {after}",
+                             before=instr, after=copy, index=len(optimized))
+                instr, key = copy, None
+            optimized.append(instr)
             
-            if keep:
-                optimized.append(instr)
-            else:
-                self.optimizations_applied.append(
-                    f"Código muerto eliminado: {str(instr)}"
-                )
+            if self._mutates(instr):
+                available = {k: holder for k, holder in available.items() if k[0] != 'len'}
+            target = defined_var(instr)
+            if instr.op is OpCode.ENTER:
+                available.clear()
+            elif target is not None:
+                available = {k: holder for k, holder in available.items()
+                             if holder != target and target not in k[1:]}
+                if key is not None and target not in key[1:]:
+                    available[key] = target
+            if instr.op in TERMINATORS:
+                available.clear()
         
         return optimized
     
-    def strength_reduction(self, instructions):
-        """Reducción de fuerza"""
-        optimized = []
+    def global_value_numbering(self, instructions):
+        """Numeración de valores global
         
-        for instr in instructions:
-            if instr.op == 'MUL':
-                if instr.arg1 == '0' or instr.arg2 == '0':
-                    optimized.append(TACInstruction('ASSIGN', '0', None, instr.result))
-                    self.optimizations_applied.append(
-                        f"Reducción de fuerza: multiplicación por 0 = 0"
-                    )
+        En la forma SSA cada nombre tiene una sola definición, así una
+        expresión calculada en un bloque sigue disponible en todos los bloques
+        que domina. Se recorre el árbol de dominadores con una tabla por ámbito
+        y la expresión repetida en un bloque dominado pasa a ser una copia del
+        nombre que la calculó. Las copias se siguen hasta su origen: tras
+        a = b, a + 1 y b + 1 son la misma expresión. len solo se numera entre
+        bloques si el programa no modifica ninguna lista ni diccionario.
+        """
+        program = to_ssa(instructions)
+        cfg = program.cfg
+        number_len = not any(self._mutates(instr) for instr in instructions)
+        
+        children = {}
+        for index, dominator in cfg.idom.items():
+            children.setdefault(dominator, []).append(index)
+        values = {}     # {nombre: nombre o constante con el mismo valor}
+        available = {}  # {expresión: nombre que guarda su valor}
+        scopes = []     # Expresiones añadidas por cada bloque del camino actual
+        replaced = 0
+        stack = [(root, False) for root in reversed(children.get(None, ()))]
+        while stack:
+            index, leaving = stack.pop()
+            if leaving:
+                for key in scopes.pop():
+                    del available[key]
+                continue
+            added = []
+            body = cfg.blocks[index].instructions
+            for position, instr in enumerate(body):
+                target = defined_var(instr)
+                if instr.op is OpCode.ASSIGN and target is not None:
+                    values[target] = values.get(instr.arg1, instr.arg1)
                     continue
-                elif instr.arg2 == '1':
-                    optimized.append(TACInstruction('ASSIGN', instr.arg1, None, instr.result))
-                    self.optimizations_applied.append(
-                        f"Reducción de fuerza: {instr.arg1} * 1 = {instr.arg1}"
-                    )
+                key = self._expression_key(instr, values)
+                if key is None or (key[0] == 'len' and not number_len):
                     continue
-                elif instr.arg1 == '1':
-                    optimized.append(TACInstruction('ASSIGN', instr.arg2, None, instr.result))
-                    self.optimizations_applied.append(
-                        f"Reducción de fuerza: 1 * {instr.arg2} = {instr.arg2}"
-                    )
+                if key in available:
+                    copy = TACInstruction(OpCode.ASSIGN, available[key], None, instr.result)
+                    body[position] = copy
+                    values[target] = values.get(copy.arg1, copy.arg1)
+                    replaced += 1
+                    source = TACInstruction(instr.op, program.base(instr.arg1), program.base(instr.arg2),
+                                            program.base(instr.result))
+                    self._record("Numeración de valores global", "{before} reutiliza el valor ya calculado",
+                                 before=source, after=copy)
+                elif isinstance(target, Temp):
+                    # Solo se copian temporales: alargar la vida de una variable
+                    # del programa obligaría a conservar sus versiones SSA
+                    available[key] = target
+                    added.append(key)
+            scopes.append(added)
+            stack.append((index, True))
+            stack.extend((child, False) for child in reversed(children.get(index, ())))
+        
+        return from_ssa(program) if replaced else instructions
+    
+    def eliminate_tail_recursion(self, instructions):
+        """Eliminación de la recursión de cola
+    
+        Una llamada de la función a sí misma cuyo resultado se retorna sin más
+        (t = call f; return t) pasa a ser un salto al comienzo del cuerpo tras
+        reasignar los parámetros: la llamada vería una copia del marco actual
+        con los argumentos enlazados, justo lo que queda en el marco al saltar.
+        Si el resultado se combina antes de retornarlo (return n * f(n - 1)),
+        el operando pendiente se acumula en un temporal que empieza en el
+        neutro de la operación y los return de los casos base devuelven el
+        acumulado por su valor. Reordenar así las operaciones solo es exacto
+        con enteros: el acumulador exige una suma o un producto con operandos
+        enteros probados, suponiendo enteros los parámetros y comprobando
+        después que cada llamada a la función los pasa. Solo se transforma una
+        función que retorna un valor en todas sus salidas y cuyas llamadas a sí
+        misma son todas de este tipo; la recursión queda en un bucle y la pila
+        de llamadas no crece.
+        """
+        result = instructions
+        eliminated = 0
+        for name, (start, end) in self._function_definitions(instructions).items():
+            # Las posiciones cambian tras reescribir otra función
+            start = next(position for position, instr in enumerate(result)
+                         if instr.op is OpCode.LABEL and instr.arg1 == f"func_{name}")
+            end = next(position for position in range(start, len(result)) if result[position].op is OpCode.LEAVE)
+            params = result[start + 1].arg1
+            body = result[start + 2:end]
+            if len(set(params)) != len(params) or not returns_value(body):
+                continue
+            sites = self._recursive_sites(body, name, params)
+            if not sites:
+                continue
+            operations = {site[2] for site in sites} - {None}
+            if len(operations) > 1:
+                continue
+            operation = operations.pop() if operations else None
+            if operation is not None and not self._accumulates_integers(result, start, name, params, sites):
+                continue
+    
+            temps = (Temp(f"t{number}") for number in itertools.count(self._next_temp_number(result)))
+            loop_label = Label(f"L{self._next_label_number(result)}")
+            accumulator = next(temps) if operation is not None else None
+            new_body = []
+            if accumulator is not None:
+                identity = Const(1 if operation is OpCode.MUL else 0)
+                new_body.append(TACInstruction(OpCode.ASSIGN, identity, None, accumulator))
+            new_body.append(TACInstruction(OpCode.LABEL, loop_label))
+            sites_at = {site[0]: site for site in sites}
+            position = 0
+            while position < len(body):
+                instr = body[position]
+                site = sites_at.get(position)
+                if site is not None:
+                    first, last, site_operation, operand = site
+                    if site_operation is not None:
+                        new_body.append(TACInstruction(operation, accumulator, operand, accumulator))
+                    args = [param.arg1 for param in body[first:first + len(params)]]
+                    new_body.extend(self._parallel_assign(params, args, temps))
+                    new_body.append(TACInstruction(OpCode.GOTO, loop_label))
+                    eliminated += 1
+                    call = body[first + len(params)]
+                    self._record("Recursión de cola", "{before} en func_{0} pasa a ser un salto a {1}",
+                                 name, loop_label, before=call, after=new_body[-1])
+                    position = last + 1
                     continue
-            
-            if instr.op == 'ADD':
-                if instr.arg2 == '0':
-                    optimized.append(TACInstruction('ASSIGN', instr.arg1, None, instr.result))
-                    self.optimizations_applied.append(
-                        f"Reducción de fuerza: {instr.arg1} + 0 = {instr.arg1}"
-                    )
+                if accumulator is not None and instr.op is OpCode.RETURN:
+                    # Caso base: el valor se combina con lo acumulado
+                    new_body.append(TACInstruction(operation, accumulator, instr.arg1, accumulator))
+                    instr = TACInstruction(OpCode.RETURN, accumulator)
+                new_body.append(instr)
+                position += 1
+            result = result[:start + 2] + new_body + result[end:]
+    
+        return result if eliminated else instructions
+    
+    def inline_functions(self, instructions):
+        """Integración de funciones
+    
+        Cada llamada a una función del usuario apila sus argumentos, copia las
+        variables del llamador en un marco nuevo y lo restaura al retornar. Una
+        función hoja (no llama a ninguna función del usuario, así no es
+        recursiva) se integra en sus puntos de llamada si su cuerpo cabe en
+        INLINE_BUDGET instrucciones o si se llama desde un solo punto: los
+        parámetros pasan a ser asignaciones, cada return asigna el resultado de
+        la llamada y salta al final de la copia, y los nombres que define la
+        función y sus etiquetas se renombran para no pisar los del llamador. La
+        definición desaparece cuando ya no quedan llamadas. Las funciones que
+        solo llamaban a hojas integradas quedan como hojas, así se repite hasta
+        que no queda ninguna que integrar; una función recursiva (factorial)
+        siempre conserva su llamada y no se integra.
+        """
+        result = instructions
+        inlined = 0
+        while True:
+            functions = self._inlinable_functions(result)
+            if not functions:
+                break
+            names = {operand for instr in result for operand in self._operands(instr) if isinstance(operand, Var)}
+            temps = (Temp(f"t{number}") for number in itertools.count(self._next_temp_number(result)))
+            labels = (Label(f"L{number}") for number in itertools.count(self._next_label_number(result)))
+            expanded = []
+            hosts = set()  # Posiciones de los ENTER de las funciones que reciben una copia
+            enter_position = None
+            round_inlined = 0
+            for instr in result:
+                function = functions.get(instr.arg1) if instr.op is OpCode.CALL else None
+                if function is not None:
+                    params, body = function
+                    args = expanded[len(expanded) - len(params):] if params else []
+                    if isinstance(instr.arg2, Const) and instr.arg2.value == len(params) and \
+                            len(args) == len(params) and all(arg.op is OpCode.PARAM for arg in args):
+                        del expanded[len(expanded) - len(args):]
+                        expanded.extend(self._inline_copy(instr, args, params, body, names, temps, labels))
+                        if enter_position is not None:
+                            hosts.add(enter_position)
+                        round_inlined += 1
+                        self._record("Integración de funciones", "{before} pasa a ser una copia de func_{0}",
+                                     instr.arg1, before=instr)
+                        continue
+                if instr.op is OpCode.ENTER:
+                    enter_position = len(expanded)
+                elif instr.op is OpCode.LEAVE:
+                    enter_position = None
+                expanded.append(instr)
+            if not round_inlined:
+                break
+            inlined += round_inlined
+    
+            # Las funciones integradas en todas sus llamadas desaparecen; las que
+            # recibieron copias recalculan el tamaño de su marco
+            called = {instr.arg1 for instr in expanded if instr.op in (OpCode.CALL, OpCode.FUNCTION_CALL)}
+            result = []
+            removing = False
+            for position, instr in enumerate(expanded):
+                if is_function_label(instr) and instr.arg1[len('func_'):] in functions and \
+                        instr.arg1[len('func_'):] not in called:
+                    removing = True
+                    self._record("Integración de funciones", "{0} eliminada, ya no tiene llamadas",
+                                 instr.arg1, before=instr)
+                if removing:
+                    removing = instr.op is not OpCode.LEAVE
                     continue
-                elif instr.arg1 == '0':
-                    optimized.append(TACInstruction('ASSIGN', instr.arg2, None, instr.result))
-                    self.optimizations_applied.append(
-                        f"Reducción de fuerza: 0 + {instr.arg2} = {instr.arg2}"
-                    )
+                if position in hosts:
+                    frame = Const(len(frame_locals(instr.arg1, expanded[position + 1:])))
+                    instr = TACInstruction(OpCode.ENTER, instr.arg1, frame)
+                result.append(instr)
+    
+        return result if inlined else instructions
+    
+    def loop_invariant_code_motion(self, instructions):
+        """Movimiento de código invariante de bucles
+        
+        Una instrucción pura de un bucle natural cuyos operandos no se definen
+        dentro del bucle calcula el mismo valor en cada vuelta: pasa al
+        preencabezado (el bloque que cae en la cabecera desde fuera del bucle)
+        y se ejecuta una sola vez. Los bucles se recorren de los internos a los
+        externos, así un valor sale de todos los bucles que lo rodean, y las
+        cadenas de invariantes salen juntas.
+        
+        La instrucción sale con su nombre si es la única definición del bucle
+        y no se lee antes de ella en la vuelta. Si no (el generador recicla los
+        temporales) y todas sus lecturas están en su bloque, el valor pasa a un
+        temporal nuevo. Como el preencabezado se ejecuta aunque el bucle no dé
+        ninguna vuelta, solo salen las instrucciones que no pueden fallar según
+        sus tipos probados y cuyos operandos están definidos en todos los
+        caminos que llegan al preencabezado. len solo sale de un bucle que no
+        modifica listas ni diccionarios.
+        """
+        cfg = build_cfg(instructions)
+        if not cfg.loops:
+            return instructions
+        annotate_types(instructions)
+        liveness = BitLiveness(cfg)
+        defined_out = definitely_defined(cfg, liveness.index)
+        temp_counter = self._next_temp_number(instructions)
+        hoisted = 0
+        
+        for loop in reversed(cfg.loops):
+            preheader = self._preheader(cfg, loop)
+            if preheader is None:
+                continue
+            blocks = sorted(loop.blocks)
+            counts = {}  # {variable: definiciones dentro del bucle}
+            mutates = False
+            for index in blocks:
+                for instr in cfg.blocks[index].instructions:
+                    target = defined_var(instr)
+                    if target is not None:
+                        counts[target] = counts.get(target, 0) + 1
+                    mutates = mutates or self._mutates(instr)
+            # Se calculan con lo que ya salió de los bucles interiores, que puede
+            # haber dejado vacío un bloque de este bucle (sin terminador)
+            exiting = []
+            for index in blocks:
+                terminator = cfg.blocks[index].terminator
+                if any(succ not in loop for succ in cfg.blocks[index].succs) or \
+                        (terminator is not None and terminator.op in EXITS):
+                    exiting.append(index)
+            live_at_exits = 0
+            for index in exiting:
+                for succ in cfg.blocks[index].succs:
+                    if succ not in loop:
+                        live_at_exits |= liveness.live_in[succ]
+            header_label = cfg.blocks[loop.header].label
+            
+            moved = True
+            while moved:
+                moved = False
+                for index in blocks:
+                    body = cfg.blocks[index].instructions
+                    position = 0
+                    while position < len(body):
+                        instr = body[position]
+                        target = defined_var(instr)
+                        if not self._is_invariant(instr, counts, mutates) or not all(
+                                self._has_bit(liveness, defined_out[preheader.index], var)
+                                for var in used_vars(instr)):
+                            position += 1
+                            continue
+                        if counts[target] == 1 and not self._has_bit(liveness, liveness.live_in[loop.header], target) \
+                                and (all(cfg.dominates(index, exit_block) for exit_block in exiting)
+                                     or not self._has_bit(liveness, live_at_exits, target)):
+                            # Única definición del bucle: sale tal cual
+                            moved_instr = instr
+                            del body[position]
+                            detail = "{before} sale del bucle {0}"
+                        else:
+                            uses = self._local_uses(body, position, target, liveness, index) \
+                                if isinstance(target, Temp) else None
+                            if uses is None:
+                                position += 1
+                                continue
+                            temp = Temp(f"t{temp_counter}")
+                            temp_counter += 1
+                            for use in uses:
+                                body[use] = self._rename_use(body[use], target, temp)
+                            moved_instr = TACInstruction(instr.op, instr.arg1, instr.arg2, temp)
+                            moved_instr.types = instr.types
+                            del body[position]
+                            counts[temp] = 0
+                            detail = "{before} sale del bucle {0} como {after.result}"
+                        counts[target] -= 1
+                        preheader.instructions.append(moved_instr)
+                        bit = self._mark_live(liveness, moved_instr.result, preheader, blocks)
+                        defined_out[preheader.index] |= bit
+                        hoisted += 1
+                        moved = True
+                        self._record("Movimiento de código invariante", detail, header_label,
+                                     before=instr, after=moved_instr)
+        
+        return cfg.to_instructions() if hoisted else instructions
+    
+    def induction_strength_reduction(self, instructions):
+        """Reducción de fuerza de variables de inducción
+        
+        Una variable de inducción básica cambia en un paso constante en cada
+        vuelta: i += c (o i -= c) con i entera y sin otra definición en el
+        bucle, o la variable de un for sobre un range de inicio y paso
+        constantes. Su producto por un factor entero invariante (una constante
+        o una variable que el bucle no redefine), t = i * k, se lleva en un
+        temporal nuevo que se inicializa en el preencabezado y suma c * k tras
+        cada avance de i, así la multiplicación de cada vuelta pasa a ser una
+        suma. Solo se reducen los productos que se leen en su bloque.
+        """
+        cfg = build_cfg(instructions)
+        if not cfg.loops:
+            return instructions
+        annotate_types(instructions)
+        liveness = BitLiveness(cfg)
+        defined_out = definitely_defined(cfg, liveness.index)
+        temp_counter = self._next_temp_number(instructions)
+        reduced = 0
+        
+        for loop in reversed(cfg.loops):
+            preheader = self._preheader(cfg, loop)
+            if preheader is None:
+                continue
+            blocks = sorted(loop.blocks)
+            counts = {}
+            updates = {}  # {variable: (bloque, instrucción que la define)}
+            for index in blocks:
+                for instr in cfg.blocks[index].instructions:
+                    target = defined_var(instr)
+                    if target is not None:
+                        counts[target] = counts.get(target, 0) + 1
+                        updates[target] = (index, instr)
+            inductions = {}  # {variable: (paso, inicio constante o None)}
+            for var, (index, instr) in updates.items():
+                if counts[var] == 1:
+                    induction = self._induction_step(cfg, loop, preheader, index, instr)
+                    if induction is not None and (induction[1] is not None or
+                                                  self._has_bit(liveness, defined_out[preheader.index], var)):
+                        inductions[var] = induction
+            if not inductions:
+                continue
+            
+            reductions = {}  # {(variable, factor): temporal que guarda su producto}
+            for index in blocks:
+                body = cfg.blocks[index].instructions
+                position = 0
+                while position < len(body):
+                    instr = body[position]
+                    product = self._induction_product(instr, inductions, counts)
+                    if product is not None and isinstance(product[1], Var) and \
+                            not self._has_bit(liveness, defined_out[preheader.index], product[1]):
+                        product = None
+                    uses = None
+                    if product is not None and isinstance(instr.result, Temp):
+                        uses = self._local_uses(body, position, instr.result, liveness, index)
+                    if uses is None:
+                        position += 1
+                        continue
+                    temp = reductions.get(product)
+                    if temp is None:
+                        temp = reductions[product] = Temp(f"t{temp_counter}")
+                        temp_counter += 1
+                    for use in uses:
+                        body[use] = self._rename_use(body[use], instr.result, temp)
+                    del body[position]
+                    reduced += 1
+                    self._record("Reducción de fuerza de inducción", "{before} pasa a sumas sobre {0}",
+                                 temp, before=instr)
+            
+            for (var, factor), temp in reductions.items():
+                step, start = inductions[var]
+                self._mark_live(liveness, temp, preheader, blocks)
+                if start is None:
+                    preheader.instructions.append(TACInstruction(OpCode.MUL, var, factor, temp))
+                elif isinstance(factor, Const):
+                    preheader.instructions.append(TACInstruction(OpCode.ASSIGN, Const(start * factor.value), None, temp))
+                else:
+                    preheader.instructions.append(TACInstruction(OpCode.MUL, factor, Const(start), temp))
+                # El incremento es c * k: constante, el propio factor o un temporal más
+                update_op = OpCode.ADD_INPLACE
+                if isinstance(factor, Const):
+                    increment = Const(step * factor.value)
+                elif abs(step) == 1:
+                    increment = factor
+                    update_op = OpCode.ADD_INPLACE if step == 1 else OpCode.SUB_INPLACE
+                else:
+                    increment = Temp(f"t{temp_counter}")
+                    temp_counter += 1
+                    preheader.instructions.append(TACInstruction(OpCode.MUL, factor, Const(step), increment))
+                    self._mark_live(liveness, increment, preheader, blocks)
+                if start is None:
+                    index, update = updates[var]
+                    body = cfg.blocks[index].instructions
+                    body.insert(body.index(update) + 1, TACInstruction(update_op, increment, None, temp))
+                else:
+                    # La variable de un for avanza en la cabecera: la suma va al
+                    # final de cada vuelta, antes del salto de vuelta
+                    for index in loop.back_edges:
+                        body = cfg.blocks[index].instructions
+                        body.insert(len(body) - 1, TACInstruction(update_op, increment, None, temp))
+        
+        return cfg.to_instructions() if reduced else instructions
+    
+    def unroll_loops(self, instructions):
+        """Desenrollado de bucles for sobre range constante
+        
+        Un for sobre range de inicio, fin y paso constantes da un número de
+        vueltas conocido. Si el cuerpo repetido cabe en UNROLL_BUDGET
+        instrucciones se desenrolla entero: cada copia lee su valor de la
+        variable como constante (que el plegado propaga) y desaparecen el
+        iterador y el salto de vuelta. Si no cabe, y el cuerpo no lee la
+        variable, se repite tantas veces como quepa dentro de cada vuelta de un
+        range de paso mayor y las vueltas sobrantes van como copias tras el
+        bucle: una cabecera por cada varias vueltas.
+        """
+        loops = [position for position, instr in enumerate(instructions)
+                 if instr.op is OpCode.FOR_RANGE_INIT]
+        if not loops:
+            return instructions
+        result = list(instructions)
+        references = {}  # {nombre: veces que aparece como operando}
+        for instr in result:
+            for operand in self._operands(instr):
+                references[operand] = references.get(operand, 0) + 1
+        label_counter = self._next_label_number(result)
+        unrolled = 0
+        
+        # De atrás hacia delante: un bucle interno se desenrolla antes que el
+        # que lo contiene, y las posiciones anteriores no se mueven
+        for init_position in reversed(loops):
+            loop = self._range_loop(result, init_position, references)
+            if loop is None:
+                continue
+            header_position, end_position, values = loop
+            init, next_instr = result[init_position], result[header_position + 1]
+            var = next_instr.result
+            body = result[header_position + 2:end_position - 1]
+            size = max(len(body), 1)
+            reads = sum(1 for instr in body for operand in self._operands(instr) if operand == var)
+            # La variable se asigna en las copias si se lee fuera del cuerpo (tras el
+            # bucle o desde una función, que ve las variables del llamador)
+            assign = references.get(var, 0) - reads > 1
+            
+            full = len(values) * size <= UNROLL_BUDGET
+            if full:
+                new_loop = []
+                for value in values:
+                    if assign:
+                        new_loop.append(TACInstruction(OpCode.ASSIGN, Const(value), None, var))
+                    label_counter = self._copy_body(body, {var: Const(value)}, label_counter, new_loop)
+                detail, args = "{before} desenrollado en {0} copias", (len(values),)
+            else:
+                factor = UNROLL_BUDGET // size
+                if factor < 2 or reads or assign:
                     continue
+                start, _, step = (operand.value for operand in init.arg1)
+                main = len(values) - len(values) % factor
+                rest_label = next_instr.arg2
+                if main < len(values):
+                    rest_label = Label(f"L{label_counter}")
+                    label_counter += 1
+                new_loop = [result[header_position], TACInstruction(next_instr.op, next_instr.arg1, rest_label, var)]
+                for _ in range(factor):
+                    label_counter = self._copy_body(body, {}, label_counter, new_loop)
+                new_loop.append(result[end_position - 1])
+                if main < len(values):
+                    new_loop.append(TACInstruction(OpCode.LABEL, rest_label))
+                    for _ in range(len(values) - main):
+                        label_counter = self._copy_body(body, {}, label_counter, new_loop)
+                detail, args = "{before} desenrollado {0} veces por vuelta", (factor,)
             
-            optimized.append(instr)
+            removed = result[header_position:end_position]
+            if full:
+                removed.append(init)
+            for instr in removed:
+                for operand in self._operands(instr):
+                    references[operand] -= 1
+            for instr in new_loop:
+                for operand in self._operands(instr):
+                    references[operand] = references.get(operand, 0) + 1
+            if full and references[next_instr.arg2] == 1:
+                # Sin el salto de la cabecera nadie llega ya a la etiqueta de salida
+                references[next_instr.arg2] = 0
+                end_position += 1
+            result[header_position:end_position] = [
+                instr for instr in new_loop if instr.op is not OpCode.LABEL or references[instr.arg1] > 1
+            ]
+            if full:
+                del result[init_position]
+            else:
+                bounds = ArgList((Const(start), Const(start + main * step), Const(factor * step)))
+                result[init_position] = TACInstruction(OpCode.FOR_RANGE_INIT, bounds, None, init.result)
+            unrolled += 1
+            self._record("Desenrollado de bucles", detail, *args, before=init)
         
-        return optimized
+        return result if unrolled else instructions
     
-    def remove_redundant_assignments(self, instructions):
-        """Elimina asignaciones redundantes"""
-        optimized = []
+    def fuse_inplace(self, instructions):
+        """Actualización en el lugar y fusión de copias
         
+        t = x + v seguido de x = t pasa a x += v si t no sigue vivo tras la
+        copia: el acumulador se actualiza en una sola instrucción. Con otra
+        definición, t = e seguido de x = t pasa a x = e. La vivacidad de las
+        copias se calcula antes del recorrido y las reescrituras no la cambian.
+        """
+        dead_copies = self._dead_copies(instructions)
+        if not dead_copies:
+            return instructions
+        return self._peephole('fuse_inplace', instructions, dead_copies)
+    
+    def fuse_branches(self, instructions):
+        """Fusión de comparación y salto
+        
+        t = a < b seguido de if_false t goto L pasa a if a >= b goto L (y
+        seguido de if t goto L, a if a < b goto L) si t no sigue vivo tras el
+        salto: una sola instrucción y sin temporal.
+        """
+        cfg = build_cfg(instructions)
+        _, live_out = cfg.liveness()
+        fused = 0
+        for block in cfg:
+            body = block.instructions
+            branch = body[-1]
+            if branch.op not in (OpCode.IF_FALSE, OpCode.IF_TRUE) or len(body) < 2:
+                continue
+            compare = body[-2]
+            jumps = NEGATED_JUMPS if branch.op is OpCode.IF_FALSE else COMPARISON_JUMPS
+            if compare.op not in jumps or compare.result != branch.arg1 or \
+                    not isinstance(compare.result, Temp) or compare.result in live_out[block.index]:
+                continue
+            jump = TACInstruction(jumps[compare.op], compare.arg1, compare.arg2, branch.arg2)
+            block.instructions = body[:-2] + [jump]
+            fused += 1
+            self._record("Fusión de comparación y salto", "{before} -> {after}",
+                         before=Window((compare, branch)), after=jump)
+        return cfg.to_instructions() if fused else instructions
+    
+    def _record(self, kind, detail, *args, before=None, after=None, index=None):
+        """Anota una reescritura: siempre cuenta por tipo y, con record_events,
+        guarda su evento sin formatear el texto"""
+        self.change_count += 1
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if self.record_events:
+            self.events.append(OptimizationEvent(kind, self.current_pass, index, before, after, detail, args))
+    
+    def _peephole(self, name, instructions, context=None):
+        """Aplica las reglas de mirilla de una pasada y anota sus reescrituras"""
+        result, rewrites = PEEPHOLES[name].run(instructions, self, context)
+        for rewrite in rewrites:
+            self._record(rewrite.rule.kind, rewrite.rule.detail,
+                         before=rewrite.before, after=rewrite.after, index=rewrite.index)
+        return result if rewrites else instructions
+    
+    def _multiplication_identity(self, window, context):
+        """x * 0 = 0 y x * 1 = 1 * x = x con x numérico"""
+        instr, = window
+        arg1_type, arg2_type, _ = instr.types or (None, None, None)
+        if self._is_int(instr.arg1, 0) or self._is_int(instr.arg2, 0):
+            other_type = arg2_type if self._is_int(instr.arg1, 0) else arg1_type
+            if other_type not in NUMERIC_TYPES:
+                return None
+            zero = Const(0.0 if other_type == 'float' else 0)
+            return [TACInstruction(OpCode.ASSIGN, zero, None, instr.result)]
+        if self._is_int(instr.arg2, 1) and arg1_type in NUMERIC_TYPES:
+            return [TACInstruction(OpCode.ASSIGN, instr.arg1, None, instr.result)]
+        if self._is_int(instr.arg1, 1) and arg2_type in NUMERIC_TYPES:
+            return [TACInstruction(OpCode.ASSIGN, instr.arg2, None, instr.result)]
+        return None
+    
+    def _addition_identity(self, window, context):
+        """x + 0 = 0 + x = x con x numérico"""
+        instr, = window
+        arg1_type, arg2_type, _ = instr.types or (None, None, None)
+        if self._is_int(instr.arg2, 0) and arg1_type in NUMERIC_TYPES:
+            return [TACInstruction(OpCode.ASSIGN, instr.arg1, None, instr.result)]
+        if self._is_int(instr.arg1, 0) and arg2_type in NUMERIC_TYPES:
+            return [TACInstruction(OpCode.ASSIGN, instr.arg2, None, instr.result)]
+        return None
+    
+    def _self_assignment(self, window, context):
+        """x = x no hace nada"""
+        instr, = window
+        if instr.arg1 != instr.result:
+            return None
+        return []
+    
+    def _jump_threads(self, instructions):
+        """Destino final de cada etiqueta seguida de goto, siguiendo la cadena
+        de goto. Las etiquetas de un ciclo de goto no se encaminan y las que
+        llegan a un ciclo van a la primera etiqueta del ciclo"""
+        gotos = {}
+        labels = []
         for instr in instructions:
-            if instr.op == 'ASSIGN' and instr.arg1 == instr.result:
-                self.optimizations_applied.append(
-                    f"Asignación redundante eliminada: {instr.result} = {instr.arg1}"
-                )
+            if instr.op is OpCode.LABEL:
+                labels.append(instr.arg1)
                 continue
-            optimized.append(instr)
+            if instr.op is OpCode.GOTO:
+                gotos.update((label, instr.arg1) for label in labels)
+            labels = []
         
-        return optimized
+        threads = {}
+        for label, target in gotos.items():
+            chain = [label]
+            while target in gotos and target not in chain:
+                chain.append(target)
+                target = gotos[target]
+            if target != label:
+                threads[label] = target
+        return threads
     
-    def eliminate_dead_jumps(self, instructions):
-        """Elimina saltos innecesarios"""
-        optimized = []
+    def _thread_jump(self, window, threads):
+        """Un salto a una etiqueta seguida de goto salta al destino del goto"""
+        jump, = window
+        target = threads.get(jump_target(jump))
+        if target is None:
+            return None
+        return [retarget(jump, target)]
+    
+    def _jump_to_next(self, window, threads):
+        """goto L seguido de la etiqueta L (entre otras) sobra"""
+        jump, *labels = window
+        if all(label.arg1 != jump.arg1 for label in labels):
+            return None
+        return labels
+    
+    def _dead_copies(self, instructions):
+        """Identidades de las copias x = t tras las que el temporal t no se
+        lee antes de redefinirse (una instrucción repetida debe cumplirlo en
+        todas sus posiciones)"""
+        cfg = build_cfg(instructions)
+        _, live_out = cfg.liveness()
+        dead, alive = set(), set()
+        for block in cfg:
+            live = set(live_out[block.index])
+            for instr in reversed(block.instructions):
+                if instr.op is OpCode.ASSIGN and isinstance(instr.arg1, Temp):
+                    (alive if instr.arg1 in live else dead).add(id(instr))
+                target = defined_var(instr)
+                if target is not None:
+                    live.discard(target)
+                live.update(used_vars(instr))
+        return dead - alive
+    
+    def _fuse_update(self, window, dead_copies):
+        """t = x + v; x = t con t muerto pasa a x += v"""
+        compute, copy = window
+        target = copy.result
+        if id(copy) not in dead_copies or copy.arg1 != compute.result or \
+                not isinstance(compute.result, Temp) or isinstance(target, Temp) or compute.arg1 != target:
+            return None
+        return [TACInstruction(INPLACE_FORMS[compute.op], compute.arg2, None, target)]
+    
+    def _fuse_copy(self, window, dead_copies):
+        """t = e; x = t con t muerto pasa a x = e"""
+        compute, copy = window
+        if id(copy) not in dead_copies or copy.arg1 != compute.result or not isinstance(compute.result, Temp):
+            return None
+        fused = TACInstruction(compute.op, compute.arg1, compute.arg2, copy.result)
+        if compute.op is OpCode.ASSIGN and id(compute) in dead_copies:
+            # x = e es una copia en el mismo punto que t = e: e tampoco sigue vivo
+            dead_copies.add(id(fused))
+        return [fused]
+    
+    def _removable(self, instr):
+        """Indica si una definición puede eliminarse cuando su valor no se lee:
+        no tiene otros efectos ni puede detener la ejecución"""
+        if instr.op in KEPT_DEFINITIONS:
+            return False
+        if instr.op is OpCode.LIST_GET:
+            return instr.in_bounds
+        if instr.op in DIVISIONS:
+            divisor = instr.arg1 if instr.op in INPLACE_OPS else instr.arg2
+            return self._numeric_value(divisor) not in (None, 0)
+        return True
+    
+    def _expression_key(self, instr, values=None):
+        """Clave de la expresión pura que calcula la instrucción, o None.
         
-        for i, instr in enumerate(instructions):
-            if instr.op == 'GOTO':
-                if i + 1 < len(instructions):
-                    next_instr = instructions[i + 1]
-                    if next_instr.op == 'LABEL' and next_instr.arg1 == instr.arg1:
-                        self.optimizations_applied.append(
-                            f"Salto innecesario eliminado: goto {instr.arg1}"
-                        )
-                        continue
-            
-            optimized.append(instr)
+        values traduce cada nombre al nombre o constante que guarda su mismo
+        valor (numeración global); los operandos de una operación conmutativa
+        se ordenan.
+        """
+        if defined_var(instr) is None:
+            return None
+        if instr.op in PURE_OPS:
+            operands = (instr.arg1, instr.arg2)
+        elif instr.op is OpCode.CALL and instr.arg1 == 'len':
+            operands = (instr.arg2, None)
+        else:
+            return None
+        if values:
+            operands = tuple(values.get(operand, operand) for operand in operands)
+        if instr.op in COMMUTATIVE_OPS:
+            operands = tuple(sorted(operands))
+        return ('len' if instr.op is OpCode.CALL else instr.op,) + operands
+    
+    def _mutates(self, instr):
+        """Indica si la instrucción puede cambiar la longitud de una lista o diccionario"""
+        return instr.op in MUTATING_OPS or (instr.op is OpCode.CALL and instr.arg1 not in BUILTIN_FUNCTIONS)
+    
+    def _preheader(self, cfg, loop):
+        """Bloque desde el que se entra al bucle cayendo en la cabecera, o None
+        si la cabecera tiene otras entradas desde fuera del bucle"""
+        outside = [pred for pred in cfg.blocks[loop.header].preds if pred not in loop]
+        if len(outside) != 1 or cfg.blocks[outside[0]].terminator is not None:
+            return None
+        return cfg.blocks[outside[0]]
+    
+    def _induction_step(self, cfg, loop, preheader, index, instr):
+        """(paso, inicio) si instr es la única definición de una variable de
+        inducción básica del bucle; el inicio solo se conoce en un range"""
+        if instr.op in (OpCode.ADD_INPLACE, OpCode.SUB_INPLACE):
+            step = instr.arg1
+            if not self._is_int_const(step) or (instr.types or (None, None, None))[2] != 'int':
+                return None
+            return (step.value if instr.op is OpCode.ADD_INPLACE else -step.value), None
+        if instr.op is OpCode.FOR_RANGE_NEXT and index == loop.header:
+            init = next((candidate for candidate in preheader.instructions
+                         if candidate.op is OpCode.FOR_RANGE_INIT and candidate.result == instr.arg1), None)
+            if init is None:
+                return None
+            start, _, step = init.arg1
+            if not (self._is_int_const(start) and self._is_int_const(step)):
+                return None
+            # Cada vuelta termina con un goto a la cabecera, donde va la suma
+            if any(cfg.blocks[back].instructions[-1].op is not OpCode.GOTO for back in loop.back_edges):
+                return None
+            return step.value, start.value
+        return None
+    
+    def _induction_product(self, instr, inductions, counts):
+        """(variable de inducción, factor) si instr es t = i * k con k entero e
+        invariante en el bucle"""
+        if instr.op is not OpCode.MUL:
+            return None
+        for var, factor in ((instr.arg1, instr.arg2), (instr.arg2, instr.arg1)):
+            if var not in inductions or not isinstance(var, Var):
+                continue
+            if self._is_int_const(factor):
+                return var, factor
+            if isinstance(factor, Var) and not counts.get(factor) and factor not in inductions and \
+                    (instr.types or (None, None, None))[:2] == ('int', 'int'):
+                return var, factor
+        return None
+    
+    def _is_int_const(self, operand):
+        """Indica si el operando es una constante entera"""
+        return isinstance(operand, Const) and type(operand.value) is int
+    
+    def _range_loop(self, instructions, init_position, references):
+        """(posición de la cabecera, posición de la etiqueta de salida, valores)
+        del for cuyo range se crea en init_position, o None si no se puede
+        desenrollar: el range no es constante, se entra o se sale del cuerpo por
+        otro camino o el cuerpo redefine la variable"""
+        init = instructions[init_position]
+        bounds = init.arg1
+        if not all(self._is_int_const(bound) for bound in bounds) or bounds[2].value == 0:
+            return None
+        if references.get(init.result) != 2:
+            return None
+        header_position = init_position + 1
+        while header_position < len(instructions) and instructions[header_position].op is not OpCode.LABEL:
+            if instructions[header_position].op in TERMINATORS:
+                return None
+            header_position += 1
+        if header_position + 1 >= len(instructions):
+            return None
+        header, next_instr = instructions[header_position], instructions[header_position + 1]
+        if next_instr.op is not OpCode.FOR_RANGE_NEXT or next_instr.arg1 != init.result or \
+                references.get(header.arg1) != 2:
+            return None
+        end_position = header_position + 2
+        while end_position < len(instructions) and not (
+                instructions[end_position].op is OpCode.LABEL and instructions[end_position].arg1 == next_instr.arg2):
+            end_position += 1
+        if end_position == len(instructions):
+            return None
+        back_edge = instructions[end_position - 1]
+        if back_edge.op is not OpCode.GOTO or back_edge.arg1 != header.arg1:
+            return None
         
-        return optimized
+        body = instructions[header_position + 2:end_position - 1]
+        inner = {}  # {etiqueta del cuerpo: veces que aparece en el cuerpo}
+        for instr in body:
+            if instr.op in UNROLL_BARRIERS or is_function_label(instr) or defined_var(instr) == next_instr.result:
+                return None
+            for operand in self._operands(instr):
+                if isinstance(operand, Label):
+                    inner[operand] = inner.get(operand, 0) + 1
+        for instr in body:
+            if instr.op is OpCode.LABEL and inner[instr.arg1] != references[instr.arg1]:
+                return None
+        return header_position, end_position, range(bounds[0].value, bounds[1].value, bounds[2].value)
     
-    def _parse_number(self, value):
-        """Intenta parsear un valor como número"""
-        if value is None:
+    def _copy_body(self, body, replace, label_counter, copies):
+        """Añade a copies una copia del cuerpo con sus etiquetas renombradas y
+        los operandos de replace sustituidos; devuelve el contador de etiquetas"""
+        replace = dict(replace)
+        for instr in body:
+            if instr.op is OpCode.LABEL:
+                replace[instr.arg1] = Label(f"L{label_counter}")
+                label_counter += 1
+        for instr in body:
+            copies.append(self._substitute(instr, replace))
+        return label_counter
+    
+    def _substitute(self, instr, replace):
+        """Copia de la instrucción con los operandos de replace sustituidos"""
+        def substitute(field):
+            if isinstance(field, tuple):
+                return type(field)(substitute(arg) for arg in field)
+            if isinstance(field, (Var, Label)):
+                return replace.get(field, field)
+            return field
+        copy = TACInstruction(instr.op, substitute(instr.arg1), substitute(instr.arg2), substitute(instr.result))
+        copy.in_bounds = instr.in_bounds
+        return copy
+    
+    def _operands(self, instr):
+        """Operandos de la instrucción, con los de las listas de argumentos"""
+        for field in (instr.arg1, instr.arg2, instr.result):
+            if isinstance(field, tuple):
+                yield from field
+            elif isinstance(field, str):
+                yield field
+    
+    def _next_label_number(self, instructions):
+        """Número de la primera etiqueta LN que no aparece en el programa"""
+        number = 0
+        for instr in instructions:
+            if instr.op is OpCode.LABEL and re.fullmatch(r'L\d+', instr.arg1):
+                number = max(number, int(instr.arg1[1:]) + 1)
+        return number
+    
+    def _inlinable_functions(self, instructions):
+        """{nombre: (parámetros, cuerpo)} de las funciones que se pueden integrar.
+        
+        Se descartan las que llaman a funciones del usuario, borran una
+        variable, saltan fuera de su cuerpo o leen un nombre que también
+        definen antes de definirlo en algún camino (esa lectura ve la variable
+        del llamador), y las mayores que INLINE_BUDGET con varias llamadas.
+        """
+        calls = self._call_counts(instructions)
+        functions = {}
+        for name, (start, end) in self._function_definitions(instructions).items():
+            if name not in calls:
+                continue
+            body = instructions[start + 2:end]
+            if len(body) > INLINE_BUDGET and calls[name] > 1:
+                continue
+            labels = {instr.arg1 for instr in body if instr.op is OpCode.LABEL}
+            if all(not self._blocks_inlining(instr) and jump_target(instr) in labels | {None} for instr in body):
+                functions[name] = (instructions[start + 1].arg1, body)
+        if not functions:
+            return functions
+        
+        liveness = BitLiveness(build_cfg(instructions))
+        for name, (_, body) in list(functions.items()):
+            entry = liveness.cfg.function_entries[f"func_{name}"]
+            if any(self._has_bit(liveness, liveness.live_in[entry], defined_var(instr)) for instr in body):
+                del functions[name]
+        return functions
+    
+    def _function_definitions(self, instructions):
+        """{nombre: (posición de la etiqueta func_, posición del LEAVE)} de las
+        funciones definidas una sola vez con ENTER y LEAVE"""
+        starts = {}
+        for position, instr in enumerate(instructions):
+            if is_function_label(instr):
+                name = instr.arg1[len('func_'):]
+                starts[name] = None if name in starts else position
+        definitions = {}
+        for name, start in starts.items():
+            if start is None or start + 1 == len(instructions) or instructions[start + 1].op is not OpCode.ENTER:
+                continue
+            end = next((position for position in range(start + 2, len(instructions))
+                        if instructions[position].op is OpCode.LEAVE), None)
+            if end is not None:
+                definitions[name] = (start, end)
+        return definitions
+    
+    def _call_counts(self, instructions):
+        """{nombre: llamadas} de cada función del usuario"""
+        calls = {}
+        for instr in instructions:
+            if instr.op in (OpCode.CALL, OpCode.FUNCTION_CALL) and instr.arg1 not in BUILTIN_FUNCTIONS:
+                calls[instr.arg1] = calls.get(instr.arg1, 0) + 1
+        return calls
+    
+    def _call_params(self, instructions, position, params):
+        """Posición del primer PARAM de la llamada de instructions[position] si
+        pasa un argumento por parámetro justo antes de ella, o None"""
+        call = instructions[position]
+        first = position - len(params)
+        if not isinstance(call.arg2, Const) or call.arg2.value != len(params) or first < 0:
             return None
-        try:
-            if isinstance(value, str) and value.startswith('"') and value.endswith('"'):
+        if any(instr.op is not OpCode.PARAM for instr in instructions[first:position]):
+            return None
+        return first
+    
+    def _recursive_sites(self, body, name, params):
+        """Llamadas de la función name a sí misma en posición de cola, como
+        (primer PARAM, return, operación, operando pendiente): tras la llamada
+        solo hay copias de su resultado, a lo sumo una suma o un producto con
+        otro operando y el return del valor. None si alguna llamada no es así"""
+        sites = []
+        for position, instr in enumerate(body):
+            if instr.op is OpCode.FUNCTION_CALL and instr.arg1 == name:
+                return None
+            if instr.op is not OpCode.CALL or instr.arg1 != name:
+                continue
+            first = self._call_params(body, position, params)
+            if first is None:
                 return None
-            return float(value) if '.' in str(value) else int(value)
-        except:
+            chain = [instr.result]  # Nombres que guardan el resultado (el último es el actual)
+            operation = operand = None
+            for last in range(position + 1, len(body)):
+                step = body[last]
+                if step.op is OpCode.RETURN and step.arg1 == chain[-1]:
+                    sites.append((first, last, operation, operand))
+                    break
+                if step.op is OpCode.ASSIGN and step.arg1 == chain[-1] and isinstance(step.result, Var):
+                    chain.append(step.result)
+                elif step.op in (OpCode.ADD, OpCode.MUL) and operation is None and \
+                        (step.arg1 == chain[-1]) != (step.arg2 == chain[-1]) and isinstance(step.result, Var):
+                    operand = step.arg2 if step.arg1 == chain[-1] else step.arg1
+                    if operand in chain:
+                        return None
+                    operation = step.op
+                    chain.append(step.result)
+                else:
+                    return None
+            else:
+                return None
+        return sites
+    
+    def _accumulates_integers(self, instructions, start, name, params, sites):
+        """Indica si los operandos pendientes y los valores de los casos base
+        son enteros, suponiendo enteros los parámetros de la función; la
+        suposición vale si cada llamada pasa argumentos enteros"""
+        if any(instr.op is OpCode.ENTER and instr is not instructions[start + 1] and set(instr.arg1) & set(params)
+               for instr in instructions):
+            return False  # Otra función con un parámetro del mismo nombre
+        keys = operand_keys(instructions)
+        var_types = infer_keyed_types(instructions, keys, {param: 'int' for param in params})
+    
+        def is_int(position, field):
+            return operand_type(keys[position][field], var_types) == 'int'
+    
+        for position, instr in enumerate(instructions):
+            if instr.op is OpCode.FUNCTION_CALL and instr.arg1 == name:
+                return False
+            if instr.op is OpCode.CALL and instr.arg1 == name:
+                first = self._call_params(instructions, position, params)
+                if first is None or not all(is_int(param, 0) for param in range(first, position)):
+                    return False
+        body_start = start + 2
+        in_site = set()
+        for first, last, operation, operand in sites:
+            in_site.update(range(body_start + first, body_start + last + 1))
+            if operation is not None:
+                step = next(position for position in range(body_start + first, body_start + last)
+                            if instructions[position].op is operation)
+                if not is_int(step, 0 if instructions[step].arg1 == operand else 1):
+                    return False
+        end = next(position for position in range(body_start, len(instructions))
+                   if instructions[position].op is OpCode.LEAVE)
+        return all(is_int(position, 0) for position in range(body_start, end)
+                   if instructions[position].op is OpCode.RETURN and position not in in_site)
+    
+    def _parallel_assign(self, params, args, temps):
+        """Asignaciones que dan a cada parámetro su argumento como si fueran
+        simultáneas: un argumento que es un parámetro ya reasignado se copia antes"""
+        moves = [(param, arg) for param, arg in zip(params, args) if param != arg]
+        copies = []
+        for index, (param, arg) in enumerate(moves):
+            if any(arg == target for target, _ in moves[:index]):
+                temp = next(temps)
+                copies.append(TACInstruction(OpCode.ASSIGN, arg, None, temp))
+                moves[index] = (param, temp)
+        return copies + [TACInstruction(OpCode.ASSIGN, arg, None, param) for param, arg in moves]
+    
+    def _blocks_inlining(self, instr):
+        """Indica si la instrucción impide integrar la función que la contiene"""
+        if instr.op in (OpCode.CALL, OpCode.FUNCTION_CALL):
+            return instr.arg1 not in BUILTIN_FUNCTIONS
+        if instr.op is OpCode.DEL:
+            return not instr.arg2
+        return instr.op is OpCode.ENTER or is_function_label(instr)
+    
+    def _inline_copy(self, call, args, params, body, names, temps, labels):
+        """Copia del cuerpo de una función que sustituye a la llamada call y a
+        sus PARAM (args), con los nombres que define la función renombrados"""
+        replace = {}
+        for instr in body:
+            if instr.op is OpCode.LABEL:
+                replace[instr.arg1] = next(labels)
+        for name in list(params) + [defined_var(instr) for instr in body]:
+            if name is None or name in replace:
+                continue
+            replace[name] = next(temps) if isinstance(name, Temp) else self._fresh_var(name, names)
+        
+        copy = [TACInstruction(OpCode.ASSIGN, arg.arg1, None, replace[param]) for param, arg in zip(params, args)]
+        end = None
+        for position, instr in enumerate(body):
+            if instr.op is not OpCode.RETURN:
+                copy.append(self._substitute(instr, replace))
+                continue
+            # return v asigna el resultado de la llamada; un return sin valor lo deja como estaba
+            if instr.arg1 is not None and call.result is not None:
+                value = replace.get(instr.arg1, instr.arg1) if isinstance(instr.arg1, Var) else instr.arg1
+                copy.append(TACInstruction(OpCode.ASSIGN, value, None, call.result))
+            if position < len(body) - 1:
+                if end is None:
+                    end = next(labels)
+                copy.append(TACInstruction(OpCode.GOTO, end))
+        if end is not None:
+            copy.append(TACInstruction(OpCode.LABEL, end))
+        return copy
+    
+    def _fresh_var(self, name, names):
+        """Variable name_N que no aparece en el programa (names se actualiza)"""
+        number = 1
+        while f"{name}_{number}" in names:
+            number += 1
+        fresh = Var(f"{name}_{number}")
+        names.add(fresh)
+        return fresh
+    
+    def _is_invariant(self, instr, counts, mutates):
+        """Indica si la instrucción calcula el mismo valor en cada vuelta del
+        bucle y moverla no puede hacer fallar el programa"""
+        if defined_var(instr) is None:
+            return False
+        if instr.op is OpCode.CALL:
+            if instr.arg1 != 'len' or mutates:
+                return False
+            operands = (instr.arg2,)
+        elif instr.op in PURE_OPS or instr.op is OpCode.ASSIGN:
+            operands = (instr.arg1, instr.arg2)
+        else:
+            return False
+        if any(counts.get(operand, 0) for operand in operands if operand is not None):
+            return False
+        return self._cannot_fail(instr)
+    
+    def _cannot_fail(self, instr):
+        """Indica si la instrucción no puede fallar con los tipos probados de sus operandos"""
+        op = instr.op
+        if op in (OpCode.ASSIGN, OpCode.EQ, OpCode.NEQ, OpCode.NOT):
+            return True
+        left, right, _ = instr.types or (None, None, None)
+        if op is OpCode.CALL:
+            return right in SIZED_TYPES
+        if op is OpCode.NEG:
+            return left in NUMERIC_TYPES
+        if op in DIVISIONS and self._numeric_value(instr.arg2) in (None, 0):
+            return False
+        return (left in NUMERIC_TYPES and right in NUMERIC_TYPES) or \
+            (left == right == 'str' and op in COMPARABLE_STR_OPS)
+    
+    def _local_uses(self, body, position, var, liveness, block_index):
+        """Posiciones de las lecturas de la definición body[position] si todas
+        están en el bloque, o None si el valor puede leerse fuera"""
+        uses = []
+        for offset, instr in enumerate(body[position + 1:], position + 1):
+            if var in used_vars(instr):
+                if defined_var(instr) == var:
+                    return None
+                uses.append(offset)
+            elif defined_var(instr) == var:
+                return uses
+        if self._has_bit(liveness, liveness.live_out[block_index], var):
             return None
+        return uses
+    
+    def _mark_live(self, liveness, var, preheader, blocks):
+        """Marca var viva desde el preencabezado y en todo el bucle, una
+        aproximación por exceso que mantiene válida la vivacidad para los
+        bucles externos. Devuelve el bit de var"""
+        bit = 1 << liveness.index(var)
+        liveness.live_out[preheader.index] |= bit
+        for index in blocks:
+            liveness.live_in[index] |= bit
+            liveness.live_out[index] |= bit
+        return bit
+    
+    def _has_bit(self, liveness, bits, var):
+        """Indica si var está en un conjunto de bits con los índices de BitLiveness"""
+        index = liveness.ids.get(var)
+        return index is not None and bits >> index & 1 == 1
+    
+    def _rename_use(self, instr, old, new):
+        """Copia de la instrucción que lee new en lugar de old"""
+        def rename(field):
+            if isinstance(field, tuple):
+                return type(field)(new if arg == old else arg for arg in field)
+            return new if field == old and isinstance(field, Var) else field
+        result = instr.result if defined_var(instr) is not None else rename(instr.result)
+        renamed = TACInstruction(instr.op, rename(instr.arg1), rename(instr.arg2), result)
+        renamed.types = instr.types
+        renamed.in_bounds = instr.in_bounds
+        return renamed
+    
+    def _next_temp_number(self, instructions):
+        """Número del primer temporal tN que no aparece en el programa"""
+        number = 0
+        for instr in instructions:
+            for field in (instr.arg1, instr.arg2, instr.result):
+                for operand in field if isinstance(field, tuple) else (field,):
+                    if isinstance(operand, Temp) and re.fullmatch(r't\d+', operand):
+                        number = max(number, int(operand[1:]) + 1)
+        return number
+    
+    def _live_after(self, var, body, start, live_out):
+        """Indica si var se lee desde body[start] antes de redefinirse"""
+        for instr in body[start:]:
+            if var in used_vars(instr):
+                return True
+            if defined_var(instr) == var:
+                return False
+        return var in live_out
+    
+    def _reads_any(self, body, names):
+        """Indica si alguna instrucción del bloque lee uno de los nombres"""
+        if not names:
+            return False
+        return any(arg in names for instr in body
+                   for arg in self._arguments(instr.arg1) + self._arguments(instr.arg2))
+    
+    def _numeric_value(self, operand):
+        """Valor de una constante numérica, o None si el operando no lo es"""
+        if isinstance(operand, Const) and operand.is_number:
+            return operand.value
+        return None
+    
+    def _is_int(self, operand, value):
+        """Indica si el operando es la constante entera value"""
+        return isinstance(operand, Const) and type(operand.value) is int and operand.value == value
+    
+    def _arguments(self, operand):
+        """Operandos que lee un campo: los de una lista de argumentos o el propio campo"""
+        if isinstance(operand, ArgList):
+            return operand
+        return (operand,) if operand else ()
     
     def _replace_with_constants(self, instr, constants):
         """Reemplaza variables con sus valores constantes conocidos"""
         new_arg1 = constants.get(instr.arg1, instr.arg1) if instr.arg1 else instr.arg1
-        new_arg2 = constants.get(instr.arg2, instr.arg2) if instr.arg2 else instr.arg2
+        if isinstance(instr.arg2, ArgList):
+            new_arg2 = ArgList(constants.get(arg, arg) for arg in instr.arg2)
+        else:
+            new_arg2 = constants.get(instr.arg2, instr.arg2) if instr.arg2 else instr.arg2
         
         if new_arg1 != instr.arg1 or new_arg2 != instr.arg2:
-            return TACInstruction(instr.op, new_arg1, new_arg2, instr.result)
+            new_instr = TACInstruction(instr.op, new_arg1, new_arg2, instr.result)
+            new_instr.in_bounds = instr.in_bounds
+            return new_instr
         
         return instr
     
-    def get_optimizations_report(self):
-        """Retorna un reporte de las optimizaciones aplicadas"""
-        if not self.optimizations_applied:
-            return "No se aplicaron optimizaciones."
+    def _propagate_constants(self, program):
+        """Punto fijo de la propagación condicional sobre un programa SSA
+        
+        Dos listas de trabajo: aristas que pasan a ser ejecutables y nombres
+        cuyo valor bajó en el retículo (sin valor, constante, VARYING). Al
+        bajar un valor solo se revisan las instrucciones que leen el nombre.
+        
+        Returns:
+            tuple: ({nombre SSA: Const o VARYING}, bloques ejecutables); los
+            nombres que no se definen en código ejecutable no tienen entrada
+        """
+        cfg = program.cfg
+        uses = {}  # {nombre: [(bloque, instrucción que lo lee)]}
+        for index in cfg.order:
+            for instr in cfg.blocks[index].instructions:
+                for name in used_vars(instr):
+                    uses.setdefault(name, []).append((index, instr))
+        values = {}
+        edges = set()
+        executable = set()
+        flow = [(None, entry) for entry in cfg.entries]
+        changed = []
+        
+        def value_of(operand):
+            return self._operand_value(operand, program, values)
+        
+        def visit(index, instr):
+            block = cfg.blocks[index]
+            if instr.op is OpCode.PHI:
+                incoming = [value_of(arg) for pred, arg in zip(instr.arg2, instr.arg1)
+                            if (pred, index) in edges]
+                value = self._meet(incoming)
+            elif defined_var(instr) is not None:
+                value = self._lattice_value(instr, value_of)
+            else:
+                value = None
+            if value is not None and values.get(instr.result) is not VARYING and \
+                    values.get(instr.result) != value:
+                values[instr.result] = VARYING if instr.result in values else value
+                changed.append(instr.result)
+            if instr is block.instructions[-1]:
+                flow.extend((index, succ) for succ in self._executable_succs(cfg, block, value_of))
+        
+        while flow or changed:
+            while flow:
+                edge = flow.pop()
+                if edge in edges:
+                    continue
+                edges.add(edge)
+                index = edge[1]
+                if index in executable:
+                    for phi in leading_phis(cfg.blocks[index]):
+                        visit(index, phi)
+                    continue
+                executable.add(index)
+                for instr in cfg.blocks[index].instructions:
+                    visit(index, instr)
+            while changed and not flow:
+                for index, instr in uses.get(changed.pop(), ()):
+                    if index in executable:
+                        visit(index, instr)
+        return values, executable
+    
+    def _meet(self, incoming):
+        """Valor de una phi: el de sus argumentos que llegan por aristas ejecutables"""
+        value = None
+        for arg in incoming:
+            if arg is VARYING or (value is not None and arg is not None and arg != value):
+                return VARYING
+            value = value if arg is None else arg
+        return value
+    
+    def _lattice_value(self, instr, value_of):
+        """Valor del retículo del nombre que define una instrucción SSA, o de
+        la comparación de un salto fundido"""
+        if instr.op not in FOLDABLE_OPS and instr.op not in COMPARE_JUMPS:
+            return VARYING
+        operands = [value_of(instr.arg1)]
+        if instr.op in FOLDING_FUNCTIONS:
+            operands.append(value_of(instr.arg2))
+        if any(operand is VARYING for operand in operands):
+            return VARYING
+        if any(operand is None for operand in operands):
+            return None
+        return self._fold(instr.op, operands)
+    
+    def _fold(self, op, operands):
+        """Constante que calcula una operación con operandos constantes, o
+        VARYING si no se calcula al compilar: división por cero, operandos no
+        numéricos (las cadenas no se propagan y un bool solo se niega) o un
+        resultado no finito"""
+        if op is OpCode.ASSIGN:
+            return operands[0] if operands[0].is_number or type(operands[0].value) is bool else VARYING
+        if op is OpCode.NOT:
+            return Const(not operands[0].value)
+        if not all(operand.is_number for operand in operands):
+            return VARYING
+        values = [operand.value for operand in operands]
+        if op in DIVISIONS and values[1] == 0:
+            return VARYING
+        try:
+            result = -values[0] if op is OpCode.NEG else FOLDING_FUNCTIONS[op](*values)
+        except ArithmeticError:
+            return VARYING
+        if isinstance(result, float) and not math.isfinite(result):
+            return VARYING
+        return Const(result)
+    
+    def _branch_value(self, instr, value_of):
+        """Const(True) si el salto condicional salta, Const(False) si sigue al
+        bloque siguiente, VARYING si depende de la ejecución o None si su
+        condición aún no tiene valor"""
+        if instr.op in COMPARE_JUMPS:
+            return self._lattice_value(instr, value_of)
+        if instr.op not in (OpCode.IF_FALSE, OpCode.IF_TRUE):
+            return VARYING
+        condition = value_of(instr.arg1)
+        if condition is None or condition is VARYING:
+            return condition
+        return Const(bool(condition.value) == (instr.op is OpCode.IF_TRUE))
+    
+    def _executable_succs(self, cfg, block, value_of):
+        """Sucesores a los que pasa el control desde el final de un bloque
+        ejecutable según el valor de su salto"""
+        last = block.instructions[-1]
+        if last.op not in CONDITIONAL_JUMPS:
+            return block.succs
+        taken = self._branch_value(last, value_of)
+        if taken is None:
+            return []
+        if taken is VARYING:
+            return block.succs
+        target = cfg.target(jump_target(last))
+        if taken.value:
+            return [target]
+        return [succ for succ in block.succs if succ != target] or [target]
+    
+    def _merge_points(self, program, names):
+        """{bloque: variables de names a las que llegan en él definiciones
+        distintas}: la frontera de dominancia iterada de sus definiciones"""
+        if not names:
+            return {}
+        cfg = program.cfg
+        frontiers = cfg.dominance_frontiers()
+        def_sites = {}
+        for index in cfg.order:
+            for instr in cfg.blocks[index].instructions:
+                target = defined_var(instr)
+                if target is not None and program.base(target) in names:
+                    def_sites.setdefault(program.base(target), set()).add(index)
+        merges = {}
+        for var, sites in def_sites.items():
+            reached = set()
+            worklist = list(sites)
+            while worklist:
+                for frontier in frontiers.get(worklist.pop(), ()):
+                    if frontier not in reached:
+                        reached.add(frontier)
+                        merges.setdefault(frontier, []).append(var)
+                        worklist.append(frontier)
+        return merges
+    
+    def _rewrite_constants(self, body, ssa_body, program, values, copies, stacks):
+        """Reescribe las instrucciones originales de un bloque ejecutable con
+        los valores de la propagación condicional.
         
-        report = "OPTIMIZACIONES APLICADAS:\n"
-        report += "=" * 100 + "\n\n"
+        ssa_body son las mismas instrucciones en forma SSA, sin las phi;
+        stacks tiene las versiones vigentes tras las phi del bloque y recibe
+        las que define el bloque. Una copia solo reemplaza a un nombre si la
+        versión que copia sigue siendo la vigente de su variable.
+        """
+        kinds = []  # Clase de cada reemplazo de la instrucción actual
         
-        optimizations_by_type = {}
-        for opt in self.optimizations_applied:
-            opt_type = opt.split(':')[0]
-            if opt_type not in optimizations_by_type:
-                optimizations_by_type[opt_type] = []
-            optimizations_by_type[opt_type].append(opt)
+        def value_of(operand):
+            return self._operand_value(operand, program, values)
         
-        for opt_type, opts in optimizations_by_type.items():
-            report += f"{opt_type}:\n"
-            for opt in opts:
-                report += f"  - {opt}\n"
-            report += "\n"
+        def current(name):
+            base = program.base(name)
+            return stacks[base][-1] if stacks.get(base) else base
         
-        report += f"Total de optimizaciones: {len(self.optimizations_applied)}\n"
+        def substitute(operand, ssa_operand, value_field):
+            if isinstance(operand, ArgList):
+                return ArgList(substitute(arg, ssa_arg, value_field) for arg, ssa_arg in zip(operand, ssa_operand))
+            if not isinstance(operand, Var):
+                return operand
+            value = values.get(ssa_operand)
+            if isinstance(value, Const) and value_field:
+                kinds.append("Propagación condicional de constantes")
+                return value
+            # Solo se copian variables del programa: alargar la vida de un
+            # temporal lo sacaría de los registros que le da el generador
+            source, found = copies.get(ssa_operand), None
+            while source is not None:
+                if current(source) == source and not isinstance(program.base(source), Temp):
+                    found = program.base(source)
+                source = copies.get(source)
+            if found is None or found == operand:
+                return operand
+            kinds.append("Propagación de copias")
+            return found
+        
+        rewritten = []
+        for instr, ssa_instr in zip(body, ssa_body):
+            kinds.clear()
+            new_instr = instr
+            value = values.get(ssa_instr.result) if defined_var(ssa_instr) is not None else None
+            if isinstance(value, Const) and (instr.op in FOLDABLE_OPS or instr.op in INPLACE_OPS) and \
+                    (instr.op is not OpCode.ASSIGN or instr.arg1 != value):
+                new_instr = TACInstruction(OpCode.ASSIGN, value, None, instr.result)
+                kinds.append("Propagación condicional de constantes")
+            elif instr.op in CONDITIONAL_JUMPS and instr.op not in LOOP_NEXT_OPS and \
+                    isinstance(self._branch_value(ssa_instr, value_of), Const):
+                # Salto con condición constante: pasa a goto o desaparece
+                taken = self._branch_value(ssa_instr, value_of).value
+                new_instr = TACInstruction(OpCode.GOTO, jump_target(instr)) if taken else None
+                kinds.append("Propagación condicional de constantes")
+            elif instr.op is not OpCode.ENTER:
+                # x += v lee v en arg1, que en la forma SSA (x.2 = x.1 + v) es arg2
+                ssa_arg1 = ssa_instr.arg2 if instr.op in INPLACE_OPS else ssa_instr.arg1
+                arg1 = substitute(instr.arg1, ssa_arg1, instr.op not in CONTAINER_OPS)
+                arg2 = instr.arg2 if instr.op in INPLACE_OPS else substitute(instr.arg2, ssa_instr.arg2, True)
+                if kinds:
+                    new_instr = TACInstruction(instr.op, arg1, arg2, instr.result)
+                    new_instr.in_bounds = instr.in_bounds
+            if kinds:
+                self._record(kinds[0], "{before} -> {after}" if new_instr is not None else "{before} -> salto eliminado",
+                             before=instr, after=new_instr, index=len(rewritten))
+            if new_instr is not None:
+                rewritten.append(new_instr)
+            target = defined_var(ssa_instr)
+            if target is not None:
+                stacks.setdefault(program.base(target), []).append(target)
+        return rewritten
+    
+    def _operand_value(self, operand, program, values):
+        """Valor del retículo de un operando SSA: la versión 0 de una variable
+        llega de fuera (un parámetro o una variable del llamador) y varía"""
+        if isinstance(operand, Const):
+            return operand
+        return values.get(operand) if operand in program.origin else VARYING
+    
+    def get_pass_report(self):
+        """Retorna un reporte por pasada: ejecuciones, cambios, variación de
+        instrucciones y tiempo"""
+        report = f"Nivel de optimización: -O{self.level}, rondas: {self.rounds}\n"
+        for stats in self.pass_stats.values():
+            report += f"{stats}\n"
         return report
+    
+    def get_optimizations_report(self):
+        """Retorna un reporte de las optimizaciones aplicadas
+        
+        Con record_events cada tipo lista sus reescrituras; sin eventos el
+        reporte muestra los contadores por tipo.
+        """
+        if not self.change_count:
+            return "No se aplicaron optimizaciones."
+        
+        lines = ["OPTIMIZACIONES APLICADAS:", "=" * 100, ""]
+        if self.record_events:
+            events_by_kind = {kind: [] for kind in self.counts}
+            for event in self.events:
+                events_by_kind[event.kind].append(event)
+            for kind, events in events_by_kind.items():
+                lines.append(f"{kind}:")
+                lines.extend(f"  - {event}" for event in events)
+                lines.append("")
+        else:
+            lines.extend(f"{kind}: {count}" for kind, count in self.counts.items())
+            lines.append("")
+        
+        redundant = sum(self.counts.get(kind, 0) for kind in VALUE_NUMBERING)
+        if redundant:
+            lines.append(f"Instrucciones redundantes eliminadas: {redundant}")
+        lines.append(f"Total de optimizaciones: {self.change_count}")
+        return "\n".join(lines) + "\n"
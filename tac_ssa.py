@@ -0,0 +1,450 @@
+"""
+Forma SSA del Código TAC
+Construye la forma SSA (phi en las fronteras de dominancia y renombrado),
+la verifica y la deshace con copias en los predecesores
+"""
+
+import re
+
+from tac_generator import (
+    TACInstruction, OpCode, Var, Temp, Label, ArgList, INPLACE_OPS, INPLACE_FORMS, jump_target, retarget
+)
+from tac_cfg import build_cfg, defined_var, used_vars, leading_phis, TERMINATORS
+
+
+# Separa el nombre original de su versión: 'i.2' es la versión 2 de i.
+# Un identificador del lenguaje nunca contiene un punto
+SSA_SEPARATOR = '.'
+
+
+class SSAProgram:
+    """Programa TAC en forma SSA.
+
+    Cada variable definida en código alcanzable tiene una sola definición;
+    sus versiones se llaman nombre.n y la versión 0 es el propio nombre, que
+    representa el valor que llega de fuera de la región (un parámetro o una
+    variable del programa principal leída desde una función). Las phi están al
+    comienzo de cada bloque y su argumento k llega por el predecesor arg2[k].
+    """
+
+    def __init__(self, cfg, origin):
+        self.cfg = cfg
+        self.origin = origin  # {versión: nombre original}
+
+    @property
+    def blocks(self):
+        return self.cfg.blocks
+
+    def base(self, name):
+        """Nombre original de una versión"""
+        return self.origin.get(name, name)
+
+    def instructions(self):
+        """Lista lineal de instrucciones SSA, phi incluidas"""
+        return self.cfg.to_instructions()
+
+    def verify(self):
+        """Comprueba las propiedades de la forma SSA.
+
+        Returns:
+            list: mensajes de error (vacía si el programa es SSA válido)
+        """
+        cfg = self.cfg
+        errors = []
+        definitions = {}  # {versión: (bloque, posición)}
+
+        for index in cfg.order:
+            block = cfg.blocks[index]
+            in_body = False
+            for position, instr in enumerate(block.instructions):
+                if instr.op is OpCode.PHI:
+                    if in_body:
+                        errors.append(f"Bloque {index}: phi de {instr.result} después de otras instrucciones")
+                    if tuple(instr.arg2) != tuple(block.preds) or len(instr.arg1) != len(block.preds):
+                        errors.append(f"Bloque {index}: los argumentos de la phi de {instr.result} "
+                                      f"no corresponden a sus predecesores")
+                elif instr.op is not OpCode.LABEL:
+                    in_body = True
+                target = defined_var(instr)
+                if target is None:
+                    continue
+                if target not in self.origin:
+                    errors.append(f"Bloque {index}: {target} se define sin versión")
+                elif target in definitions:
+                    errors.append(f"Bloque {index}: {target} se define más de una vez")
+                definitions[target] = (index, position)
+
+        def check_use(name, index, position):
+            if name not in definitions:
+                if name in self.origin:
+                    errors.append(f"Bloque {index}: {name} se usa pero no se define")
+                return
+            def_block, def_position = definitions[name]
+            if def_block == index:
+                dominated = def_position < position
+            else:
+                dominated = cfg.dominates(def_block, index)
+            if not dominated:
+                errors.append(f"Bloque {index}: la definición de {name} no domina su uso")
+
+        for index in cfg.order:
+            block = cfg.blocks[index]
+            for position, instr in enumerate(block.instructions):
+                if instr.op is OpCode.PHI:
+                    # Cada argumento se lee al final de su predecesor
+                    for pred, arg in zip(instr.arg2, instr.arg1):
+                        if isinstance(arg, Var):
+                            check_use(arg, pred, len(cfg.blocks[pred].instructions))
+                else:
+                    for name in used_vars(instr):
+                        check_use(name, index, position)
+        return errors
+
+
+class SSABuilder:
+    """Construye la forma SSA podada.
+
+    Una variable recibe una phi en la frontera de dominancia iterada de sus
+    definiciones solo si está viva a la entrada del bloque, así los
+    temporales locales a un bloque no generan phi. El renombrado recorre el
+    árbol de dominadores con una pila de versiones por variable.
+    """
+
+    def __init__(self):
+        self.origin = {}
+        self.versions = {}  # {nombre: última versión creada}
+        self.phi_args = {}  # {phi: argumentos pendientes por predecesor}
+        self.phi_vars = {}  # {phi: variable original}
+
+    def build(self, instructions):
+        cfg = build_cfg(instructions)
+        # Los bloques se copian: el programa original no se modifica
+        for block in cfg.blocks:
+            block.instructions = list(block.instructions)
+        self.insert_phis(cfg)
+        self.rename(cfg)
+        for phi, args in self.phi_args.items():
+            phi.arg1 = ArgList(args)
+        return SSAProgram(cfg, self.origin)
+
+    def insert_phis(self, cfg):
+        live_in, _ = cfg.liveness()
+        frontiers = cfg.dominance_frontiers()
+        def_sites = {}  # {variable: bloques que la definen}
+        for index in cfg.order:
+            for instr in cfg.blocks[index].instructions:
+                target = defined_var(instr)
+                if target is not None:
+                    def_sites.setdefault(target, set()).add(index)
+
+        for var, sites in def_sites.items():
+            with_phi = set()
+            worklist = list(sites)
+            while worklist:
+                for frontier in frontiers.get(worklist.pop(), ()):
+                    if frontier in with_phi or var not in live_in[frontier]:
+                        continue
+                    self.add_phi(cfg.blocks[frontier], var)
+                    with_phi.add(frontier)
+                    if frontier not in sites:
+                        worklist.append(frontier)
+
+    def add_phi(self, block, var):
+        phi = TACInstruction(OpCode.PHI, None, tuple(block.preds), var)
+        self.phi_args[phi] = [var] * len(block.preds)
+        self.phi_vars[phi] = var
+        position = 0
+        while position < len(block.instructions) and \
+                block.instructions[position].op in (OpCode.LABEL, OpCode.PHI):
+            position += 1
+        block.instructions.insert(position, phi)
+
+    def new_version(self, var):
+        version = self.versions.get(var, 0) + 1
+        self.versions[var] = version
+        name = type(var)(f"{var}{SSA_SEPARATOR}{version}")
+        self.origin[name] = var
+        return name
+
+    def rename(self, cfg):
+        children = {index: [] for index in cfg.order}
+        for index, dominator in cfg.idom.items():
+            if dominator is not None:
+                children[dominator].append(index)
+
+        stacks = {}   # {variable: versiones visibles, la última en la cima}
+        pushed = {}   # {bloque: variables cuya versión apiló el bloque}
+        roots = [index for index in cfg.order if cfg.idom[index] is None]
+        for root in roots:
+            # Recorrido en profundidad iterativo: (bloque, ya visitado)
+            work = [(root, False)]
+            while work:
+                index, done = work.pop()
+                if done:
+                    for var in pushed.pop(index):
+                        stacks[var].pop()
+                    continue
+                pushed[index] = self.rename_block(cfg, cfg.blocks[index], stacks)
+                work.append((index, True))
+                work.extend((child, False) for child in reversed(children[index]))
+
+    def rename_block(self, cfg, block, stacks):
+        def current(operand):
+            if isinstance(operand, Var):
+                stack = stacks.get(operand)
+                return stack[-1] if stack else operand
+            return operand
+
+        def define(var):
+            name = self.new_version(var)
+            stacks.setdefault(var, []).append(name)
+            pushed.append(var)
+            return name
+
+        pushed = []
+        renamed = []
+        for instr in block.instructions:
+            if instr.op is OpCode.PHI:
+                instr.result = define(instr.result)
+                renamed.append(instr)
+                continue
+            if instr.op is OpCode.LABEL:
+                renamed.append(instr)
+                continue
+            if instr.op in INPLACE_OPS:
+                # La forma SSA no actualiza en el lugar: x += v pasa a x.2 = x.1 + v
+                value, target = current(instr.arg1), current(instr.result)
+                renamed.append(TACInstruction(INPLACE_OPS[instr.op], target, value, define(instr.result)))
+                continue
+            arg1, arg2 = instr.arg1, instr.arg2
+            arg1 = ArgList(map(current, arg1)) if isinstance(arg1, ArgList) else current(arg1)
+            arg2 = ArgList(map(current, arg2)) if isinstance(arg2, ArgList) else current(arg2)
+            result = instr.result
+            if defined_var(instr) is not None:
+                result = define(result)
+            else:
+                result = current(result)
+            new_instr = TACInstruction(instr.op, arg1, arg2, result)
+            new_instr.in_bounds = instr.in_bounds
+            renamed.append(new_instr)
+        block.instructions = renamed
+
+        for succ in block.succs:
+            position = cfg.blocks[succ].preds.index(block.index)
+            for phi in leading_phis(cfg.blocks[succ]):
+                self.phi_args[phi][position] = current(self.phi_vars[phi])
+        return pushed
+
+
+class SSADestructor:
+    """Sale de la forma SSA.
+
+    Las versiones de una variable que nunca están vivas a la vez vuelven a su
+    nombre original, con lo que sus phi desaparecen; tras construir la forma
+    SSA sin optimizar esto deja el programa original. Solo las phi que
+    quedan (porque una optimización solapó versiones) se convierten en copias
+    paralelas al final de cada predecesor, partiendo las aristas críticas.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.cfg = program.cfg
+        self.temp_counter = 0
+        self.label_counter = 0
+
+    def destruct(self):
+        self.reserve_names()
+        names = self.coalesce()
+        blocks = []
+        for block in self.cfg.blocks:
+            renamed = (self.rename(instr, names) for instr in block.instructions)
+            blocks.append([instr for instr in renamed if instr is not None])
+
+        tails = {}        # {predecesor: copias antes de su salto}
+        fall_splits = {}  # {bloque: copias en la arista de caída desde el anterior}
+        jump_splits = {}  # {región: bloques nuevos al final de la región}
+        for block, instructions in zip(self.cfg.blocks, blocks):
+            phis = [instr for instr in instructions if instr.op is OpCode.PHI]
+            if not phis:
+                continue
+            instructions[:] = [instr for instr in instructions if instr.op is not OpCode.PHI]
+            for position, pred in enumerate(block.preds):
+                copies = self.sequentialize([(phi.result, phi.arg1[position]) for phi in phis])
+                if copies:
+                    self.place_copies(pred, block, copies, blocks, tails, fall_splits, jump_splits)
+
+        return self.layout(blocks, tails, fall_splits, jump_splits)
+
+    def reserve_names(self):
+        """Los temporales y etiquetas nuevos continúan la numeración existente"""
+        for instr in self.cfg.to_instructions():
+            for operand in (instr.arg1, instr.arg2, instr.result):
+                operand = self.program.base(operand)
+                if isinstance(operand, Temp) and re.fullmatch(r't\d+', operand):
+                    self.temp_counter = max(self.temp_counter, int(operand[1:]) + 1)
+                elif isinstance(operand, Label) and re.fullmatch(r'L\d+', operand):
+                    self.label_counter = max(self.label_counter, int(operand[1:]) + 1)
+
+    def new_temp(self):
+        temp = Temp(f"t{self.temp_counter}")
+        self.temp_counter += 1
+        return temp
+
+    def new_label(self):
+        label = Label(f"L{self.label_counter}")
+        self.label_counter += 1
+        return label
+
+    def coalesce(self):
+        """{versión: nombre final}; las variables con versiones que interfieren
+        conservan los nombres versionados, salvo los temporales, que reparten
+        sus versiones entre el nombre original y temporales nuevos"""
+        program = self.program
+        _, live_out = self.cfg.liveness()
+        conflicts = {}  # {versión: versiones de la misma variable vivas en su definición}
+
+        def check(name, live, copied=None):
+            base = program.base(name)
+            for other in live:
+                if other != name and other != copied and program.base(other) == base:
+                    conflicts.setdefault(name, set()).add(other)
+                    conflicts.setdefault(other, set()).add(name)
+
+        for index in self.cfg.order:
+            live = set(live_out[index])
+            body = self.cfg.blocks[index].instructions
+            phis = leading_phis(self.cfg.blocks[index])
+            for instr in reversed(body[len(phis) + (1 if body and body[0].op is OpCode.LABEL else 0):]):
+                target = defined_var(instr)
+                if target is not None:
+                    # Una copia no interfiere con su origen: ambos tienen el mismo valor
+                    check(target, live, instr.arg1 if instr.op is OpCode.ASSIGN else None)
+                    live.discard(target)
+                live.update(used_vars(instr))
+            for phi in phis:
+                live.discard(phi.result)
+            for phi in phis:
+                check(phi.result, live | {other.result for other in phis})
+
+        interfering = {program.base(name) for name in conflicts}
+        names = {}
+        choices = {}  # {temporal: nombres que pueden recibir sus versiones}
+        for name, base in program.origin.items():
+            if base not in interfering:
+                names[name] = base
+            elif isinstance(base, Temp):
+                # Cada versión toma el primer nombre que no use otra versión viva a la vez
+                taken = {names.get(other, other) for other in conflicts.get(name, ())
+                         if other in names or other not in program.origin}
+                options = choices.setdefault(base, [base])
+                final = next((option for option in options if option not in taken), None)
+                if final is None:
+                    final = self.new_temp()
+                    options.append(final)
+                names[name] = final
+        return names
+
+    def rename(self, instr, names):
+        def final(operand):
+            if isinstance(operand, ArgList):
+                return ArgList(names.get(arg, arg) for arg in operand)
+            return names.get(operand, operand) if isinstance(operand, Var) else operand
+
+        arg1, arg2, result = final(instr.arg1), final(instr.arg2), final(instr.result)
+        if (arg1, arg2, result) == (instr.arg1, instr.arg2, instr.result) and instr.op is not OpCode.PHI:
+            return instr
+        if instr.op is OpCode.PHI and all(arg == result for arg in arg1):
+            return None
+        if instr.op in INPLACE_FORMS and arg1 == result and isinstance(result, Var):
+            # x = x + v vuelve a la actualización en el lugar
+            return TACInstruction(INPLACE_FORMS[instr.op], arg2, None, result)
+        renamed = TACInstruction(instr.op, arg1, arg2, result)
+        renamed.in_bounds = instr.in_bounds
+        return renamed
+
+    def sequentialize(self, copies):
+        """Ordena copias paralelas; un ciclo (a <- b, b <- a) pasa por un temporal"""
+        pending = [(target, source) for target, source in copies if target != source]
+        ordered = []
+        while pending:
+            sources = {source for _, source in pending}
+            ready = [copy for copy in pending if copy[0] not in sources]
+            if ready:
+                ordered.extend(ready)
+                pending = [copy for copy in pending if copy not in ready]
+                continue
+            target, source = pending[0]
+            temp = self.new_temp()
+            ordered.append((temp, source))
+            pending = [(t, temp if s == source else s) for t, s in pending]
+        return [TACInstruction(OpCode.ASSIGN, source, None, target) for target, source in ordered]
+
+    def place_copies(self, pred, block, copies, blocks, tails, fall_splits, jump_splits):
+        pred_instrs = blocks[pred]
+        last = pred_instrs[-1] if pred_instrs else None
+        if last is None or last.op not in TERMINATORS or last.op is OpCode.GOTO:
+            # Un único sucesor: las copias van al final del predecesor
+            tails.setdefault(pred, []).extend(copies)
+            return
+        # Salto condicional: la arista es crítica y se parte con un bloque nuevo
+        if pred + 1 == block.index and jump_target(last) != block.label:
+            fall_splits.setdefault(block.index, []).extend(copies)
+            return
+        label = self.new_label()
+        pred_instrs[-1] = retarget(last, label)
+        split = [TACInstruction(OpCode.LABEL, label)] + copies + [TACInstruction(OpCode.GOTO, block.label)]
+        jump_splits.setdefault(self.cfg.regions[pred], []).append(split)
+        if pred + 1 == block.index:
+            # Ambas aristas llegan al bloque: la de caída también necesita las copias
+            fall_splits.setdefault(block.index, []).extend(
+                TACInstruction(OpCode.ASSIGN, copy.arg1, None, copy.result) for copy in copies
+            )
+
+    def layout(self, blocks, tails, fall_splits, jump_splits):
+        region_ends = {}
+        for index, region in enumerate(self.cfg.regions):
+            region_ends[region] = index
+
+        instructions = []
+        for index, block_instrs in enumerate(blocks):
+            region = self.cfg.regions[index]
+            if region_ends.get(region) == index and region in jump_splits and \
+                    block_instrs and block_instrs[-1].op is OpCode.LEAVE:
+                # LEAVE cierra la función: los bloques nuevos van delante de su bloque
+                self.insert_splits(instructions, jump_splits.pop(region))
+            instructions.extend(fall_splits.get(index, ()))
+            copies = tails.get(index)
+            if copies:
+                last = block_instrs[-1] if block_instrs else None
+                if last is not None and last.op is OpCode.GOTO:
+                    block_instrs = block_instrs[:-1] + copies + [last]
+                else:
+                    block_instrs = block_instrs + copies
+            instructions.extend(block_instrs)
+
+            if region_ends.get(region) == index and region in jump_splits:
+                self.insert_splits(instructions, jump_splits[region])
+        return instructions
+
+    def insert_splits(self, instructions, splits):
+        """Agrega los bloques de aristas partidas al final de instructions"""
+        last = instructions[-1] if instructions else None
+        exit_label = None
+        if last is None or last.op not in (OpCode.GOTO, OpCode.RETURN):
+            # El código cae al final: salta por encima de los bloques nuevos
+            exit_label = self.new_label()
+            instructions.append(TACInstruction(OpCode.GOTO, exit_label))
+        for split in splits:
+            instructions.extend(split)
+        if exit_label is not None:
+            instructions.append(TACInstruction(OpCode.LABEL, exit_label))
+
+
+def to_ssa(instructions):
+    """Construye la forma SSA de una lista de instrucciones TAC"""
+    return SSABuilder().build(instructions)
+
+
+def from_ssa(program):
+    """Lista de instrucciones TAC sin phi equivalente a un programa SSA"""
+    return SSADestructor(program).destruct()
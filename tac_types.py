@@ -0,0 +1,253 @@
+"""
+Tipos Estáticos del Código TAC
+Lleva los tipos que infiere el analizador semántico a cada operando y temporal del TAC
+"""
+
+from semantic_analyzer import SemanticAnalyzer
+from tac_generator import OpCode, Const, Temp, OP_SYMBOLS, ARITHMETIC_OPS, INPLACE_OPS, BUILTIN_FUNCTIONS
+
+
+# Operaciones cuyo campo result es una variable definida por la instrucción
+# (en LIST_SET y DICT_SET el campo result es el valor almacenado)
+DEFINING_OPS = frozenset(OP_SYMBOLS) | {
+    OpCode.ASSIGN, OpCode.NEG, OpCode.NOT, OpCode.LIST_CREATE, OpCode.DICT_CREATE, OpCode.LIST_GET, OpCode.CALL,
+    OpCode.PHI, OpCode.FOR_RANGE_INIT, OpCode.FOR_RANGE_NEXT, OpCode.ITER_INIT, OpCode.ITER_NEXT
+} | frozenset(INPLACE_OPS)
+
+NUMERIC_TYPES = ('int', 'float')
+
+# Separa el nombre de un temporal reciclado del número de su definición
+VERSION_SEPARATOR = '@'
+
+# Tipo del lenguaje de cada valor constante
+CONST_TYPES = {int: 'int', float: 'float', str: 'str', bool: 'bool'}
+
+
+def literal_type(operand):
+    """Tipo de un operando constante, o None si el operando es una variable"""
+    if isinstance(operand, Const):
+        return CONST_TYPES.get(type(operand.value))
+    return None
+
+
+def operand_type(operand, var_types):
+    """Tipo probado de un operando; 'unknown' si no se puede garantizar"""
+    if operand is None or not isinstance(operand, str):
+        return None
+    return literal_type(operand) or var_types.get(operand, 'unknown')
+
+
+def defined_type(operand, var_types):
+    """Tipo de un operando durante la inferencia; None si aún no tiene definición tipada"""
+    return literal_type(operand) or var_types.get(operand)
+
+
+def join_types(old, new):
+    """Une dos tipos: solo se conserva si todas las definiciones coinciden"""
+    if old is None:
+        return new
+    return old if old == new else 'unknown'
+
+
+def result_type(op, arg1, arg2, var_types):
+    """Tipo del valor que define una operación, o None si aún depende de
+    operandos sin tipo conocido"""
+    if op in OP_SYMBOLS:
+        left = defined_type(arg1, var_types)
+        right = defined_type(arg2, var_types)
+        if left is None or right is None:
+            return None
+        # Las reglas del analizador aceptan operandos de tipo desconocido (p. ej.
+        # 'unknown' + float); aquí solo se aplican cuando ambos tipos están probados
+        proven = (left in NUMERIC_TYPES and right in NUMERIC_TYPES) or \
+            (op is OpCode.ADD and left == right == 'str') or op not in ARITHMETIC_OPS
+        if not proven:
+            return 'unknown'
+        return SemanticAnalyzer.binary_result_type(OP_SYMBOLS[op], left, right)
+    if op is OpCode.ASSIGN:
+        return defined_type(arg1, var_types)
+    if op is OpCode.NEG:
+        value = defined_type(arg1, var_types)
+        if value is None:
+            return None
+        return value if value in NUMERIC_TYPES else 'unknown'
+    if op is OpCode.NOT:
+        return 'bool'
+    if op is OpCode.PHI:
+        # Como una asignación desde cada predecesor
+        joined = None
+        for arg in arg1:
+            arg_type = defined_type(arg, var_types)
+            if arg_type is None:
+                return None
+            joined = join_types(joined, arg_type)
+        return joined
+    if op is OpCode.LIST_CREATE:
+        return 'list'
+    if op is OpCode.DICT_CREATE:
+        return 'dict'
+    if op is OpCode.CALL and arg1 in BUILTIN_FUNCTIONS:
+        return SemanticAnalyzer.call_result_type(arg1)
+    if op is OpCode.FOR_RANGE_INIT:
+        return 'range'
+    if op is OpCode.FOR_RANGE_NEXT:
+        # range() rechaza los argumentos no enteros al crear el iterador
+        return 'int'
+    # LIST_GET, los elementos de un iterable y las llamadas a funciones de usuario
+    # pueden devolver cualquier valor
+    return 'unknown'
+
+
+def operand_keys(instructions):
+    """Nombre bajo el que se tipa cada operando (arg1, arg2, result) de cada instrucción.
+
+    El generador reutiliza los temporales de las expresiones, así un mismo
+    nombre recibe valores de tipos distintos. Si todas las lecturas de un
+    temporal están en línea recta tras una definición (sin una etiqueta en
+    medio), esa definición es la única que las alcanza y cada una se tipa por
+    separado como t0@1, t0@2... Los temporales que se leen tras una etiqueta
+    conservan su nombre.
+    """
+    defined_at = {}
+    definitions = {}
+    shared = set()
+    last_label = -1
+    for i, instr in enumerate(instructions):
+        op = instr.op
+        if op is OpCode.LABEL:
+            last_label = i
+            continue
+        defines = op in DEFINING_OPS
+        for operand in (instr.arg1, instr.arg2) if defines else (instr.arg1, instr.arg2, instr.result):
+            if isinstance(operand, Temp):
+                if defined_at.get(operand, -1) < last_label:
+                    shared.add(operand)
+            elif isinstance(operand, tuple):
+                # Los argumentos de una phi se leen en los predecesores
+                shared.update(arg for arg in operand if isinstance(arg, Temp))
+        if op in INPLACE_OPS and isinstance(instr.result, Temp):
+            # Se lee y se redefine en la misma instrucción: no se versiona
+            shared.add(instr.result)
+        if defines and isinstance(instr.result, Temp):
+            defined_at[instr.result] = i
+            definitions[instr.result] = definitions.get(instr.result, 0) + 1
+
+    versioned = {temp for temp, count in definitions.items() if count > 1 and temp not in shared}
+    if not versioned:
+        return [(instr.arg1, instr.arg2, instr.result) for instr in instructions]
+
+    current = {}
+    versions = {}
+    keys = []
+    for instr in instructions:
+        arg1, arg2, result = instr.arg1, instr.arg2, instr.result
+        if isinstance(arg1, Temp):
+            arg1 = current.get(arg1, arg1)
+        if isinstance(arg2, Temp):
+            arg2 = current.get(arg2, arg2)
+        if result in versioned and instr.op in DEFINING_OPS:
+            version = versions[result] = versions.get(result, 0) + 1
+            current[result] = Temp(f"{result}{VERSION_SEPARATOR}{version}")
+            result = current[result]
+        elif isinstance(result, Temp):
+            result = current.get(result, result)
+        keys.append((arg1, arg2, result))
+    return keys
+
+
+def merge_versions(var_types):
+    """Tipos por nombre: las versiones de un temporal se unen"""
+    merged = {}
+    for name, name_type in var_types.items():
+        if isinstance(name, Temp):
+            name = name.split(VERSION_SEPARATOR, 1)[0]
+        merged[name] = join_types(merged.get(name), name_type)
+    return merged
+
+
+def infer_tac_types(instructions):
+    """Infiere el tipo de cada variable y temporal del TAC.
+
+    El análisis es insensible al flujo: un nombre tiene tipo probado solo si todas
+    sus definiciones producen el mismo tipo, así el tipo vale en cualquier punto
+    del programa aunque el nombre se reasigne dentro de un bucle. Los parámetros
+    de función y los nombres que nunca se definen quedan como 'unknown'. Un
+    temporal reciclado une los tipos de sus definiciones.
+
+    Returns:
+        dict: {nombre: tipo}
+    """
+    return merge_versions(infer_keyed_types(instructions, operand_keys(instructions)))
+
+
+def infer_keyed_types(instructions, keys, param_types=None):
+    """Tipos de los nombres de operand_keys
+
+    param_types ({parámetro: tipo}) supone un tipo para algunos parámetros en
+    lugar de 'unknown'; quien lo usa debe comprobar después que cada llamada
+    pasa argumentos de ese tipo.
+    """
+    var_types = {}
+    params = set()
+    users = {}  # {nombre: [índices de instrucciones que lo leen]}
+    worklist = []
+
+    for i, instr in enumerate(instructions):
+        op = instr.op
+        if op is OpCode.ENTER:
+            params.update(instr.arg1)
+        if op in DEFINING_OPS and instr.result is not None:
+            worklist.append(i)
+            arg1, arg2, result = keys[i]
+            if op is OpCode.PHI:
+                reads = arg1
+            elif op in INPLACE_OPS:
+                reads = (arg1, result)
+            else:
+                reads = (arg1, arg2)
+            for operand in reads:
+                if isinstance(operand, str) and not isinstance(operand, Const):
+                    users.setdefault(operand, []).append(i)
+
+    for name in params:
+        var_types[name] = (param_types or {}).get(name, 'unknown')
+
+    # Cada nombre cambia de tipo a lo sumo dos veces (sin tipo -> tipo -> 'unknown'),
+    # por lo que la lista de trabajo termina en tiempo lineal en el número de usos
+    while worklist:
+        i = worklist.pop()
+        op = instructions[i].op
+        arg1, arg2, result = keys[i]
+        if op in INPLACE_OPS:
+            # x op= v se tipa como x = x op v
+            op, arg1, arg2 = INPLACE_OPS[op], result, arg1
+        new_type = result_type(op, arg1, arg2, var_types)
+        if new_type is None:
+            continue
+        old_type = var_types.get(result)
+        joined = join_types(old_type, new_type)
+        if joined != old_type:
+            var_types[result] = joined
+            worklist.extend(users.get(result, ()))
+
+    return var_types
+
+
+def annotate_types(instructions):
+    """Anota cada instrucción con los tipos probados de (arg1, arg2, result).
+
+    Las anotaciones quedan en instr.types; un campo 'unknown' indica que el
+    consumidor debe mantener las comprobaciones dinámicas.
+
+    Returns:
+        dict: {nombre: tipo} inferido para el programa
+    """
+    keys = operand_keys(instructions)
+    var_types = infer_keyed_types(instructions, keys)
+    for instr, (arg1, arg2, result) in zip(instructions, keys):
+        instr.types = (
+            operand_type(arg1, var_types),
+            operand_type(arg2, var_types),
+            operand_type(result, var_types),
+        )
+    return merge_versions(var_types)
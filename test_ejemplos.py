@@ -6,7 +6,7 @@ Uses Hypothesis for property-based testing
 import pytest
 from hypothesis import given, strategies as st, settings
 from python_compiler import Lexer, TokenType, LexerError, ParserError
-from tac_generator import TACGenerator
+from tac_generator import TACGenerator, OpCode
 from semantic_analyzer import SemanticAnalyzer, SemanticError
 import ast
 
@@ -134,41 +134,41 @@ def test_property_tac_represents_all_source_operations(code):
     tac_ops = [instr.op for instr in tac_instructions]
     
     if has_assignment:
-        assert 'ASSIGN' in tac_ops or any(op in tac_ops for op in ['ADD', 'SUB', 'MUL', 'DIV', 'LIST_CREATE']), \
+        assert OpCode.ASSIGN in tac_ops or any(op in tac_ops for op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.LIST_CREATE]), \
             "TAC should contain ASSIGN or operation instructions for assignments"
     
     if has_arithmetic:
-        arithmetic_ops = ['ADD', 'SUB', 'MUL', 'DIV', 'MOD']
+        arithmetic_ops = [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD]
         assert any(op in tac_ops for op in arithmetic_ops), \
             f"TAC should contain arithmetic operations for code with arithmetic. Found: {set(tac_ops)}"
     
     if has_print:
-        assert 'PRINT' in tac_ops, "TAC should contain PRINT instruction for print statements"
+        assert OpCode.PRINT in tac_ops, "TAC should contain PRINT instruction for print statements"
     
     if has_if:
-        conditional_ops = ['IF_FALSE', 'GOTO', 'LABEL']
+        conditional_ops = [OpCode.IF_FALSE, OpCode.GOTO, OpCode.LABEL]
         assert any(op in tac_ops for op in conditional_ops), \
             "TAC should contain conditional jump instructions for if statements"
     
     if has_while:
-        loop_ops = ['LABEL', 'GOTO', 'IF_FALSE']
+        loop_ops = [OpCode.LABEL, OpCode.GOTO, OpCode.IF_FALSE]
         assert all(op in tac_ops for op in loop_ops), \
             "TAC should contain loop control instructions for while statements"
     
     if has_list_append:
-        assert 'LIST_APPEND' in tac_ops, "TAC should contain LIST_APPEND for append operations"
+        assert OpCode.LIST_APPEND in tac_ops, "TAC should contain LIST_APPEND for append operations"
     
     if has_list_access and not has_list_append:
-        assert 'LIST_GET' in tac_ops or 'LIST_SET' in tac_ops, \
+        assert OpCode.LIST_GET in tac_ops or OpCode.LIST_SET in tac_ops, \
             "TAC should contain LIST_GET or LIST_SET for list access"
     
     if has_len:
-        call_instructions = [instr for instr in tac_instructions if instr.op == 'CALL']
+        call_instructions = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
         len_calls = [instr for instr in call_instructions if instr.arg1 == 'len']
         assert len(len_calls) > 0, "TAC should contain CALL to len() for len() usage"
     
     if has_comparison:
-        comparison_ops = ['EQ', 'NEQ', 'LT', 'GT', 'LE', 'GE']
+        comparison_ops = [OpCode.EQ, OpCode.NEQ, OpCode.LT, OpCode.GT, OpCode.LTE, OpCode.GTE]
         assert any(op in tac_ops for op in comparison_ops), \
             "TAC should contain comparison instructions for comparison operations"
 
@@ -201,16 +201,16 @@ def test_ejemplo1_tac_completeness():
     tac_ops = [instr.op for instr in tac_instructions]
     
     # Should have list operations
-    assert 'LIST_CREATE' in tac_ops, "Should have LIST_CREATE"
-    assert 'LIST_APPEND' in tac_ops, "Should have LIST_APPEND"
-    assert 'LIST_GET' in tac_ops, "Should have LIST_GET"
-    assert 'LIST_SET' in tac_ops, "Should have LIST_SET"
+    assert OpCode.LIST_CREATE in tac_ops, "Should have LIST_CREATE"
+    assert OpCode.LIST_APPEND in tac_ops, "Should have LIST_APPEND"
+    assert OpCode.LIST_GET in tac_ops, "Should have LIST_GET"
+    assert OpCode.LIST_SET in tac_ops, "Should have LIST_SET"
     
     # Should have print operations
-    assert 'PRINT' in tac_ops, "Should have PRINT"
+    assert OpCode.PRINT in tac_ops, "Should have PRINT"
     
     # Should have assignments
-    assert 'ASSIGN' in tac_ops, "Should have ASSIGN"
+    assert OpCode.ASSIGN in tac_ops, "Should have ASSIGN"
 
 
 def test_ejemplo2_tac_completeness():
@@ -241,16 +241,16 @@ def test_ejemplo2_tac_completeness():
     tac_ops = [instr.op for instr in tac_instructions]
     
     # Should have arithmetic operations
-    assert 'ADD' in tac_ops, "Should have ADD"
-    assert 'MUL' in tac_ops, "Should have MUL"
-    assert 'SUB' in tac_ops, "Should have SUB"
-    assert 'DIV' in tac_ops, "Should have DIV"
+    assert OpCode.ADD in tac_ops, "Should have ADD"
+    assert OpCode.MUL in tac_ops, "Should have MUL"
+    assert OpCode.SUB in tac_ops, "Should have SUB"
+    assert OpCode.DIV in tac_ops, "Should have DIV"
     
     # Should have print operations
-    assert 'PRINT' in tac_ops, "Should have PRINT"
+    assert OpCode.PRINT in tac_ops, "Should have PRINT"
     
     # Should have assignments
-    assert 'ASSIGN' in tac_ops, "Should have ASSIGN"
+    assert OpCode.ASSIGN in tac_ops, "Should have ASSIGN"
 
 
 # ============= PROPERTY TEST 11.2 =============
@@ -549,16 +549,16 @@ def test_property_list_operations_generate_correct_tac():
     tac_ops = [instr.op for instr in tac_instructions]
     
     # Should have LIST_CREATE for empty list initialization
-    assert 'LIST_CREATE' in tac_ops, "TAC should contain LIST_CREATE for list initialization"
+    assert OpCode.LIST_CREATE in tac_ops, "TAC should contain LIST_CREATE for list initialization"
     
     # Should have LIST_APPEND for append operations
-    assert 'LIST_APPEND' in tac_ops, "TAC should contain LIST_APPEND for append operations"
+    assert OpCode.LIST_APPEND in tac_ops, "TAC should contain LIST_APPEND for append operations"
     
     # Should have LIST_GET for index access (read operations)
-    assert 'LIST_GET' in tac_ops, "TAC should contain LIST_GET for index access"
+    assert OpCode.LIST_GET in tac_ops, "TAC should contain LIST_GET for index access"
     
     # Should have LIST_SET for index assignment (update operations)
-    assert 'LIST_SET' in tac_ops, "TAC should contain LIST_SET for index assignment"
+    assert OpCode.LIST_SET in tac_ops, "TAC should contain LIST_SET for index assignment"
 
 
 @settings(max_examples=100)
@@ -598,7 +598,7 @@ def test_property_list_operations_tac_coverage(code):
     tac_ops = [instr.op for instr in tac_instructions]
     
     # At minimum, should have LIST_CREATE and LIST_APPEND
-    assert 'LIST_CREATE' in tac_ops or 'LIST_APPEND' in tac_ops or 'LIST_GET' in tac_ops or 'LIST_SET' in tac_ops, \
+    assert OpCode.LIST_CREATE in tac_ops or OpCode.LIST_APPEND in tac_ops or OpCode.LIST_GET in tac_ops or OpCode.LIST_SET in tac_ops, \
         "TAC should contain at least one list operation instruction"
 
 
@@ -649,10 +649,10 @@ def test_property_constant_folding_optimizes_arithmetic(code):
     optimized_tac = optimizer.optimize(tac_instructions)
     
     # Count arithmetic operations in original TAC
-    original_ops = [instr.op for instr in tac_instructions if instr.op in ['ADD', 'SUB', 'MUL', 'DIV', 'MOD']]
+    original_ops = [instr.op for instr in tac_instructions if instr.op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD]]
     
     # Count arithmetic operations in optimized TAC
-    optimized_ops = [instr.op for instr in optimized_tac if instr.op in ['ADD', 'SUB', 'MUL', 'DIV', 'MOD']]
+    optimized_ops = [instr.op for instr in optimized_tac if instr.op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.MOD]]
     
     # If there were arithmetic operations with constants, they should be reduced
     if len(original_ops) > 0:
@@ -846,7 +846,7 @@ def test_property_len_generates_correct_tac_calls(code):
     tac_instructions = tac_gen.generate(ast)
     
     # Verify TAC contains CALL instruction for len()
-    call_instructions = [instr for instr in tac_instructions if instr.op == 'CALL']
+    call_instructions = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
     len_calls = [instr for instr in call_instructions if instr.arg1 == 'len']
     
     # Should have at least one len() call
@@ -882,7 +882,7 @@ def test_ejemplo3_cadenas_len_function():
     tac_instructions = tac_gen.generate(ast)
     
     # Verify TAC contains CALL instructions for len()
-    call_instructions = [instr for instr in tac_instructions if instr.op == 'CALL']
+    call_instructions = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
     len_calls = [instr for instr in call_instructions if instr.arg1 == 'len']
     
     # ejemplo3_cadenas.py has multiple len() calls
@@ -946,7 +946,7 @@ def test_property_string_operations_generate_correct_code(code):
     
     if has_comparison:
         # Should have comparison instructions (EQ, NEQ, etc.)
-        comparison_ops = ['EQ', 'NEQ', 'LT', 'GT', 'LE', 'GE']
+        comparison_ops = [OpCode.EQ, OpCode.NEQ, OpCode.LT, OpCode.GT, OpCode.LTE, OpCode.GTE]
         has_comparison_in_tac = any(op in tac_ops for op in comparison_ops)
         assert has_comparison_in_tac, \
             f"TAC should contain comparison instructions for string comparisons. Found ops: {set(tac_ops)}"
@@ -987,20 +987,20 @@ def test_ejemplo3_cadenas_string_operations():
     tac_ops = [instr.op for instr in tac_instructions]
     
     # ejemplo3_cadenas.py has string comparisons
-    comparison_ops = ['EQ', 'NEQ', 'LT', 'GT', 'LE', 'GE']
+    comparison_ops = [OpCode.EQ, OpCode.NEQ, OpCode.LT, OpCode.GT, OpCode.LTE, OpCode.GTE]
     has_comparison = any(op in tac_ops for op in comparison_ops)
     assert has_comparison, f"TAC should contain comparison instructions. Found ops: {set(tac_ops)}"
     
     # Should also have CALL instructions for len()
-    assert 'CALL' in tac_ops, "TAC should contain CALL instructions for len()"
+    assert OpCode.CALL in tac_ops, "TAC should contain CALL instructions for len()"
     
     # Should have conditional jumps (IF_FALSE or similar)
-    conditional_ops = ['IF_FALSE', 'GOTO', 'LABEL']
+    conditional_ops = [OpCode.IF_FALSE, OpCode.GOTO, OpCode.LABEL]
     has_conditionals = any(op in tac_ops for op in conditional_ops)
     assert has_conditionals, "TAC should contain conditional jump instructions for if-else"
     
     # Verify string assignments are present
-    assert 'ASSIGN' in tac_ops, "TAC should contain ASSIGN instructions for variable assignments"
+    assert OpCode.ASSIGN in tac_ops, "TAC should contain ASSIGN instructions for variable assignments"
 
 
 # ============= PROPERTY TEST 5.2 =============
@@ -1078,25 +1078,25 @@ def test_property_recursive_functions_generate_correct_labels_and_calls(code):
     tac_ops = [instr.op for instr in tac_instructions]
     
     # Should have LABEL for function definition
-    assert 'LABEL' in tac_ops, "TAC should contain LABEL instruction for function definition"
+    assert OpCode.LABEL in tac_ops, "TAC should contain LABEL instruction for function definition"
     
     # Should have CALL for recursive calls
-    assert 'CALL' in tac_ops, "TAC should contain CALL instruction for recursive function calls"
+    assert OpCode.CALL in tac_ops, "TAC should contain CALL instruction for recursive function calls"
     
     # Should have RETURN for function return
-    assert 'RETURN' in tac_ops, "TAC should contain RETURN instruction"
+    assert OpCode.RETURN in tac_ops, "TAC should contain RETURN instruction"
     
     # Verify function labels exist (they start with 'func_' and are in arg1)
-    labels = [instr for instr in tac_instructions if instr.op == 'LABEL']
+    labels = [instr for instr in tac_instructions if instr.op == OpCode.LABEL]
     function_labels = [lbl for lbl in labels if lbl.arg1 and lbl.arg1.startswith('func_')]
     assert len(function_labels) > 0, "TAC should contain at least one function label (starting with 'func_')"
     
     # Verify recursive calls exist (CALL to the same function)
-    calls = [instr for instr in tac_instructions if instr.op == 'CALL']
+    calls = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
     assert len(calls) > 0, "TAC should contain at least one CALL instruction"
     
     # Verify RETURN instructions exist
-    returns = [instr for instr in tac_instructions if instr.op == 'RETURN']
+    returns = [instr for instr in tac_instructions if instr.op == OpCode.RETURN]
     assert len(returns) > 0, "TAC should contain at least one RETURN instruction"
 
 
@@ -1128,27 +1128,27 @@ def test_ejemplo4_factorial_recursive_structure():
     tac_ops = [instr.op for instr in tac_instructions]
     
     # Should have LABEL for factorial function (label is in arg1)
-    labels = [instr for instr in tac_instructions if instr.op == 'LABEL']
+    labels = [instr for instr in tac_instructions if instr.op == OpCode.LABEL]
     function_labels = [lbl for lbl in labels if lbl.arg1 == 'func_factorial']
     assert len(function_labels) > 0, "TAC should contain LABEL for factorial function"
     
     # Should have CALL instructions for recursive calls to factorial
-    calls = [instr for instr in tac_instructions if instr.op == 'CALL']
+    calls = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
     factorial_calls = [call for call in calls if call.arg1 == 'factorial']
     assert len(factorial_calls) > 0, "TAC should contain recursive CALL to factorial"
     
     # Should have RETURN instructions
-    returns = [instr for instr in tac_instructions if instr.op == 'RETURN']
+    returns = [instr for instr in tac_instructions if instr.op == OpCode.RETURN]
     assert len(returns) >= 2, "TAC should contain at least 2 RETURN instructions (base case and recursive case)"
     
     # Should have conditional logic (IF_FALSE for base case check)
-    assert 'IF_FALSE' in tac_ops or 'GOTO' in tac_ops, \
+    assert OpCode.IF_FALSE in tac_ops or OpCode.GOTO in tac_ops, \
         "TAC should contain conditional jumps for base case checking"
     
     # Verify function has parameters
     # The function should use PARAM or similar for parameter passing
     # Check that the function label is followed by parameter handling
-    factorial_label_idx = next(i for i, instr in enumerate(tac_instructions) if instr.op == 'LABEL' and instr.arg1 == 'func_factorial')
+    factorial_label_idx = next(i for i, instr in enumerate(tac_instructions) if instr.op == OpCode.LABEL and instr.arg1 == 'func_factorial')
     assert factorial_label_idx >= 0, "Should find factorial function label"
 
 
@@ -0,0 +1,1410 @@
+"""
+Unit Tests para las fases internas del compilador
+Cubre diagnósticos semánticos, representación TAC y optimizaciones
+"""
+
+import pytest
+from python_compiler import Lexer, Parser
+from semantic_analyzer import SemanticAnalyzer, Diagnostic, MENSAJES_DIAGNOSTICO, REGLA_DIAGNOSTICO
+from reglas_semanticas import (
+    REGLAS_SEMANTICAS, REGLAS_POR_ID, obtener_regla_por_id, obtener_reglas_por_fase
+)
+from tac_generator import (
+    TACGenerator, TACInstruction, TACProgram, OpCode, Const, Var, Temp, Label, ArgList, lower_loops
+)
+from semantic_tac_generator import SemanticTACGenerator
+from tac_types import infer_tac_types, annotate_types
+from tac_cfg import build_cfg
+from tac_ssa import to_ssa, from_ssa
+from tac_optimizer import TACOptimizer, OptimizationEvent, OPTIMIZATION_LEVELS
+from tac_interpreter import TACInterpreter
+from machine_code_generator import MachineCodeGenerator
+from peephole import PeepholeRule
+
+
+EJEMPLOS = [
+    'ejemplos/ejemplo1_estudiantes.py',
+    'ejemplos/ejemplo2_inventario.py',
+    'ejemplos/ejemplo3_cadenas.py',
+    'ejemplos/ejemplo4_factorial.py',
+]
+
+
+def parse(code):
+    """Tokeniza y parsea un fragmento de código"""
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+def generar_tac(code):
+    """Genera el TAC de un fragmento de código"""
+    return TACGenerator().generate(parse(code))
+
+
+def optimizar(code, level=2, optimizer=None):
+    """Optimiza el TAC de un fragmento, comprueba que su salida no cambia y
+    devuelve las instrucciones optimizadas como texto"""
+    tac = generar_tac(code)
+    if optimizer is None:
+        optimizer = TACOptimizer(level)
+    optimized = optimizer.optimize(tac)
+    assert TACInterpreter().interpret(optimized) == TACInterpreter().interpret(tac)
+    return [str(instr) for instr in optimized]
+
+
+# ============= DIAGNÓSTICOS SEMÁNTICOS =============
+
+class TestDiagnosticos:
+    """Diagnósticos estructurados con formateo diferido"""
+
+    def test_diagnosticos_se_almacenan_como_registros(self):
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse("x = 5\ny = z + 1"))
+
+        record = analyzer.error_records[0]
+        assert isinstance(record, Diagnostic)
+        assert record.code == 'variable_no_declarada'
+        assert record.args == ('z',)
+        assert record.line == 2
+        assert analyzer.errors[0] == "Línea 2: Variable 'z' no está declarada antes de usarse"
+
+    def test_limite_por_codigo(self):
+        code = "\n".join(f"x{i} = desconocida" for i in range(50))
+        analyzer = SemanticAnalyzer(max_per_code=5)
+        success = analyzer.analyze(parse(code))
+
+        assert not success
+        assert len(analyzer.errors) == 5
+        assert analyzer.suppressed['variable_no_declarada'] == 45
+        assert "DIAGNÓSTICOS OMITIDOS (45)" in analyzer.get_report()
+
+    def test_deduplicacion(self):
+        code = "y = z\ny = z\ny = w"
+        analyzer = SemanticAnalyzer(dedup=True)
+        analyzer.analyze(parse(code))
+
+        assert len(analyzer.errors) == 2
+        assert analyzer.suppressed == {'variable_no_declarada': 1}
+
+    def test_reporte_sin_diagnosticos(self):
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse("x = 1\nprint(x)"))
+
+        report = analyzer.get_report()
+        assert report == ''.join(analyzer.iter_report())
+        assert "[OK] No se encontraron errores ni advertencias semánticas" in report
+
+
+# ============= CATÁLOGO DE REGLAS =============
+
+class TestCatalogoReglas:
+    """Índices congelados del catálogo y enlace diagnóstico -> regla"""
+
+    def test_indices_por_id_y_fase(self):
+        assert obtener_regla_por_id('S08').regla_gramatical == "Rango de For"
+        assert obtener_regla_por_id('X99') is None
+        assert [r.id_regla for r in obtener_reglas_por_fase('semantico')] == [f"S{i:02d}" for i in range(1, 11)]
+        assert obtener_reglas_por_fase('desconocida') == ()
+        assert len(REGLAS_POR_ID) == len(REGLAS_SEMANTICAS)
+
+    def test_reglas_inmutables(self):
+        regla = obtener_regla_por_id('L01')
+        with pytest.raises(AttributeError):
+            regla.fase = 'codigo'
+        with pytest.raises(TypeError):
+            REGLAS_POR_ID['L01'] = regla
+        assert not hasattr(regla, '__dict__')
+
+    def test_cada_diagnostico_enlaza_una_regla_semantica(self):
+        assert set(REGLA_DIAGNOSTICO) == set(MENSAJES_DIAGNOSTICO)
+        for rule_id in REGLA_DIAGNOSTICO.values():
+            assert obtener_regla_por_id(rule_id).fase == 'semantico'
+
+    def test_reporte_cita_las_reglas(self):
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse("x = y + 1\nz = 5 / 0"))
+
+        assert analyzer.error_records[0].rule.id_regla == 'S02'
+        report = analyzer.get_report()
+        assert "Variable 'y' no está declarada antes de usarse [S02]" in report
+        assert "S10: División por Cero" in report
+
+
+# ============= PASADA ÚNICA SEMÁNTICA + TAC =============
+
+class TestPasadaUnica:
+    """SemanticTACGenerator produce lo mismo que las dos fases por separado"""
+
+    CODIGO_CON_ERRORES = """x = 5
+y = 'a' + 1
+lista = [1, 2]
+lista[w] = x
+m = {}
+m['a'][z] = 3
+for i in range(x, 'b'):
+    print(i)
+if 'a':
+    del lista[q]
+print(len(1, 2))"""
+
+    def compilar_por_separado(self, code):
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse(code))
+        tac = TACGenerator().generate(parse(code))
+        return analyzer, [str(instr) for instr in tac]
+
+    @pytest.mark.parametrize('path', EJEMPLOS)
+    def test_mismo_tac_y_tabla_en_ejemplos(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        analyzer, tac = self.compilar_por_separado(code)
+
+        generator = SemanticTACGenerator()
+        fused_tac = generator.generate(parse(code))
+
+        assert [str(instr) for instr in fused_tac] == tac
+        assert generator.symbol_table == analyzer.symbol_table
+        assert generator.success
+
+    def test_mismos_diagnosticos_y_orden(self):
+        analyzer, tac = self.compilar_por_separado(self.CODIGO_CON_ERRORES)
+
+        generator = SemanticTACGenerator()
+        fused_tac = generator.generate(parse(self.CODIGO_CON_ERRORES))
+
+        assert not generator.success
+        assert list(generator.analyzer.errors) == list(analyzer.errors)
+        assert list(generator.analyzer.warnings) == list(analyzer.warnings)
+        assert [str(instr) for instr in fused_tac] == tac
+
+    @pytest.mark.parametrize('code, tipo', [
+        ('x = 1 + 2', 'int'), ('y = 2 * 1.5', 'float'), ('z = [1]', 'list'), ('n = len("ab")', 'int'),
+    ])
+    def test_temporales_anotados_con_tipo(self, code, tipo):
+        generator = SemanticTACGenerator()
+        generator.generate(parse(code))
+
+        assert generator.temp_types == {'t0': tipo}
+
+
+# ============= TAC CON TIPOS =============
+
+class TestTiposTAC:
+    """Tipos probados sobre operandos y temporales del TAC"""
+
+    def test_tipos_de_variables_y_temporales(self):
+        tac = generar_tac('lista = [1, 2]\nd = {}\ni = 0\nn = len(lista)\nx = i / 2')
+        types = infer_tac_types(tac)
+
+        assert types['lista'] == 'list'
+        assert types['d'] == 'dict'
+        assert types['i'] == 'int'
+        assert types['n'] == 'int'
+        assert types['x'] == 'float'
+
+    def test_cambio_de_tipo_en_bucle_no_se_prueba(self):
+        code = "x = 1\ni = 0\nwhile i < 3:\n    print(x + 1)\n    x = 2.5\n    i = i + 1"
+        tac = generar_tac(code)
+        types = infer_tac_types(tac)
+
+        assert types['x'] == 'unknown'
+        assert types['i'] == 'int'
+        assert TACInterpreter().interpret(tac) == "2\n3.5\n3.5"
+
+    def test_parametros_sin_tipo_probado(self):
+        tac = generar_tac("def doble(valor):\n    return valor * 2\nvalor = 5\nprint(doble(3))")
+        assert infer_tac_types(tac)['valor'] == 'unknown'
+        # Los argumentos se enlazan a los parámetros declarados
+        assert TACInterpreter().interpret(tac) == "6"
+
+    def test_manejadores_especializados(self):
+        tac = generar_tac('lista = [1, 2]\nd = {}\nd["a"] = 1\nx = lista[0] + len(lista)\ny = d["a"]')
+        interpreter = TACInterpreter()
+        output = interpreter.interpret(tac)
+
+        handlers = {instr.op: interpreter.select_handler(instr) for instr in tac}
+        assert handlers[OpCode.LIST_GET] == interpreter.exec_LIST_GET_dict
+        assert handlers[OpCode.LIST_SET] == interpreter.exec_LIST_SET_dict
+        assert handlers[OpCode.CALL] == interpreter.exec_CALL_len
+        assert interpreter.variables['x'] == 3
+        assert interpreter.variables['y'] == 1
+        assert output == ''
+
+    def test_reduccion_de_fuerza_requiere_tipo_numerico(self):
+        tac = generar_tac('s = "a"\nt = s * 1\nn = 4\nm = n * 1\nprint(t)\nprint(m)')
+        optimized = TACOptimizer().optimize(tac)
+        ops = [str(instr) for instr in optimized]
+
+        assert 't = s * 1' in ops
+        assert 'm = n * 1' not in ops
+        assert TACInterpreter().interpret(optimized) == "a\n4"
+
+
+# ============= HECHOS DE RANGO =============
+
+class TestHechosDeRango:
+    """Accesos a índice probados dentro de los límites"""
+
+    def compilar(self, code):
+        ast = parse(code)
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(ast)
+        return analyzer, TACGenerator().generate(ast)
+
+    def test_variable_de_induccion_y_longitud_literal(self):
+        code = """lista = [4, 5, 6]
+total = 0
+for i in range(len(lista)):
+    total = total + lista[i]
+    lista[i] = 0
+for x in lista:
+    print(x)
+print(lista[2])
+print(lista[3])"""
+        analyzer, tac = self.compilar(code)
+
+        assert analyzer.range_facts.list_lengths == {'lista': 3}
+        seguros = [str(instr) for instr in tac if instr.in_bounds]
+        assert seguros == ['t0 = lista[i]', 'lista[i] = 0', 't0 = lista[2]']
+
+    def test_del_en_el_cuerpo_invalida_el_hecho(self):
+        code = """lista = [4, 5, 6]
+for i in range(len(lista)):
+    del lista[0]
+    print(lista[i])"""
+        analyzer, tac = self.compilar(code)
+
+        assert analyzer.range_facts.safe_accesses == 0
+        with pytest.raises(Exception, match="Índice fuera de rango"):
+            TACInterpreter().interpret(tac)
+
+    def test_reasignar_la_variable_invalida_el_hecho(self):
+        code = """lista = [4, 5, 6]
+for i in range(len(lista)):
+    i = 5
+    print(lista[i])"""
+        _, tac = self.compilar(code)
+        assert not any(instr.in_bounds for instr in tac)
+
+    def test_acceso_sin_comprobacion_en_interprete_y_ensamblador(self):
+        code = "lista = [4, 5, 6]\ntotal = 0\nfor i in range(3):\n    total = total + lista[i]\nprint(total)"
+        _, tac = self.compilar(code)
+        interpreter = TACInterpreter()
+
+        assert interpreter.interpret(tac) == "15"
+        get = next(instr for instr in tac if instr.op == OpCode.LIST_GET)
+        assert get.in_bounds
+        assert interpreter.select_handler(get).__name__ == 'unchecked_get'
+
+        asm = MachineCodeGenerator().generate(tac)
+        assert not any('_list_get' in line for line in asm)
+
+
+# ============= CODIFICACIÓN COMPACTA DEL TAC =============
+
+class TestCodificacionTAC:
+    """Opcodes enteros, instrucciones con slots y programa empaquetado"""
+
+    def test_opcode_desde_su_nombre(self):
+        instr = TACInstruction('ADD', 'a', 'b', 't0')
+
+        assert instr.op is OpCode.ADD
+        assert instr.op == OpCode.ADD and instr.op != OpCode.SUB
+        # Un IntEnum normal: igual a su valor y con su mismo hash
+        assert instr.op == OpCode.ADD.value and {OpCode.ADD.value: 1}[instr.op] == 1
+        assert f"exec_{instr.op}" == 'exec_ADD'
+        with pytest.raises(KeyError):
+            TACInstruction('SUMA', 'a', 'b', 't0')
+
+    def test_instruccion_con_slots(self):
+        instr = TACInstruction(OpCode.PRINT, 'x')
+        assert not hasattr(instr, '__dict__')
+        with pytest.raises(AttributeError):
+            instr.extra = 1
+
+    @pytest.mark.parametrize('path', EJEMPLOS)
+    def test_programa_empaquetado_conserva_el_texto(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            tac = generar_tac(f.read())
+        program = TACProgram(tac)
+
+        assert len(program) == len(tac)
+        assert program.opcodes.itemsize == 1
+        assert len(program.operands) < 3 * len(tac)
+        assert [str(instr) for instr in program] == [str(instr) for instr in tac]
+        assert TACInterpreter().interpret(program.to_instructions()) == TACInterpreter().interpret(tac)
+
+
+# ============= OPERANDOS TIPADOS =============
+
+class TestOperandosTipados:
+    """Constantes, variables, temporales y etiquetas con su valor ya convertido"""
+
+    def test_generador_emite_operandos_tipados(self):
+        tac = generar_tac('x = 2.5\ns = "hola"\nif x > 1:\n    print(s)')
+        assign_x, assign_s, compare, branch = tac[:4]
+
+        assert isinstance(assign_x.arg1, Const) and assign_x.arg1.value == 2.5
+        assert assign_s.arg1.value == 'hola' and str(assign_s.arg1) == '"hola"'
+        assert isinstance(assign_x.result, Var) and not isinstance(assign_x.result, Temp)
+        assert isinstance(compare.result, Temp) and compare.arg2.value == 1
+        assert isinstance(branch.arg2, Label)
+        assert str(branch) == 'if_false t0 goto L0'
+
+    def test_texto_se_convierte_al_crear_la_instruccion(self):
+        instr = TACInstruction('ADD', 'total', '1', 't3')
+        call = TACInstruction('CALL', 'suma', '2', 't4')
+        builtin = TACInstruction('CALL', 'len', 'lista', 't5')
+        jump = TACInstruction('GOTO', 'L1')
+
+        assert isinstance(instr.arg1, Var) and not isinstance(instr.arg1, Temp)
+        assert instr.arg2 == Const(1) and instr.arg2.value == 1
+        assert isinstance(instr.result, Temp)
+        assert call.arg1 == 'suma' and call.arg2 == Const(2)
+        assert str(call) == 't4 = call suma, 2'
+        assert isinstance(builtin.arg2, Var) and str(builtin) == 't5 = len(lista)'
+        assert isinstance(jump.arg1, Label)
+
+    def test_ensamblador_distingue_variables_de_temporales(self):
+        # total empieza por t pero es una variable del programa: va a memoria
+        asm = MachineCodeGenerator().generate(generar_tac('total = 5\nprint(total)'))
+
+        assert '    total: .word 0' in asm
+        assert any(line.strip().startswith('STR') for line in asm)
+
+    def test_constantes_distinguen_tipo(self):
+        assert Const(1) != Const(1.0) and Const('1') != Const(1)
+        assert Const(True).value is True and not Const(True).is_number
+        assert TACProgram([TACInstruction('PRINT', Const(1)), TACInstruction('PRINT', Const('1'))]).operands == [
+            Const(1), Const('1')
+        ]
+
+    def test_plegado_produce_constantes(self):
+        optimized = TACOptimizer().optimize(generar_tac('x = 10 / 4\ny = x * 0\nprint(y)\nprint(x)'))
+        folded = optimized[-1]
+
+        assert folded.arg1 == Const(2.5) and folded.arg1.value == 2.5
+        assert TACInterpreter().interpret(optimized) == "0.0\n2.5"
+
+    def test_eliminacion_de_codigo_muerto_respeta_variables(self):
+        # Las variables del programa cuyo nombre empieza por t no son temporales
+        optimized = TACOptimizer().optimize(generar_tac('a = 3\ntotal = a * 2\nprint(total)'))
+        assert TACInterpreter().interpret(optimized) == "6"
+
+
+# ============= GRAFO DE FLUJO DE CONTROL =============
+
+class TestGrafoFlujoControl:
+    """Bloques básicos, dominadores y bucles naturales"""
+
+    BUCLES_ANIDADOS = """total = 0
+for i in range(3):
+    j = 0
+    while j < i:
+        total = total + j
+        j = j + 1
+print(total)"""
+
+    @pytest.mark.parametrize('path', EJEMPLOS)
+    def test_vuelta_a_lista_lineal(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            tac = generar_tac(f.read())
+        cfg = build_cfg(tac)
+
+        assert cfg.to_instructions() == tac
+        for block in cfg:
+            assert all(instr.op != OpCode.LABEL for instr in block.instructions[1:])
+            assert all(instr.op not in (OpCode.GOTO, OpCode.IF_FALSE, OpCode.RETURN) for instr in block.instructions[:-1])
+
+    def test_aristas_de_saltos(self):
+        cfg = build_cfg(generar_tac('x = 1\nif x > 0:\n    print(x)\nelse:\n    print(0)\nprint(x)'))
+        entry = cfg.blocks[cfg.entry]
+        else_block = cfg.label_blocks['L0']
+        end_block = cfg.label_blocks['L1']
+
+        assert entry.succs == [else_block, entry.index + 1]
+        assert sorted(cfg.blocks[end_block].preds) == [entry.index + 1, else_block]
+        assert cfg.idom[end_block] == entry.index
+        assert cfg.dominance_frontiers()[else_block] == {end_block}
+
+    def test_bucles_naturales_anidados(self):
+        cfg = build_cfg(generar_tac(self.BUCLES_ANIDADOS))
+        outer, inner = cfg.loops
+
+        assert outer.header == cfg.label_blocks['L0']
+        assert inner.header == cfg.label_blocks['L2']
+        assert inner.blocks < outer.blocks
+        assert inner.parent is outer and inner.depth == 2
+        assert cfg.loop_depth(inner.header) == 2
+        assert cfg.loop_depth(cfg.label_blocks['L1']) == 0
+        assert all(cfg.dominates(outer.header, block) for block in outer.blocks)
+
+    def test_funciones_son_regiones_separadas(self):
+        with open('ejemplos/ejemplo4_factorial.py', 'r', encoding='utf-8') as f:
+            cfg = build_cfg(generar_tac(f.read()))
+        function = cfg.function_entries['func_factorial']
+
+        assert cfg.entry != function
+        assert cfg.regions[cfg.entry] is None
+        assert cfg.idom[function] is None and cfg.idom[cfg.entry] is None
+        assert set(cfg.function_blocks('func_factorial')).isdisjoint(cfg.function_blocks(None))
+        assert not cfg.blocks[cfg.entry].preds
+
+    def test_el_programa_salta_las_definiciones_de_funciones(self):
+        cfg = build_cfg(generar_tac("g = 1\ndef f(a):\n    return a\ndef h(b):\n    return b\nprint(g)"))
+        after = cfg.function_end(cfg.function_entries['func_h']) + 1
+
+        assert cfg.blocks[cfg.entry].succs == [after]
+        assert cfg.idom[after] == cfg.entry
+
+
+# ============= FORMA SSA =============
+
+class TestFormaSSA:
+    """Construcción, verificación y salida de la forma SSA"""
+
+    @pytest.mark.parametrize('path', EJEMPLOS)
+    def test_ida_y_vuelta_conserva_el_programa(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            tac = generar_tac(f.read())
+        ssa = to_ssa(tac)
+
+        assert ssa.verify() == []
+        assert [str(instr) for instr in from_ssa(ssa)] == [str(instr) for instr in tac]
+
+    def test_phi_en_cabeceras_de_bucle(self):
+        ssa = to_ssa(generar_tac(TestGrafoFlujoControl.BUCLES_ANIDADOS))
+        phis = [instr for instr in ssa.instructions() if instr.op == OpCode.PHI]
+
+        # Los temporales locales a un bloque no reciben phi (forma podada), ni la
+        # variable del for, que se asigna en la cabecera antes de leerse
+        assert sorted(ssa.base(phi.result) for phi in phis) == ['j', 'total', 'total']
+        assert 'j.2 = phi(j.1, j.3)' in [str(phi) for phi in phis]
+
+    def test_verificador_detecta_errores(self):
+        ssa = to_ssa(generar_tac('x = 1\nif x > 0:\n    x = 2\nprint(x)'))
+        block = ssa.blocks[0]
+        block.instructions.insert(0, TACInstruction('ASSIGN', Const(5), None, block.instructions[0].result))
+        errors = ssa.verify()
+
+        assert any('más de una vez' in error for error in errors)
+
+        phi_block = next(b for b in ssa.blocks if any(instr.op == OpCode.PHI for instr in b.instructions))
+        phi = next(instr for instr in phi_block.instructions if instr.op == OpCode.PHI)
+        phi.arg2 = tuple(reversed(phi.arg2))
+        assert any('predecesores' in error for error in ssa.verify())
+
+    def test_versiones_que_interfieren_generan_copias(self):
+        code = "a = 1\nb = 2\ni = 0\nwhile i < 3:\n    t = a\n    a = b\n    b = t\n    i = i + 1\nprint(a)\nprint(b)"
+        tac = generar_tac(code)
+        ssa = to_ssa(tac)
+        # Propagación de copias: las phi de a y b quedan intercambiadas
+        copies = {instr.result: instr.arg1 for instr in ssa.instructions()
+                  if instr.op == OpCode.ASSIGN and isinstance(instr.arg1, Var)}
+        for name, source in copies.items():
+            while source in copies:
+                source = copies[source]
+            copies[name] = source
+        for block in ssa.blocks:
+            block.instructions = [instr for instr in block.instructions
+                                  if not (instr.op == OpCode.ASSIGN and instr.result in copies)]
+            for instr in block.instructions:
+                if instr.op == OpCode.PHI:
+                    instr.arg1 = ArgList(copies.get(arg, arg) for arg in instr.arg1)
+                elif instr.op != OpCode.LABEL:
+                    instr.arg1 = copies.get(instr.arg1, instr.arg1)
+                    instr.arg2 = copies.get(instr.arg2, instr.arg2)
+
+        assert ssa.verify() == []
+        back = from_ssa(ssa)
+        assert not any(instr.op == OpCode.PHI for instr in back)
+        assert TACInterpreter().interpret(back) == TACInterpreter().interpret(tac) == "2\n1"
+
+    @pytest.mark.parametrize('condicion, salida', [('2', '3'), ('0', '1')])
+    def test_arista_critica_se_parte(self, condicion, salida):
+        tac = [
+            TACInstruction('ASSIGN', '1', None, 'x'), TACInstruction('ASSIGN', condicion, None, 'y'),
+            TACInstruction('GT', 'y', '1', 't0'), TACInstruction('IF_FALSE', 't0', 'L1'),
+            TACInstruction('ASSIGN', '3', None, 'x'), TACInstruction('LABEL', 'L1'), TACInstruction('PRINT', 'x'),
+        ]
+        ssa = to_ssa(tac)
+        # Como tras propagar constantes: la phi recibe constantes distintas por cada arista
+        for block in ssa.blocks:
+            block.instructions = [instr for instr in block.instructions
+                                  if not (instr.op == OpCode.ASSIGN and ssa.base(instr.result) == 'x')]
+            for instr in block.instructions:
+                if instr.op == OpCode.PHI:
+                    instr.arg1 = ArgList((Const(1), Const(3)))
+
+        assert ssa.verify() == []
+        back = from_ssa(ssa)
+        jump = next(instr for instr in back if instr.op == OpCode.IF_FALSE)
+        assert jump.arg2 != 'L1'
+        assert TACInterpreter().interpret(back) == salida
+
+
+# ============= MARCOS DE LLAMADA =============
+
+class TestMarcosDeLlamada:
+    """PARAM, CALL n, ENTER y LEAVE: argumentos enlazados por posición"""
+
+    POTENCIA = (
+        "def potencia(base, exp):\n    r = 1\n    for i in range(exp):\n        r = r * base\n    return r\n"
+        "def doble(valor):\n    return valor * 2\n"
+        "x = 2\nprint(potencia(doble(x), doble(1)))\nprint(x)"
+    )
+
+    def test_generador_emite_marco_y_parametros(self):
+        tac = generar_tac(self.POTENCIA)
+        enter = tac[1]
+        call = next(instr for instr in tac if instr.op == OpCode.CALL and instr.arg1 == 'potencia')
+        params = tac[tac.index(call) - 2:tac.index(call)]
+
+        assert enter.op == OpCode.ENTER and enter.arg1 == ArgList((Var('base'), Var('exp')))
+        assert str(enter) == 'enter (base, exp), 2'
+        assert [str(instr) for instr in params] == ['param t0', 'param t1']
+        assert call.arg2 == Const(2) and str(call) == 't0 = call potencia, 2'
+        assert [str(instr) for instr in tac if instr.op == OpCode.LEAVE] == ['leave', 'leave']
+
+    def test_interprete_enlaza_por_posicion(self):
+        tac = generar_tac(self.POTENCIA)
+        assert TACInterpreter().interpret(tac) == "16\n2"
+        assert TACInterpreter().interpret(TACOptimizer().optimize(tac)) == "16\n2"
+
+    def test_funcion_definida_entre_sentencias(self):
+        code = "print(1)\ndef saludo():\n    print(\"hola\")\nsaludo()\ndef tres():\n    return 3\nprint(tres())"
+        assert TACInterpreter().interpret(generar_tac(code)) == "1\nhola\n3"
+
+    def test_ensamblador_usa_el_marco(self):
+        asm = '\n'.join(MachineCodeGenerator().generate(generar_tac(self.POTENCIA)))
+        main, functions = asm.split('B _exit', 1)
+
+        assert 'PUSH {R' in main and 'BL func_potencia' in main and 'ADD SP, SP, #8' in main
+        assert 'func_potencia:\n    PUSH {FP, LR}\n    MOV FP, SP\n    SUB SP, SP, #8' in functions
+        # El último argumento apilado (exp) queda justo encima de FP y LR
+        assert 'LDR R' in functions and '[FP, #8]' in functions and '[FP, #12]' in functions
+        assert functions.count('POP {FP, PC}') == 4
+
+    def test_funcion_termina_en_leave(self):
+        cfg = build_cfg(generar_tac(self.POTENCIA))
+        for label in ('func_potencia', 'func_doble'):
+            last = cfg.blocks[cfg.function_blocks(label)[-1]]
+            assert last.terminator.op == OpCode.LEAVE and last.succs == []
+
+
+# ============= RECICLAJE DE TEMPORALES =============
+
+class TestReciclajeTemporales:
+    """Los temporales de una expresión se liberan tras su único uso"""
+
+    def test_temporales_acotados_en_programa_largo(self):
+        code = '\n'.join(['x = 1'] + [f'x = (x * 3 + {k}) % 1000' for k in range(200)] + ['print(x)'])
+        generator = TACGenerator()
+        tac = generator.generate(parse(code))
+
+        assert generator.temp_counter == generator.peak_temps == 2
+        assert 'Pico de temporales vivos: 2' in generator.get_temp_report()
+        assert TACInterpreter().interpret(tac) == "901"
+
+    def test_llamada_suelta_libera_su_temporal(self):
+        tac = generar_tac('def saludo():\n    print("hola")\nsaludo()\nx = 1 + 2')
+        assert [str(instr) for instr in tac[-3:]] == ['t0 = call saludo, 0', 't0 = 1 + 2', 'x = t0']
+
+    def test_el_bucle_no_retiene_temporales(self):
+        code = 'for x in [1, 2]:\n    y = x * 10\n    print(y + 1)\nz = 5 - 1\nprint(z)'
+        tac = generar_tac(code)
+        body = [instr.result for instr in tac if instr.op in (OpCode.MUL, OpCode.ADD, OpCode.SUB)]
+
+        # El iterador guarda la lista: su temporal queda libre para el cuerpo
+        assert '_it0 = iter(t0)' in [str(instr) for instr in tac]
+        assert body == ['t0', 't0', 't0']
+        assert TACInterpreter().interpret(tac) == "11\n21\n4"
+
+    def test_cada_definicion_conserva_su_tipo(self):
+        tac = generar_tac('s = "a" + "b"\nn = 1 + 2\nm = n * 2')
+        annotate_types(tac)
+        assigns = [instr for instr in tac if instr.op == OpCode.ASSIGN]
+
+        assert [instr.arg1 for instr in assigns] == ['t0', 't0', 't0']
+        assert [instr.types[0] for instr in assigns] == ['str', 'int', 'int']
+        assert infer_tac_types(tac)['t0'] == 'unknown'
+
+
+# ============= BUCLES NATIVOS =============
+
+class TestBuclesNativos:
+    """FOR_RANGE_* e ITER_*: la cabecera del bucle es una sola instrucción"""
+
+    BUCLES = [
+        ("for i in range(2, 10, 3):\n    print(i)", "2\n5\n8"),
+        ("n = 0 - 2\nfor i in range(5, 0, n):\n    print(i)", "5\n3\n1"),
+        ("for i in range(3):\n    i = 10\n    print(i)\nprint(i)", "10\n10\n10\n10"),
+        # Como en Python, el recorrido ve los elementos agregados durante el bucle
+        ("lista = [1, 2]\nfor x in lista:\n    if x < 3:\n        lista.append(x * 10)\nprint(lista)",
+         "[1, 2, 10, 20]"),
+    ]
+
+    def test_cabecera_de_una_instruccion(self):
+        tac = [str(instr) for instr in generar_tac("for i in range(1, n + 1):\n    print(i)")]
+
+        assert tac == ['t0 = n + 1', '_it0 = range(1, t0, 1)', 'L0:', 'i = next(_it0) else goto L1',
+                       'print(i)', 'goto L0', 'L1:']
+
+    @pytest.mark.parametrize('code, salida', BUCLES + [("for c in 'ab':\n    print(c)", "a\nb")])
+    def test_interprete(self, code, salida):
+        assert TACInterpreter().interpret(generar_tac(code)) == salida
+
+    @pytest.mark.parametrize('code, salida', BUCLES)
+    def test_traduccion_a_saltos(self, code, salida):
+        lowered = lower_loops(generar_tac(code))
+
+        assert not any(instr.op in (OpCode.FOR_RANGE_INIT, OpCode.FOR_RANGE_NEXT, OpCode.ITER_INIT, OpCode.ITER_NEXT)
+                       for instr in lowered)
+        assert TACInterpreter().interpret(lowered) == salida
+
+    @pytest.mark.parametrize('code, salida', BUCLES)
+    def test_optimizador_y_ssa(self, code, salida):
+        tac = generar_tac(code)
+        ssa = to_ssa(tac)
+
+        assert ssa.verify() == []
+        assert [str(instr) for instr in from_ssa(ssa)] == [str(instr) for instr in tac]
+        assert TACInterpreter().interpret(TACOptimizer().optimize(tac)) == salida
+
+    def test_bucle_en_grafo_y_ensamblador(self):
+        tac = generar_tac("total = 0\nfor i in range(4):\n    total = total + i\nprint(total)")
+        cfg = build_cfg(tac)
+        header = cfg.blocks[cfg.label_blocks['L0']]
+
+        assert [loop.header for loop in cfg.loops] == [header.index]
+        assert header.succs == [cfg.label_blocks['L1'], header.index + 1]
+        asm = MachineCodeGenerator().generate(tac)
+        assert 'L0:' in asm and '    B L0' in asm and '    BEQ L1' in asm
+
+    def test_errores_de_range(self):
+        with pytest.raises(Exception, match="paso de range"):
+            TACInterpreter().interpret(generar_tac("for i in range(0, 5, 0):\n    print(i)"))
+        with pytest.raises(Exception, match="argumentos enteros"):
+            TACInterpreter().interpret(generar_tac("for i in range(1.5):\n    print(i)"))
+
+
+# ============= SALTOS FUNDIDOS =============
+
+class TestSaltosFundidos:
+    """Comparación seguida de if_false fundida en un salto condicional"""
+
+    @pytest.mark.parametrize('operador, salto', [
+        ('==', 'if x != 3'), ('!=', 'if x == 3'), ('<', 'if x >= 3'),
+        ('>', 'if x <= 3'), ('<=', 'if x > 3'), ('>=', 'if x < 3'),
+    ])
+    @pytest.mark.parametrize('valor', [2, 3, 4])
+    def test_mismo_resultado_que_sin_fundir(self, operador, salto, valor):
+        # x se lee de una lista: con una constante la propagación plegaría el salto
+        tac = generar_tac(f"datos = [{valor}]\nx = datos[0]\nif x {operador} 3:\n    print(1)\nelse:\n    print(0)")
+        optimized = TACOptimizer().optimize(tac)
+
+        assert f"{salto} goto L0" in [str(instr) for instr in optimized]
+        assert not any(instr.op == OpCode.IF_FALSE for instr in optimized)
+        assert TACInterpreter().interpret(optimized) == TACInterpreter().interpret(tac)
+
+    def test_no_se_funde_si_el_temporal_sigue_vivo(self):
+        tac = [
+            TACInstruction('LT', 'a', 'b', 't0'), TACInstruction('IF_FALSE', 't0', 'L0'),
+            TACInstruction('PRINT', 't0'), TACInstruction('LABEL', 'L0'),
+        ]
+        assert TACOptimizer().fuse_branches(tac) == tac
+
+    def test_bucle_while_en_grafo_ssa_y_ensamblador(self):
+        code = "i = 0\nwhile i < 3:\n    print(i)\n    i = i + 1"
+        optimized = TACOptimizer().optimize(generar_tac(code))
+        cfg = build_cfg(optimized)
+        header = cfg.blocks[cfg.label_blocks['L0']]
+
+        assert str(header.terminator) == 'if i >= 3 goto L1'
+        assert header.succs == [cfg.label_blocks['L1'], header.index + 1]
+        ssa = to_ssa(optimized)
+        assert ssa.verify() == []
+        assert TACInterpreter().interpret(from_ssa(ssa)) == "0\n1\n2"
+
+        asm = MachineCodeGenerator().generate(optimized)
+        branch = asm.index('    BGE L1')
+        assert asm[branch - 1].startswith('    CMP')
+        assert not any(line.startswith('    MOVLT') for line in asm)
+
+
+# ============= ASIGNACIÓN AUMENTADA =============
+
+class TestAsignacionAumentada:
+    """Operadores +=, -=, *=, /= y %= con actualización en el lugar"""
+
+    ACUMULADOR = "suma = 0\nfor i in range(5):\n    suma += i * 2\nprint(suma)"
+
+    @pytest.mark.parametrize('operador, esperado', [
+        ('+=', '22'), ('-=', '12'), ('*=', '85'), ('/=', '3.4'), ('%=', '2'),
+    ])
+    def test_operadores_en_todas_las_fases(self, operador, esperado):
+        code = f"x = 17\nx {operador} 5\nprint(x)"
+        tokens = Lexer(code).tokenize()
+        tac = generar_tac(code)
+
+        assert [token.value for token in tokens[4:7]] == ['x', operador, 5]
+        assert str(tac[1]) == f"x {operador} 5"
+        assert TACInterpreter().interpret(tac) == esperado
+        assert TACInterpreter().interpret(TACOptimizer().optimize(tac)) == esperado
+
+    def test_el_acumulador_no_usa_temporal_ni_copia(self):
+        tac = generar_tac(self.ACUMULADOR)
+        update = next(instr for instr in tac if instr.op == OpCode.ADD_INPLACE)
+
+        assert (update.arg1, update.result) == ('t0', 'suma')
+        assert not any(instr.op == OpCode.ASSIGN and instr.result == 'suma' and instr.arg1 == 't0' for instr in tac)
+        assert TACInterpreter().interpret(tac) == "20"
+
+    def test_diagnosticos_como_la_operacion_binaria(self):
+        code = "n += 1\ns = 'a'\ns -= 1\nk = 4\nk /= 2"
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse(code))
+        generator = SemanticTACGenerator()
+        generator.generate(parse(code))
+
+        assert [record.code for record in analyzer.error_records] == \
+            ['variable_no_declarada', 'operando_izquierdo_no_numerico']
+        assert [record.code for record in analyzer.warning_records] == ['division_por_cero', 'cambio_de_tipo']
+        assert analyzer.symbol_table['k']['type'] == 'float'
+        assert list(generator.analyzer.errors) == list(analyzer.errors)
+        assert list(generator.analyzer.warnings) == list(analyzer.warnings)
+
+    def test_optimizador_fusiona_la_copia_solo_si_el_temporal_muere(self):
+        code = "i = 0\nwhile i < 3:\n    i = i + 1\nprint(i)"
+        optimized = TACOptimizer().optimize(generar_tac(code))
+        assert 'i += 1' in [str(instr) for instr in optimized]
+
+        tac = [
+            TACInstruction('ADD', 'i', 1, 't0'), TACInstruction('ASSIGN', 't0', None, 'i'),
+            TACInstruction('PRINT', 't0'),
+        ]
+        assert TACOptimizer().fuse_inplace(tac) == tac
+
+    def test_manejador_numerico_en_el_interprete(self):
+        # Con un número de vueltas constante el bucle se evalúa al compilar
+        code = self.ACUMULADOR.replace("range(5)", "range(len(datos))")
+        tac = TACOptimizer().optimize(generar_tac("datos = [1, 2, 3, 4, 5]\n" + code))
+        interpreter = TACInterpreter()
+
+        assert interpreter.interpret(tac) == "20"
+        update = next(instr for instr in tac if instr.op == OpCode.ADD_INPLACE)
+        assert update.types == ('int', None, 'int')
+        assert interpreter.select_handler(update).__name__ == 'inplace'
+
+    def test_ssa_y_ensamblador(self):
+        tac = generar_tac(self.ACUMULADOR)
+        ssa = to_ssa(tac)
+
+        assert ssa.verify() == []
+        assert 'suma.3 = suma.2 + t0.1' in [str(instr) for instr in ssa.instructions()]
+        assert [str(instr) for instr in from_ssa(ssa)] == [str(instr) for instr in tac]
+
+        asm = MachineCodeGenerator().generate(tac)
+        assert any(line.split()[0] == 'ADD' and line.split()[1] == line.split()[2] for line in asm if line.strip())
+
+    def test_reasignar_con_operador_invalida_el_rango(self):
+        code = "lista = [4, 5, 6]\nfor i in range(len(lista)):\n    i += 1\n    print(lista[i])"
+        ast = parse(code)
+        SemanticAnalyzer().analyze(ast)
+
+        assert not any(instr.in_bounds for instr in TACGenerator().generate(ast))
+
+
+# ============= OPERADORES LÓGICOS =============
+
+class TestOperadoresLogicos:
+    """and, or y not con evaluación en cortocircuito mediante saltos"""
+
+    EXPRESIONES = [
+        'a and b', 'a or b', 'not a', 'a < b and b < c', 'a > b or not c',
+        'not a < b and c', 'a and b or c', 'a or b and not c',
+    ]
+
+    @pytest.mark.parametrize('expresion', EXPRESIONES)
+    @pytest.mark.parametrize('a, b, c', [(0, 1, 2), (3, 0, 0), (1, 2, 0), (2, 2, 5)])
+    def test_valor_y_condicion_como_python(self, expresion, a, b, c):
+        code = f"a = {a}\nb = {b}\nc = {c}\nprint({expresion})\nif {expresion}:\n    print(1)\nelse:\n    print(0)"
+        valor = eval(expresion, {'a': a, 'b': b, 'c': c})
+        esperado = f"{valor}\n{1 if valor else 0}"
+        tac = generar_tac(code)
+
+        assert TACInterpreter().interpret(tac) == esperado
+        assert TACInterpreter().interpret(TACOptimizer().optimize(tac)) == esperado
+
+    def test_precedencia(self):
+        expr = parse("x = not a == b or c and d").statements[0].expression
+
+        assert (type(expr).__name__, expr.operator) == ('BoolOpNode', 'or')
+        assert (expr.left.operator, expr.left.operand.operator) == ('not', '==')
+        assert (type(expr.right).__name__, expr.right.operator) == ('BoolOpNode', 'and')
+
+    def test_el_operando_derecho_solo_se_evalua_si_hace_falta(self):
+        code = "lista = []\nif len(lista) > 0 and lista[0] == 1:\n    print(1)\nvacia = len(lista) == 0 or lista[0]\nprint(vacia)"
+        assert TACInterpreter().interpret(generar_tac(code)) == "True"
+
+    def test_cabecera_de_bucle_con_un_salto_por_operando(self):
+        code = "i = 0\nn = 5\nx = 3\nwhile i < n and x != 0:\n    i += 1\n    x -= 1\nj = 0\nwhile j < 2 or j == 7:\n    j += 1"
+        tac = generar_tac(code)
+        optimized = [str(instr) for instr in TACOptimizer().optimize(tac)]
+
+        # La condición no materializa su valor: cada comparación va a su salto
+        assert not any(instr.op in (OpCode.ASSIGN, OpCode.NOT) and isinstance(instr.result, Temp) for instr in tac)
+        assert optimized[3:5] == ['if i >= 5 goto L1', 'if x == 0 goto L1']
+        header = optimized.index('L2:')
+        assert optimized[header + 1:header + 4] == ['if j < 2 goto L4', 'if j != 7 goto L3', 'L4:']
+
+    def test_tipos_y_diagnosticos_en_la_pasada_unica(self):
+        code = "b = 1 < 2 and 3 > 2\nm = 1 and 'a'\nw = not 5\nif x and b + 'a':\n    print(1)"
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(parse(code))
+        generator = SemanticTACGenerator()
+        generator.generate(parse(code))
+
+        tipos = {name: info['type'] for name, info in analyzer.symbol_table.items()}
+        assert tipos == {'b': 'bool', 'm': 'unknown', 'w': 'bool'}
+        assert [record.code for record in analyzer.error_records] == \
+            ['variable_no_declarada', 'concatenacion_invalida']
+        assert list(generator.analyzer.errors) == list(analyzer.errors)
+        assert generator.symbol_table == analyzer.symbol_table
+
+    def test_ensamblador(self):
+        code = "a = 1\nb = 0\nc = not a\nif a < 1 or b:\n    print(c)"
+        asm = MachineCodeGenerator().generate(generar_tac(code))
+
+        assert any(line.startswith('    MOVEQ') for line in asm)
+        assert any(line.startswith('    BNE') for line in asm)
+
+
+# ============= GESTOR DE PASADAS =============
+
+class TestGestorDePasadas:
+    """Niveles de optimización, indicadores de cambio y lista de bloques sucios"""
+
+    def test_niveles_de_optimizacion(self):
+        code = "datos = [1, 2, 3, 4]\nx = len(datos)\ny = x * 1\nz = 2 + 3\nwhile y < 9:\n    y = y + 1\n    print(z)"
+        tac = generar_tac(code)
+        salida = TACInterpreter().interpret(tac)
+        optimizados = {}
+        for level in (0, 1, 2):
+            optimized = TACOptimizer(level).optimize(tac)
+            assert TACInterpreter().interpret(optimized) == salida
+            assert all(instr.types is not None for instr in optimized)
+            optimizados[level] = [str(instr) for instr in optimized]
+
+        assert optimizados[0] == [str(instr) for instr in tac]
+        # -O1 pliega constantes pero no aplica las reglas que dependen de tipos ni fusiona saltos
+        assert 'print(5)' in optimizados[1] and 't0 = x * 1' in optimizados[1]
+        assert 'y = x' in optimizados[2] and 'y += 1' in optimizados[2]
+        assert not any(line.startswith('if_false') for line in optimizados[2])
+        with pytest.raises(ValueError):
+            TACOptimizer(3)
+
+    def test_estadisticas_por_pasada(self):
+        tac = generar_tac("datos = [1]\na = 2 * 3\nb = a * len(datos)\nif b > 5:\n    print(b)\nelse:\n    print(a)")
+        optimizer = TACOptimizer()
+        optimized = optimizer.optimize(tac)
+        stats = optimizer.pass_stats
+
+        assert list(stats) == [name for stage in OPTIMIZATION_LEVELS[2] for name in stage]
+        assert sum(s.changes for s in stats.values()) == optimizer.change_count
+        assert sum(s.delta for s in stats.values()) == len(optimized) - len(tac)
+        # Una reescritura que no reduce el número de instrucciones también es un cambio
+        assert stats['constant_folding'].changes == 1 and stats['constant_folding'].delta == 0
+        report = optimizer.get_pass_report()
+        assert report.startswith('Nivel de optimización: -O2')
+        assert 'fuse_branches: 1 ejecuciones, 1 cambios, -1 instrucciones' in report
+
+    def test_solo_se_revisan_los_bloques_modificados(self):
+        tac = [TACInstruction('MUL', '2', '3', 't0'), TACInstruction('PRINT', 'y')]
+        for i in range(30):
+            tac += [TACInstruction('LABEL', f'L{i}'), TACInstruction('PRINT', f'x{i}')]
+        optimizer = TACOptimizer()
+        optimized = optimizer.optimize(tac)
+
+        # El plegado deja t0 = 6 sin usar; la segunda ronda solo revisa ese bloque
+        assert [str(instr) for instr in optimized[:3]] == ['print(y)', 'L0:', 'print(x0)']
+        assert optimizer.rounds == 2
+        assert optimizer.pass_stats['constant_folding'].runs == len(build_cfg(tac).blocks) + 2
+        # Sin cambios locales en la segunda ronda no se repiten las pasadas globales
+        assert optimizer.pass_stats['dead_code_elimination'].runs == 1
+
+    def test_saltos_encadenados_en_una_pasada(self):
+        tac = [TACInstruction('GOTO', 'L0'), TACInstruction('GOTO', 'L0'), TACInstruction('LABEL', 'L0'),
+               TACInstruction('PRINT', '1')]
+        optimizer = TACOptimizer()
+
+        assert [str(instr) for instr in optimizer.eliminate_dead_jumps(tac)] == ['L0:', 'print(1)']
+        assert optimizer.change_count == 2
+
+
+# ============= CÓDIGO MUERTO POR VIVACIDAD =============
+
+class TestCodigoMuertoPorVivacidad:
+    """Eliminación de definiciones muertas con vivacidad fuerte en conjuntos de bits"""
+
+    def test_elimina_variables_del_programa_sin_lecturas(self):
+        # Cadenas: un número se propagaría hasta el print
+        assert optimizar('x = "a"\nx = "b"\nprint(x)\nx = "c"') == ['x = "b"', 'print(x)']
+        # Un contador que solo se lee a sí mismo también muere
+        optimized = optimizar("c = 0\ni = 0\nwhile i < 3:\n    c = c + 1\n    i = i + 1\nprint(i)")
+        assert not any('c' in line.split() for line in optimized)
+        assert 'i += 1' in optimized
+
+    def test_las_funciones_leen_el_marco_del_llamador(self):
+        code = 'g = "u"\ndef f(a):\n    h = a * 2\n    return a + g\nx = 9\ng = "v"\nprint(f("w"))'
+        optimized = optimizar(code)
+
+        assert 'g = "v"' in optimized and 'g = "u"' not in optimized and 'x = 9' not in optimized
+        assert not any(line.startswith('h =') for line in optimized)
+
+    def test_conserva_definiciones_con_efectos(self):
+        code = "def f(a):\n    print(a)\n    return a\nl = [1]\ny = 0\nr = f(2)\nq = 4 / y\nw = l[3]\nz = 4 / 2"
+        tac = generar_tac(code)
+        # En -O1: -O2 integraría la función en el punto de llamada
+        optimized = [str(instr) for instr in TACOptimizer(1).optimize(tac)]
+
+        assert 't0 = call f, 1' in optimized
+        # y se propaga, pero la división por cero no se pliega
+        assert 't0 = 4 / 0' in optimized and 't0 = l[3]' in optimized
+        assert not any(line.startswith('z =') or line == 't0 = 2.0' for line in optimized)
+
+    def test_cadena_larga_en_una_pasada(self):
+        n = 20000
+        chain = [TACInstruction('ASSIGN', '1', None, 't0')]
+        chain += [TACInstruction('ADD', f't{i}', '1', f't{i + 1}') for i in range(n)]
+        live = chain + [TACInstruction('PRINT', f't{n}')]
+        optimizer = TACOptimizer()
+
+        # Viva entera si se imprime su final; muerta entera (salvo t0) si no
+        assert optimizer.dead_code_elimination(live) is live
+        dead = optimizer.dead_code_elimination(chain + [TACInstruction('PRINT', 't0')])
+        assert [str(instr) for instr in dead] == ['t0 = 1', 'print(t0)']
+        assert optimizer.counts == {'Código muerto eliminado': n}
+
+
+# ============= NUMERACIÓN DE VALORES =============
+
+class TestNumeracionDeValores:
+    """Subexpresiones comunes: numeración local por bloque y global por dominadores"""
+
+    def contar(self, optimized, expression):
+        return sum(1 for line in optimized if line.endswith(f'= {expression}'))
+
+    def test_local_en_un_bloque(self):
+        tac = [TACInstruction('ADD', 'i', '1', 't0'), TACInstruction('ASSIGN', 't0', None, 'x'),
+               TACInstruction('MUL', 'precio', 'cantidad', 't1'), TACInstruction('ADD', 'i', '1', 't2'),
+               TACInstruction('MUL', 'cantidad', 'precio', 't3'), TACInstruction('ASSIGN', 'x', None, 'i'),
+               TACInstruction('ADD', 'i', '1', 't4')]
+        optimized = [str(instr) for instr in TACOptimizer().local_value_numbering(tac)]
+
+        # Tras redefinir i, i + 1 es otro valor
+        assert optimized == ['t0 = i + 1', 'x = t0', 't1 = precio * cantidad', 't2 = t0', 't3 = t1', 'i = x',
+                             't4 = i + 1']
+
+    def test_global_por_dominadores(self):
+        code = "datos = [3, 4]\na = datos[0]\nb = datos[1]\nx = a * b\nif x > 5:\n    y = b * a\n    print(y)\nelse:\n    print(a - b)\n" \
+               "z = a - b\nprint(z + a * b)"
+        optimizer = TACOptimizer()
+        optimized = optimizar(code, optimizer=optimizer)
+
+        # a * b domina a las demás; a - b de la rama else no domina a la del final
+        assert self.contar(optimized, 'a * b') == 1
+        assert self.contar(optimized, 'a - b') == 2
+        assert 'Instrucciones redundantes eliminadas: 2' in optimizer.get_optimizations_report()
+        # -O1 solo numera dentro de cada bloque
+        optimized = optimizar(code, level=1)
+        assert self.contar(optimized, 'a * b') == 2 and self.contar(optimized, 'b * a') == 1
+
+    def test_len_y_modificaciones(self):
+        code = "l = [1, 2]\nn = len(l) + len(l)\nl.append(3)\nm = len(l)\nif n > 1:\n    print(len(l))\n" \
+               "print(n)\nprint(m)"
+        optimized = optimizar(code)
+
+        # Tras append la longitud cambia; con append en el programa len no se numera entre bloques
+        assert self.contar(optimized, 'len(l)') == 3
+
+    def test_suma_no_conmutativa(self):
+        optimized = optimizar("a = 'x'\nb = 'y'\nprint(a + b)\nprint(b + a)\nprint(a + b)")
+
+        assert self.contar(optimized, 'a + b') == 1 and self.contar(optimized, 'b + a') == 1
+
+    def test_temporales_sin_versiones_ssa(self):
+        code = "i = 0\nwhile i < 4:\n    j = i + 1\n    print(j * 2)\n    print((i + 1) * 2)\n    i = i + 1"
+        optimized = optimizar(code)
+
+        assert self.contar(optimized, 'i + 1') == 1
+        assert not any('.' in line for line in optimized)
+
+
+# ============= MOVIMIENTO DE CÓDIGO INVARIANTE =============
+
+class TestCodigoInvariante:
+    """Instrucciones invariantes de los bucles movidas al preencabezado"""
+
+    def cuerpo(self, optimized, label):
+        """Instrucciones entre la etiqueta del bucle y su salto de vuelta"""
+        start = optimized.index(f'{label}:')
+        return optimized[start:optimized.index(f'goto {label}', start)]
+
+    def test_limite_len_y_aritmetica(self):
+        code = "l = [1, 2, 3]\na = len(l) + 1\nb = len(l) + 2\ni = 0\ns = 0\nwhile i < len(l):\n    s = s + a * b\n    i += 1\nprint(s)"
+        optimizer = TACOptimizer()
+        optimized = optimizar(code, optimizer=optimizer)
+
+        body = self.cuerpo(optimized, 'L0')
+        assert not any('len(l)' in line or 'a * b' in line for line in body)
+        assert body[1:] == ['if i >= t2 goto L1', 's += t0', 'i += 1']
+        assert 'Movimiento de código invariante' in optimizer.get_optimizations_report()
+
+    def test_bucles_anidados(self):
+        code = "l = [2, 3]\na = len(l)\nb = len(l) + 1\nfor i in range(30):\n    for j in range(20):\n        print(a * b + i * j)"
+        optimized = optimizar(code)
+
+        # a * b sale del bucle interno y luego del externo
+        hoisted = next(i for i, line in enumerate(optimized) if line.endswith('= a * b'))
+        assert hoisted < optimized.index('L0:')
+
+    def test_bloque_vaciado_por_el_bucle_interno(self):
+        # Lo que sale del segundo while deja vacío un bloque que sigue dentro
+        # del for; las salidas del for se calculan después de ese movimiento
+        code = "def f0(a, b):\n    return a + b\ndef f1(a, b):\n    return a * b\nb = 2\nc = 3\nq = 0\nw = 0\n" \
+               "for i in range(3):\n    while q < 4:\n        q += 1\n" \
+               "    while w < 2 and (4 <= (c != b) or (c != 5)):\n        w = w + 1\n" \
+               "    print(f1(b - 1, 5 - i) * f0(4, b))"
+        optimized = TACOptimizer(2).optimize(generar_tac(code))
+
+        assert TACInterpreter().interpret(optimized).split() == ['30', '24', '18']
+
+    def test_len_con_la_lista_modificada(self):
+        code = "l = [1]\ni = 0\nwhile i < len(l):\n    if i < 3:\n        l.append(i)\n    i += 1\nprint(i)"
+        optimized = optimizar(code)
+
+        assert any('len(l)' in line for line in self.cuerpo(optimized, 'L0'))
+
+    def test_no_se_mueve_lo_que_puede_fallar(self):
+        # Si el bucle no da vueltas, x / d (d puede ser 0) y v * 2 (v puede no
+        # estar definida) no se ejecutan: no pueden salir del bucle
+        code = "l = [0]\nd = l[0]\nx = 4\nc = d > 2\nif c:\n    v = 2\ni = 0\nwhile i < d:\n    print(x / d)\n" \
+               "    print(v * 2)\n    i += 1\nprint(i)"
+        optimized = optimizar(code)
+
+        body = self.cuerpo(optimized, 'L2')
+        assert any('4 / d' in line for line in body) and any('v * 2' in line for line in body)
+
+    def test_variable_leida_antes_de_definirse(self):
+        code = "a = 1\nb = 2\ni = 0\ny = 0\nwhile i < 3:\n    print(y)\n    y = a + b\n    i += 1"
+        optimized = optimizar(code)
+
+        # y se lee antes de su definición en cada vuelta: el valor de la vuelta
+        # anterior no es el del preencabezado
+        assert any(line.startswith('y = ') for line in self.cuerpo(optimized, 'L0'))
+
+
+# ============= VARIABLES DE INDUCCIÓN Y DESENROLLADO =============
+
+class TestInduccionYDesenrollado:
+    """Productos de variables de inducción como sumas y desenrollado de bucles for"""
+
+    def test_producto_por_constante_en_un_while(self):
+        optimized = optimizar("i = 0\ns = 0\nwhile i < 30:\n    s = s + i * 7\n    i += 2\nprint(s)")
+
+        body = optimized[optimized.index('L0:'):]
+        assert not any('* 7' in line for line in body)
+        assert any(line.endswith('+= 14') for line in body)
+
+    def test_producto_por_invariante_en_un_for(self):
+        optimized = optimizar("l = [3]\nn = len(l) + 2\nfor k in range(1, 90):\n    print(k * n)")
+
+        # Tras la reducción el cuerpo no lee k y el bucle también se desenrolla
+        assert not any(line.endswith('k * n') or line.endswith('n * k') for line in optimized)
+        assert any(line.endswith('+= n') for line in optimized)
+        assert '_it0 = range(1, 81, 16)' in optimized
+
+    def test_desenrollado_completo(self):
+        optimized = optimizar("for k in range(4):\n    print(k * 10)\nprint(1)")
+
+        assert not any('next(' in line or 'range(' in line or 'goto' in line for line in optimized)
+
+    def test_la_variable_se_asigna_si_se_lee_despues(self):
+        optimized = optimizar("for k in range(3):\n    print(k)\nprint(k)")
+
+        # La última vuelta asigna k y la propagación lleva su valor al print final
+        assert optimized == ['print(0)', 'print(1)', 'print(2)', 'print(2)']
+
+    def test_desenrollado_parcial_con_resto(self):
+        optimized = optimizar("c = 0\nfor r in range(100):\n    c += 2\nprint(c)")
+
+        # 32 copias por vuelta en tres vueltas y las 4 restantes tras el bucle
+        assert '_it0 = range(0, 96, 32)' in optimized
+        assert optimized.count('c += 2') == 36
+
+    def test_cuerpo_que_no_cabe_en_el_presupuesto(self):
+        optimized = optimizar("for k in range(100):\n    print(k)")
+
+        assert '_it0 = range(0, 100, 1)' in optimized and 'goto L0' in optimized
+
+
+# ============= INTEGRACIÓN DE FUNCIONES =============
+
+class TestIntegracionFunciones:
+    """Integración de funciones pequeñas en sus puntos de llamada"""
+
+    def test_funcion_pequena_integrada(self):
+        code = "def f(x, y):\n    z = x * 2 + y\n    return z\nl = [7]\na = l[0]\nprint(f(a, 1))"
+        optimized = optimizar(code)
+
+        assert not any('call' in line or 'func_f' in line for line in optimized)
+        # Los parámetros copiados (x_1 = a, y_1 = 1) se propagan al cuerpo integrado
+        assert 't2 = a * 2' in optimized and 'z_1 = t2 + 1' in optimized
+
+    def test_funcion_recursiva_conservada(self):
+        optimized = optimizar(
+            "def fib(n):\n    if n < 2:\n        return n\n    return fib(n - 1) + fib(n - 2)\nprint(fib(10))"
+        )
+
+        assert 'func_fib:' in optimized
+        assert sum('call fib' in line for line in optimized) == 3
+
+    def test_integracion_de_abajo_arriba(self):
+        optimized = optimizar(
+            "def sq(x):\n    return x * x\ndef sumsq(a, b):\n    return sq(a) + sq(b)\n"
+            "t = 0\nfor i in range(50):\n    t = t + sumsq(i, 2)\nprint(t)"
+        )
+
+        # sumsq llama a sq: se integra cuando sq ya está integrada en ella
+        assert not any('call' in line or 'func_' in line for line in optimized)
+
+    def test_lectura_del_llamador_antes_de_definir(self):
+        # v se lee del marco del llamador si x <= 3: el renombrado lo cambiaría
+        optimized = optimizar("v = 10\ndef g(x):\n    if x > 3:\n        v = x\n    return v + x\nprint(g(2))")
+
+        assert 'func_g:' in optimized and any('call g' in line for line in optimized)
+
+    def test_funcion_grande_con_varias_llamadas(self):
+        body = ''.join(f"    x += {k}\n" for k in range(20))
+        code = f"def f(x):\n{body}    return x\nprint(f(1))\n"
+
+        assert any('call f' in line for line in optimizar(code + "print(f(2))"))
+        # Con una sola llamada el código no crece: se integra aunque no quepa
+        assert not any('call f' in line or 'func_f' in line for line in optimizar(code))
+
+    def test_return_sin_valor(self):
+        optimized = optimizar("def p(x):\n    print(x)\n    return\np(3)\np(4)")
+
+        assert optimized == ['print(3)', 'print(4)']
+
+
+# ============= RECURSIÓN DE COLA =============
+
+class TestRecursionDeCola:
+    """Recursión de cola como bucles, acumuladores y llamadas de cola en el intérprete"""
+
+    def eliminar(self, code):
+        tac = generar_tac(code)
+        optimized = TACOptimizer().eliminate_tail_recursion(tac)
+        assert TACInterpreter().interpret(optimized) == TACInterpreter().interpret(tac)
+        return tac, [str(instr) for instr in optimized]
+
+    def test_llamada_de_cola_a_si_misma(self):
+        _, optimized = self.eliminar(
+            "def mcd(a, b):\n    if b == 0:\n        return a\n    return mcd(b, a % b)\nprint(mcd(1071, 462))"
+        )
+
+        assert sum('call mcd' in line for line in optimized) == 1
+        # a toma el valor de b antes de que b cambie: no hace falta un temporal
+        loop = optimized.index('L2:')
+        assert optimized[loop - 1] == 'enter (a, b), 0'
+        assert optimized[-8:-5] == ['a = b', 'b = t0', 'goto L2']
+
+    def test_acumulador_en_recursion_lineal(self):
+        _, optimized = self.eliminar(
+            "def factorial(n):\n    if n == 0:\n        return 1\n    temp = n - 1\n"
+            "    result = factorial(temp)\n    return n * result\nprint(factorial(5))\nprint(factorial(0))"
+        )
+
+        assert sum('call factorial' in line for line in optimized) == 2
+        assert 't1 = 1' in optimized and 't1 = t1 * n' in optimized and 'return t1' in optimized
+
+    def test_acumulador_solo_con_enteros(self):
+        # Reasociar productos de float o concatenar en otro orden cambiaría el resultado
+        potencia = "def p(x, n):\n    if n == 0:\n        return 1\n    return x * p(x, n - 1)\nprint(p(1.1, 7))"
+        repetir = "def r(w, n):\n    if n == 0:\n        return ''\n    return w + r(w, n - 1)\nprint(r('ab', 3))"
+
+        for code in (potencia, repetir):
+            tac, optimized = self.eliminar(code)
+            assert optimized == [str(instr) for instr in tac]
+
+    def test_recursion_profunda_en_memoria_constante(self):
+        code = "def s(n):\n    if n == 0:\n        return 0\n    return n + s(n - 1)\nprint(s(100000))"
+        optimized = TACOptimizer().optimize(generar_tac(code))
+
+        assert not any(instr.op == OpCode.CALL for instr in optimized)
+        assert TACInterpreter().interpret(optimized) == str(100000 * 100001 // 2)
+
+    def test_llamadas_de_cola_en_el_interprete(self):
+        code = ("def par(n):\n    if n == 0:\n        return 1\n    return impar(n - 1)\n"
+                "def impar(n):\n    if n == 0:\n        return 0\n    return par(n - 1)\nprint(par(20001))")
+        tac = generar_tac(code)
+        depths = []
+
+        class Interprete(TACInterpreter):
+            def exec_ENTER(self, instr):
+                depths.append(len(self.call_stack))
+                super().exec_ENTER(instr)
+
+        assert Interprete().interpret(tac) == "0"
+        # Cada función ocupa el marco de la que la llamó en posición de cola
+        assert max(depths) == 1
+
+    def test_funcion_sin_valor_no_es_llamada_de_cola(self):
+        tac = generar_tac("def v(n):\n    if n == 0:\n        return\n    return v(n - 1)\nx = v(3)\nprint(1)")
+        interpreter = TACInterpreter()
+        interpreter.interpret(tac)
+
+        assert interpreter.tail_calls(tac) == []
+        assert TACOptimizer().eliminate_tail_recursion(tac) is tac
+
+
+# ============= PROPAGACIÓN CONDICIONAL DE CONSTANTES =============
+
+class TestPropagacionCondicional:
+    """Propagación de constantes y copias sobre la forma SSA con aristas ejecutables"""
+
+    def test_programa_constante_queda_en_prints(self):
+        code = "x = 3\ny = x * 2\nif y > 5:\n    print(y)\nelse:\n    print(0)\nz = y - 1\nprint(z)"
+
+        assert optimizar(code) == ['print(6)', 'print(5)']
+        assert optimizar(code, level=1) == ['print(6)', 'print(5)']
+
+    def test_valores_que_cambian_en_un_bucle(self):
+        bucle = "l = [1, 2, 3]\nx = 1\ni = 0\nwhile i < len(l):\n    print(x)\n    x = {}\n    i += 1"
+
+        # x vale 1 en la primera vuelta y 2 en las siguientes: no es constante
+        assert 'print(x)' in optimizar(bucle.format(2))
+        # Si todas las definiciones que llegan valen lo mismo, sí lo es
+        assert 'print(1)' in optimizar(bucle.format(1))
+
+    def test_rama_nunca_ejecutada(self):
+        code = "l = [1, 2, 3]\nflag = 0\ni = 0\nwhile i < len(l):\n    if flag == 1:\n        flag = 2\n" \
+               "    i += 1\nprint(flag)"
+        optimized = optimizar(code)
+
+        # La rama que cambiaría flag no es alcanzable porque flag nunca vale 1
+        assert optimized[-1] == 'print(0)' and not any('flag' in line for line in optimized)
+
+    def test_division_por_cero_no_se_pliega(self):
+        tac = TACOptimizer().optimize(generar_tac("x = 0\ny = 4 / x\nprint(y)"))
+
+        assert 'y = 4 / 0' in [str(instr) for instr in tac]
+        with pytest.raises(Exception, match="División por cero"):
+            TACInterpreter().interpret(tac)
+
+    def test_propagacion_de_copias(self):
+        optimized = optimizar("l = [1]\na = len(l)\nb = a\nprint(b + 1)")
+        assert 'b = a' not in optimized and 't0 = a + 1' in optimized
+
+        # Tras redefinir a, b ya no es una copia de su valor vigente
+        optimized = optimizar("l = [1]\na = len(l)\nb = a\na = len(l) + 1\nprint(b)\nprint(a)")
+        assert 'print(b)' in optimized
+
+    def test_funciones_y_propagacion_local(self):
+        optimized = optimizar("g = 2\ndef f(a):\n    return a + g\nprint(f(1))", level=1)
+        # Los parámetros y las variables del llamador no son constantes dentro de la función
+        assert 't0 = a + g' in optimized
+
+        tac = [TACInstruction('ASSIGN', '1', None, 'x'), TACInstruction('PRINT', 'x'),
+               TACInstruction('LABEL', 'L0'), TACInstruction('PRINT', 'x')]
+        optimized = [str(instr) for instr in TACOptimizer().constant_propagation(tac)]
+        # La propagación local se detiene en cada etiqueta
+        assert optimized == ['x = 1', 'print(1)', 'L0:', 'print(x)']
+
+
+# ============= MIRILLA =============
+
+class TestMirilla:
+    """Reglas de mirilla sobre ventanas de instrucciones del TAC y del ensamblador"""
+
+    def test_saltos_encaminados_al_final_de_la_cadena(self):
+        tac = [TACInstruction('IF_FALSE', 'c', 'L0'), TACInstruction('PRINT', '1'), TACInstruction('GOTO', 'L1'),
+               TACInstruction('LABEL', 'L0'), TACInstruction('GOTO', 'L1'),
+               TACInstruction('LABEL', 'L2'), TACInstruction('GOTO', 'L2'),
+               TACInstruction('LABEL', 'L1'), TACInstruction('GOTO', 'L2')]
+        optimized = [str(instr) for instr in TACOptimizer().eliminate_dead_jumps(tac)]
+
+        # L0 lleva a L1 y L1 a L2, que es un ciclo de goto y no se encamina; los
+        # goto L2 encaminados quedan justo antes de la etiqueta y sobran
+        assert optimized == ['if_false c goto L2', 'print(1)', 'L0:', 'L2:', 'goto L2', 'L1:', 'goto L2']
+
+    def test_fusion_de_copias(self):
+        tac = [TACInstruction('ADD', 'a', '1', 't0'), TACInstruction('ASSIGN', 't0', None, 'x'),
+               TACInstruction('SUB', 'a', '1', 't1'), TACInstruction('ASSIGN', 't1', None, 'y'),
+               TACInstruction('PRINT', 't1'), TACInstruction('PRINT', 'x')]
+        optimizer = TACOptimizer(record_events=True)
+        optimized = [str(instr) for instr in optimizer.fuse_inplace(tac)]
+
+        # t1 sigue vivo tras la copia: no se funde
+        assert optimized == ['x = a + 1', 't1 = a - 1', 'y = t1', 'print(t1)', 'print(x)']
+        assert optimizer.optimizations_applied == ['Fusión de copias: t0 = a + 1; x = t0 -> x = a + 1']
+
+    def test_ensamblador(self):
+        code = "l = [3]\nx = l[0]\ny = x * 8\nprint(y)"
+        generator = MachineCodeGenerator()
+        asm = generator.generate(TACOptimizer().optimize(generar_tac(code)))
+        lines = [line.split(None, 1) for line in asm if line.strip()]
+
+        assert not any(parts[0] == 'MOV' and parts[1].split(', ')[0] == parts[1].split(', ')[1]
+                       for parts in lines if len(parts) == 2)
+        assert not any(parts[0] == 'MUL' for parts in lines)
+        assert any(line.startswith('    LSL') and line.endswith('#3') for line in asm)
+        # Tras guardar x se reutiliza su registro en lugar de volver a cargarlo
+        store = next(i for i, line in enumerate(asm) if line.startswith('    STR'))
+        assert not asm[store + 1].startswith('    LDR')
+        assert generator.peephole_rewrites
+
+    def test_ventana_maxima(self):
+        with pytest.raises(ValueError):
+            PeepholeRule(('MOV', 'MOV', 'MOV', 'MOV'), '_redundant_move', "Movimiento redundante eliminado")
+        with pytest.raises(ValueError):
+            PeepholeRule(('MOV', None), '_redundant_move', "Movimiento redundante eliminado")
+
+
+# ============= EVENTOS DE OPTIMIZACIÓN =============
+
+class TestEventosDeOptimizacion:
+    """Contadores por tipo siempre activos y eventos detallados a petición"""
+
+    CODIGO = "datos = [1]\na = len(datos)\nb = a * 1\nc = a * 1\nprint(b + c)"
+
+    def test_contadores_sin_eventos(self):
+        optimizer = TACOptimizer()
+        optimizer.optimize(generar_tac(self.CODIGO))
+
+        assert optimizer.events == [] and optimizer.optimizations_applied == []
+        assert optimizer.change_count == sum(optimizer.counts.values()) > 0
+        report = optimizer.get_optimizations_report()
+        assert f"Reducción de fuerza: {optimizer.counts['Reducción de fuerza']}" in report
+        assert report.endswith(f"Total de optimizaciones: {optimizer.change_count}\n")
+
+    def test_eventos_con_referencias(self):
+        optimizer = TACOptimizer(record_events=True)
+        optimizer.optimize(generar_tac(self.CODIGO))
+
+        assert len(optimizer.events) == optimizer.change_count
+        event = next(event for event in optimizer.events if event.kind == 'Reducción de fuerza')
+        # El evento guarda las instrucciones, no su texto
+        assert event.pass_name == 'strength_reduction' and event.index is not None
+        assert str(event.before) == 't0 = a * 1' and str(event.after) == 't0 = a'
+        assert str(event) == 'Reducción de fuerza: t0 = a * 1 -> t0 = a'
+        assert '  - Reducción de fuerza: t0 = a * 1 -> t0 = a' in optimizer.get_optimizations_report()
+
+    def test_texto_formado_al_mostrarlo(self):
+        instr = TACInstruction('ADD', 'x', '0', 't0')
+        event = OptimizationEvent('Código muerto eliminado', 'dead_code_elimination', None, instr, None,
+                                  "{before} ({0})", ('prueba',))
+
+        assert str(event) == 'Código muerto eliminado: t0 = x + 0 (prueba)'
+        assert TACOptimizer().get_optimizations_report() == "No se aplicaron optimizaciones."
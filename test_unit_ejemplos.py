@@ -6,7 +6,7 @@ Tests specific functionality for each of the 4 examples
 import pytest
 from python_compiler import Lexer, Parser, TokenType, LexerError, ParserError
 from semantic_analyzer import SemanticAnalyzer, SemanticError
-from tac_generator import TACGenerator
+from tac_generator import TACGenerator, OpCode
 from tac_optimizer import TACOptimizer
 from machine_code_generator import MachineCodeGenerator
 
@@ -87,22 +87,22 @@ class TestEjemplo1Estudiantes:
         tac_ops = [instr.op for instr in tac_instructions]
         
         # Should have LIST_CREATE for empty list initialization
-        assert 'LIST_CREATE' in tac_ops, "Should have LIST_CREATE for list initialization"
+        assert OpCode.LIST_CREATE in tac_ops, "Should have LIST_CREATE for list initialization"
         
         # Should have LIST_APPEND for append operations
-        list_appends = [instr for instr in tac_instructions if instr.op == 'LIST_APPEND']
+        list_appends = [instr for instr in tac_instructions if instr.op == OpCode.LIST_APPEND]
         assert len(list_appends) >= 9, f"Should have at least 9 LIST_APPEND operations (3 per list), found {len(list_appends)}"
         
         # Should have LIST_GET for index access (read operations)
-        list_gets = [instr for instr in tac_instructions if instr.op == 'LIST_GET']
+        list_gets = [instr for instr in tac_instructions if instr.op == OpCode.LIST_GET]
         assert len(list_gets) > 0, "Should have LIST_GET for reading list elements"
         
         # Should have LIST_SET for index assignment (update operations)
-        list_sets = [instr for instr in tac_instructions if instr.op == 'LIST_SET']
+        list_sets = [instr for instr in tac_instructions if instr.op == OpCode.LIST_SET]
         assert len(list_sets) >= 3, f"Should have at least 3 LIST_SET operations, found {len(list_sets)}"
         
         # Verify PRINT operations exist
-        prints = [instr for instr in tac_instructions if instr.op == 'PRINT']
+        prints = [instr for instr in tac_instructions if instr.op == OpCode.PRINT]
         assert len(prints) > 0, "Should have PRINT operations"
     
     def test_codigo_ensamblador_generado(self, ejemplo1_code):
@@ -168,19 +168,19 @@ class TestEjemplo2Inventario:
         tac_ops = [instr.op for instr in tac_instructions]
         
         # Should have ADD operations
-        assert 'ADD' in tac_ops, "Should have ADD operations"
+        assert OpCode.ADD in tac_ops, "Should have ADD operations"
         
         # Should have MUL operations
-        assert 'MUL' in tac_ops, "Should have MUL operations"
+        assert OpCode.MUL in tac_ops, "Should have MUL operations"
         
         # Should have SUB operations
-        assert 'SUB' in tac_ops, "Should have SUB operations"
+        assert OpCode.SUB in tac_ops, "Should have SUB operations"
         
         # Should have DIV operations
-        assert 'DIV' in tac_ops, "Should have DIV operations"
+        assert OpCode.DIV in tac_ops, "Should have DIV operations"
         
         # Count arithmetic operations
-        arithmetic_ops = [op for op in tac_ops if op in ['ADD', 'SUB', 'MUL', 'DIV']]
+        arithmetic_ops = [op for op in tac_ops if op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV]]
         assert len(arithmetic_ops) > 5, f"Should have multiple arithmetic operations, found {len(arithmetic_ops)}"
     
     def test_optimizacion_constantes(self, ejemplo2_code):
@@ -210,8 +210,8 @@ class TestEjemplo2Inventario:
             f"Optimized TAC should be <= original: {len(tac_optimized)} vs {len(tac_instructions)}"
         
         # Count arithmetic operations before and after
-        original_arithmetic = [instr for instr in tac_instructions if instr.op in ['ADD', 'SUB', 'MUL', 'DIV']]
-        optimized_arithmetic = [instr for instr in tac_optimized if instr.op in ['ADD', 'SUB', 'MUL', 'DIV']]
+        original_arithmetic = [instr for instr in tac_instructions if instr.op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV]]
+        optimized_arithmetic = [instr for instr in tac_optimized if instr.op in [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV]]
         
         # Optimization should reduce or maintain arithmetic operations
         assert len(optimized_arithmetic) <= len(original_arithmetic), \
@@ -338,7 +338,7 @@ class TestEjemplo3Cadenas:
         tac_instructions = tac_gen.generate(ast)
         
         # Verify len() calls are present in TAC
-        call_instructions = [instr for instr in tac_instructions if instr.op == 'CALL']
+        call_instructions = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
         len_calls = [instr for instr in call_instructions if instr.arg1 == 'len']
         
         # ejemplo3_cadenas.py has multiple len() calls
@@ -367,17 +367,17 @@ class TestEjemplo3Cadenas:
         tac_ops = [instr.op for instr in tac_instructions]
         
         # Should have comparison instructions
-        comparison_ops = ['EQ', 'NEQ', 'LT', 'GT', 'LE', 'GE']
+        comparison_ops = [OpCode.EQ, OpCode.NEQ, OpCode.LT, OpCode.GT, OpCode.LTE, OpCode.GTE]
         has_comparison = any(op in tac_ops for op in comparison_ops)
         assert has_comparison, f"Should have comparison operations. Found ops: {set(tac_ops)}"
         
         # Should have conditional jumps
-        conditional_ops = ['IF_FALSE', 'GOTO', 'LABEL']
+        conditional_ops = [OpCode.IF_FALSE, OpCode.GOTO, OpCode.LABEL]
         has_conditionals = any(op in tac_ops for op in conditional_ops)
         assert has_conditionals, "Should have conditional jump instructions"
         
         # Verify GT (greater than) for length comparisons
-        gt_ops = [instr for instr in tac_instructions if instr.op == 'GT']
+        gt_ops = [instr for instr in tac_instructions if instr.op == OpCode.GT]
         assert len(gt_ops) > 0, "Should have GT operations for length comparisons"
     
     def test_codigo_ensamblador_con_strings(self, ejemplo3_code):
@@ -466,24 +466,24 @@ class TestEjemplo4Factorial:
         tac_ops = [instr.op for instr in tac_instructions]
         
         # Should have LABEL for function definition
-        labels = [instr for instr in tac_instructions if instr.op == 'LABEL']
+        labels = [instr for instr in tac_instructions if instr.op == OpCode.LABEL]
         function_labels = [lbl for lbl in labels if lbl.arg1 == 'func_factorial']
         assert len(function_labels) > 0, "Should have LABEL for factorial function"
         
         # Should have CALL for recursive calls
-        calls = [instr for instr in tac_instructions if instr.op == 'CALL']
+        calls = [instr for instr in tac_instructions if instr.op == OpCode.CALL]
         factorial_calls = [call for call in calls if call.arg1 == 'factorial']
         assert len(factorial_calls) > 0, "Should have recursive CALL to factorial"
         
         # Should have RETURN instructions
-        returns = [instr for instr in tac_instructions if instr.op == 'RETURN']
+        returns = [instr for instr in tac_instructions if instr.op == OpCode.RETURN]
         assert len(returns) >= 2, f"Should have at least 2 RETURN instructions, found {len(returns)}"
         
         # Should have conditional logic for base case
-        assert 'IF_FALSE' in tac_ops or 'GOTO' in tac_ops, "Should have conditional jumps"
+        assert OpCode.IF_FALSE in tac_ops or OpCode.GOTO in tac_ops, "Should have conditional jumps"
         
         # Should have EQ for base case check (n == 0)
-        eq_ops = [instr for instr in tac_instructions if instr.op == 'EQ']
+        eq_ops = [instr for instr in tac_instructions if instr.op == OpCode.EQ]
         assert len(eq_ops) > 0, "Should have EQ operation for base case check"
     
     def test_stack_frames_en_ensamblador(self, ejemplo4_code):
@@ -552,20 +552,20 @@ class TestEjemplo4Factorial:
         tac_instructions = tac_gen.generate(ast)
         
         # Verify base case check (n == 0)
-        eq_ops = [instr for instr in tac_instructions if instr.op == 'EQ']
+        eq_ops = [instr for instr in tac_instructions if instr.op == OpCode.EQ]
         assert len(eq_ops) > 0, "Should have EQ operation for base case check"
         
         # Verify conditional branches for base case
-        if_false_ops = [instr for instr in tac_instructions if instr.op == 'IF_FALSE']
+        if_false_ops = [instr for instr in tac_instructions if instr.op == OpCode.IF_FALSE]
         assert len(if_false_ops) > 0, "Should have IF_FALSE for base case branching"
         
         # Verify RETURN with value 1 for base case
-        returns = [instr for instr in tac_instructions if instr.op == 'RETURN']
+        returns = [instr for instr in tac_instructions if instr.op == OpCode.RETURN]
         assert len(returns) >= 2, "Should have multiple RETURN instructions"
         
         # Verify function calls with 0 and 1
         # (these are in the test calls at the end of the file)
-        calls = [instr for instr in tac_instructions if instr.op == 'CALL' and instr.arg1 == 'factorial']
+        calls = [instr for instr in tac_instructions if instr.op == OpCode.CALL and instr.arg1 == 'factorial']
         assert len(calls) >= 4, f"Should have at least 4 factorial calls, found {len(calls)}"
 
 
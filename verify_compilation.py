@@ -5,11 +5,16 @@ Script to verify that all examples compile correctly through all phases
 from python_compiler import Lexer, Parser
 from semantic_analyzer import SemanticAnalyzer
 from tac_generator import TACGenerator
-from tac_optimizer import TACOptimizer
+from semantic_tac_generator import SemanticTACGenerator
+from tac_optimizer import TACOptimizer, OPTIMIZATION_LEVELS, DEFAULT_LEVEL
 from machine_code_generator import MachineCodeGenerator
 
-def verify_example(filepath):
-    """Verify a single example compiles through all phases"""
+def verify_example(filepath, fused=False, level=DEFAULT_LEVEL):
+    """Verify a single example compiles through all phases
+
+    With fused=True semantic analysis and TAC generation run as a single pass.
+    level selects the TAC optimization pipeline (-O0, -O1, -O2).
+    """
     print(f"\n{'='*60}")
     print(f"Verifying: {filepath}")
     print('='*60)
@@ -30,20 +35,27 @@ def verify_example(filepath):
         ast = parser.parse()
         print(f"✓ Parser: AST generated")
         
-        # Semantic analysis
-        analyzer = SemanticAnalyzer()
-        analyzer.analyze(ast)
-        print(f"✓ Semantic Analyzer: {len(analyzer.symbol_table)} variables in symbol table")
-        
-        # TAC generation
-        tac_gen = TACGenerator()
-        tac_instructions = tac_gen.generate(ast)
-        print(f"✓ TAC Generator: {len(tac_instructions)} TAC instructions generated")
+        if fused:
+            # Semantic analysis + TAC generation in one traversal
+            tac_gen = SemanticTACGenerator()
+            tac_instructions = tac_gen.generate(ast)
+            print(f"✓ Semantic Analyzer: {len(tac_gen.symbol_table)} variables in symbol table")
+            print(f"✓ TAC Generator: {len(tac_instructions)} TAC instructions generated")
+        else:
+            # Semantic analysis
+            analyzer = SemanticAnalyzer()
+            analyzer.analyze(ast)
+            print(f"✓ Semantic Analyzer: {len(analyzer.symbol_table)} variables in symbol table")
+            
+            # TAC generation
+            tac_gen = TACGenerator()
+            tac_instructions = tac_gen.generate(ast)
+            print(f"✓ TAC Generator: {len(tac_instructions)} TAC instructions generated")
         
         # TAC optimization
-        optimizer = TACOptimizer()
+        optimizer = TACOptimizer(level)
         optimized_tac = optimizer.optimize(tac_instructions)
-        print(f"✓ TAC Optimizer: {len(optimized_tac)} optimized TAC instructions")
+        print(f"✓ TAC Optimizer (-O{level}): {len(optimized_tac)} optimized TAC instructions")
         
         # Machine code generation
         mcg = MachineCodeGenerator()
@@ -59,7 +71,7 @@ def verify_example(filepath):
         print(f"Error: {type(e).__name__}: {e}")
         return False
 
-def main():
+def main(fused=False, level=DEFAULT_LEVEL):
     """Verify all examples"""
     examples = [
         'ejemplos/ejemplo1_estudiantes.py',
@@ -74,7 +86,7 @@ def main():
     
     results = []
     for example in examples:
-        success = verify_example(example)
+        success = verify_example(example, fused, level)
         results.append((example, success))
     
     # Summary
@@ -99,4 +111,9 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    exit(main())
+    import sys
+    level = DEFAULT_LEVEL
+    for arg in sys.argv[1:]:
+        if arg.startswith('-O') and arg[2:].isdigit() and int(arg[2:]) in OPTIMIZATION_LEVELS:
+            level = int(arg[2:])
+    exit(main(fused='--fused' in sys.argv, level=level))